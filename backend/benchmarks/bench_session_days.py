@@ -0,0 +1,142 @@
+"""Benchmark per-day session queries on the stored local day versus ``started_at``.
+
+Compares, on a year of sessions:
+
+- the stats streak (distinct active days in the last week), computed with
+  ``date()`` on every row against ``COUNT(DISTINCT day)``
+- a year of work seconds per day, grouped by ``date()`` against ``day``
+- cold daily timeseries in the stats timezone (read from the daily totals)
+  and in a timezone with the same offsets (grouped by ``started_at`` slots)
+
+Usage:
+    python -m benchmarks.bench_session_days [--sessions 1000000] [--queries 20]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from benchmarks.bench_stats_timeseries import seed
+from src.core.config import settings
+from src.core.database import Base
+from src.models.pomodoro import PomodoroSession, SessionType
+from src.models.types import epoch_seconds
+from src.services.daily_totals import local_day, rebuild_daily_totals
+from src.services.timeseries import TimeseriesCache, resolve_timezone, session_timeseries
+
+STATS_TIMEZONE = "Europe/Berlin"
+# Same offsets and transitions, but not the zone the stored days follow
+OTHER_TIMEZONE = "Europe/Paris"
+
+
+def streak_queries(today, week_ago: datetime):
+    """Distinct active days in the last week, by function and by column."""
+    owned = PomodoroSession.user_id == "default"
+    by_function = select(func.count(func.distinct(
+        func.date(epoch_seconds(PomodoroSession.started_at), "unixepoch")
+    ))).where(owned, PomodoroSession.started_at >= week_ago)
+    by_column = select(func.count(func.distinct(PomodoroSession.day))).where(
+        owned, PomodoroSession.day >= today - timedelta(days=7)
+    )
+    return by_function, by_column
+
+
+def daily_work_queries(today, year_ago: datetime):
+    """Work seconds per day over a year, by function and by column."""
+    owned = PomodoroSession.user_id == "default"
+    work = func.sum(case(
+        (PomodoroSession.session_type == SessionType.WORK, PomodoroSession.actual_duration),
+        else_=0,
+    ))
+    function_day = func.date(epoch_seconds(PomodoroSession.started_at), "unixepoch")
+    by_function = (
+        select(function_day, work)
+        .where(owned, PomodoroSession.started_at >= year_ago)
+        .group_by(function_day)
+    )
+    by_column = (
+        select(PomodoroSession.day, work)
+        .where(owned, PomodoroSession.day >= today - timedelta(days=365))
+        .group_by(PomodoroSession.day)
+    )
+    return by_function, by_column
+
+
+async def measure(session: AsyncSession, query, count: int) -> list:
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        (await session.execute(query)).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)
+
+
+async def measure_timeseries(
+    session: AsyncSession, tz_name: str, end: datetime, count: int
+) -> list:
+    """Cold requests: a fresh cache every time."""
+    tz = resolve_timezone(tz_name)
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        await session_timeseries(
+            session, "default", "day", end - timedelta(days=365), end, tz, TimeseriesCache()
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)
+
+
+def report(label: str, timings: list):
+    print(f"  {label}: p50 {statistics.median(timings):8.2f} ms  max {timings[-1]:8.2f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    settings.stats_timezone = STATS_TIMEZONE
+    end = datetime.utcnow()
+    today = local_day(end, resolve_timezone(None))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "days.db")
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        start = time.perf_counter()
+        seed(path, args.sessions, end)
+        async with engine.begin() as conn:
+            await conn.run_sync(rebuild_daily_totals)
+        print(f"seeded {args.sessions} sessions in {time.perf_counter() - start:.1f}s")
+
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with factory() as session:
+            print(f"streak, queries={args.queries}")
+            by_function, by_column = streak_queries(today, end - timedelta(days=7))
+            report("date(started_at)", await measure(session, by_function, args.queries))
+            report("day             ", await measure(session, by_column, args.queries))
+
+            print("work seconds per day, one year")
+            by_function, by_column = daily_work_queries(today, end - timedelta(days=365))
+            report("date(started_at)", await measure(session, by_function, args.queries))
+            report("day             ", await measure(session, by_column, args.queries))
+
+            print("cold daily timeseries, one year")
+            report("started_at slots", await measure_timeseries(
+                session, OTHER_TIMEZONE, end, args.queries
+            ))
+            report("daily totals    ", await measure_timeseries(
+                session, STATS_TIMEZONE, end, args.queries
+            ))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+"""Benchmark a year of daily Pomodoro stats buckets on a large sessions table.
+
+Reports the first (cold) request, which reads every bucket from the daily
+totals in one query, and repeated (warm) requests, which only recompute
+the open bucket.
+
+Usage:
+    python -m benchmarks.bench_stats_timeseries [--sessions 1000000] [--queries 50]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core.database import Base
+from src.models.pomodoro import PomodoroSession, SessionStatus, SessionType
+from src.models.types import EPOCH_DATE, to_epoch
+from src.services.daily_totals import local_day, rebuild_daily_totals
+from src.services.timeseries import TimeseriesCache, resolve_timezone, session_timeseries
+
+# Stored integer codes (see models.types)
+TYPES = [
+    PomodoroSession.__table__.c.session_type.type.code(value)
+    for value in (SessionType.WORK,) * 3 + (SessionType.SHORT_BREAK, SessionType.LONG_BREAK)
+]
+STATUSES = [
+    PomodoroSession.__table__.c.status.type.code(value)
+    for value in (SessionStatus.COMPLETED,) * 3 + (SessionStatus.INTERRUPTED,)
+]
+
+
+def seed(path: str, count: int, end: datetime):
+    """Bulk-insert sessions spread evenly over the year before ``end`` (no daily totals)."""
+    rng = random.Random(42)
+    span = 365 * 24 * 3600
+    tz = resolve_timezone(None)
+    conn = sqlite3.connect(path)
+
+    def row():
+        started = end - timedelta(seconds=rng.randrange(span))
+        return (
+            rng.choice(TYPES),
+            rng.choice(STATUSES),
+            rng.randint(60, 1500),
+            to_epoch(started),
+            (local_day(started, tz) - EPOCH_DATE).days,
+            rng.randint(0, 2),
+        )
+
+    conn.executemany(
+        "INSERT INTO pomodoro_sessions (user_id, session_type, status, planned_duration, "
+        "actual_duration, started_at, day, session_number, interruptions) "
+        "VALUES ('default', ?, ?, 1500, ?, ?, ?, 1, ?)",
+        (row() for _ in range(count)),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    end = datetime.utcnow()
+    tz = resolve_timezone("UTC")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stats.db")
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        start = time.perf_counter()
+        seed(path, args.sessions, end)
+        async with engine.begin() as conn:
+            await conn.run_sync(rebuild_daily_totals)
+        print(f"seeded {args.sessions} sessions in {time.perf_counter() - start:.1f}s")
+
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        cache = TimeseriesCache()
+        timings = []
+        async with factory() as session:
+            for _ in range(args.queries + 1):
+                start = time.perf_counter()
+                buckets = await session_timeseries(
+                    session, "default", "day", end - timedelta(days=365), end, tz, cache
+                )
+                timings.append((time.perf_counter() - start) * 1000)
+        await engine.dispose()
+
+    cold, warm = timings[0], sorted(timings[1:])
+    print(f"buckets={len(buckets)} queries={args.queries}")
+    print(f"  cold:     {cold:8.2f} ms")
+    print(f"  warm p50: {statistics.median(warm):8.2f} ms")
+    print(f"  warm max: {warm[-1]:8.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
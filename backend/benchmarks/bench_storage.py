@@ -0,0 +1,183 @@
+"""Benchmark database size and range queries with text and integer encodings.
+
+Seeds a database in the text encoding (``DateTime`` as ISO strings,
+``Enum`` as member names), copies it, migrates the copy to integer
+timestamps and enum codes, and compares file, table and index sizes and
+the latency of time-range queries on both.
+
+Usage:
+    python -m benchmarks.bench_storage [--sessions 1000000] [--tasks 50000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import DateTime, Enum, MetaData, Table, and_, create_engine, func, select, text
+
+from src import models  # noqa: F401
+from src.core.database import Base
+from src.core.migrations import LATEST_VERSION, _compact_storage
+from src.models.pomodoro import SessionStatus, SessionType
+from src.models.sync import SYNC_SEED
+from src.models.task import TaskPriority, TaskStatus
+from src.models.types import EnumCode, EpochDateTime
+
+BATCH = 10_000
+
+
+def text_metadata() -> MetaData:
+    """Copy of the schema with the text encodings the integer types replaced."""
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        copy = table.to_metadata(metadata)
+        for column in copy.columns:
+            if isinstance(column.type, EpochDateTime):
+                column.type = DateTime()
+            elif isinstance(column.type, EnumCode):
+                column.type = Enum(column.type.enum_class)
+    return metadata
+
+
+def seed(path: str, tasks: int, sessions: int, end: datetime):
+    """Insert tasks and a year of sessions in the text encoding."""
+    rng = random.Random(42)
+    metadata = text_metadata()
+    engine = create_engine(f"sqlite:///{path}")
+    metadata.create_all(engine)
+    task_table: Table = metadata.tables["tasks"]
+    session_table: Table = metadata.tables["pomodoro_sessions"]
+    span = 365 * 24 * 3600
+
+    with engine.begin() as conn:
+        # The copied tables do not carry the DDL events of the models
+        conn.execute(text(SYNC_SEED))
+        for first in range(0, tasks, BATCH):
+            conn.execute(task_table.insert(), [
+                {
+                    "user_id": "default",
+                    "title": f"Task {i}",
+                    "status": rng.choice(list(TaskStatus)),
+                    "priority": rng.choice(list(TaskPriority)),
+                    "estimated_pomodoros": 4,
+                    "completed_pomodoros": 0,
+                    "created_at": end - timedelta(seconds=rng.randrange(span)),
+                    "updated_at": end,
+                }
+                for i in range(first, min(first + BATCH, tasks))
+            ])
+        for first in range(0, sessions, BATCH):
+            rows = []
+            for _ in range(min(BATCH, sessions - first)):
+                started = end - timedelta(
+                    seconds=rng.randrange(span), microseconds=rng.randrange(10**6)
+                )
+                duration = rng.randint(60, 1500)
+                rows.append({
+                    "user_id": "default",
+                    "session_type": rng.choice([SessionType.WORK] * 3 + [SessionType.SHORT_BREAK]),
+                    "status": rng.choice(
+                        [SessionStatus.COMPLETED] * 3 + [SessionStatus.INTERRUPTED]
+                    ),
+                    "planned_duration": 1500,
+                    "actual_duration": duration,
+                    "started_at": started,
+                    "ended_at": started + timedelta(seconds=duration),
+                    "task_id": rng.randint(1, tasks),
+                    "session_number": 1,
+                    "interruptions": rng.randint(0, 2),
+                })
+            conn.execute(session_table.insert(), rows)
+        conn.execute(text(f"PRAGMA user_version = {LATEST_VERSION - 1}"))
+    engine.dispose()
+
+
+def sizes(path: str) -> dict:
+    """File size and per-object page usage (tables and indexes) after VACUUM."""
+    conn = sqlite3.connect(path)
+    conn.execute("VACUUM")
+    usage = dict(conn.execute(
+        "SELECT name, SUM(pgsize) FROM dbstat "
+        "WHERE name LIKE 'tasks%' OR name LIKE 'ix_tasks%' OR name LIKE '%pomodoro_sessions%' "
+        "GROUP BY name"
+    ).fetchall())
+    conn.close()
+    return {"file": os.path.getsize(path), **usage}
+
+
+def range_queries(path: str, metadata: MetaData, end: datetime, count: int) -> list:
+    """Latencies (ms) of 7-day session aggregates and task status counts."""
+    rng = random.Random(7)
+    engine = create_engine(f"sqlite:///{path}")
+    sessions = metadata.tables["pomodoro_sessions"]
+    tasks = metadata.tables["tasks"]
+    timings = []
+    with engine.connect() as conn:
+        for _ in range(count):
+            start = end - timedelta(days=rng.randint(7, 365))
+            began = time.perf_counter()
+            conn.execute(
+                select(func.count(), func.sum(sessions.c.actual_duration)).where(and_(
+                    sessions.c.user_id == "default",
+                    sessions.c.started_at >= start,
+                    sessions.c.started_at < start + timedelta(days=7),
+                    sessions.c.session_type == SessionType.WORK,
+                ))
+            ).one()
+            conn.execute(
+                select(func.count()).where(
+                    tasks.c.status == TaskStatus.TODO, tasks.c.created_at >= start,
+                )
+            ).one()
+            timings.append((time.perf_counter() - began) * 1000)
+    engine.dispose()
+    return sorted(timings)
+
+
+def report(label: str, timings: list):
+    print(f"  {label}: p50 {statistics.median(timings):7.2f} ms  "
+          f"p95 {timings[int(len(timings) * 0.95) - 1]:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--tasks", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    end = datetime.utcnow()
+    with tempfile.TemporaryDirectory() as tmp:
+        before_path = os.path.join(tmp, "text.db")
+        after_path = os.path.join(tmp, "integer.db")
+        start = time.perf_counter()
+        seed(before_path, args.tasks, args.sessions, end)
+        elapsed = time.perf_counter() - start
+        print(f"seeded {args.tasks} tasks and {args.sessions} sessions in {elapsed:.1f}s")
+
+        shutil.copy(before_path, after_path)
+        engine = create_engine(f"sqlite:///{after_path}")
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            _compact_storage(conn)
+        engine.dispose()
+        print(f"migrated in {time.perf_counter() - start:.1f}s")
+
+        before, after = sizes(before_path), sizes(after_path)
+        print("bytes (text -> integer):")
+        for name in sorted(before, key=lambda name: (name != "file", name)):
+            if name in after:
+                print(f"  {name:45s} {before[name]:>12,} -> {after[name]:>12,} "
+                      f"({after[name] / before[name]:.0%})")
+
+        print(f"queries={args.queries}")
+        report("text   ", range_queries(before_path, text_metadata(), end, args.queries))
+        report("integer", range_queries(after_path, Base.metadata, end, args.queries))
+
+
+if __name__ == "__main__":
+    main()
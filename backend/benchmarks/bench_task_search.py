@@ -0,0 +1,102 @@
+"""Benchmark full-text task search latency on a large tasks table.
+
+Usage:
+    python -m benchmarks.bench_task_search [--tasks 1000000] [--queries 200]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.api.tasks import search_tasks
+from src.core.database import Base
+from src.models.task import Task, TaskPriority, TaskStatus
+from src.models.types import to_epoch
+
+SYLLABLES = "ka lo mi re tu sa no vi pe da fo gu ri ze la mo".split()
+
+
+def vocabulary(size: int) -> list[str]:
+    """Deterministic pseudo-words, so queries are as selective as real text."""
+    rng = random.Random(1)
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+
+WORDS = vocabulary(20_000)
+
+
+def seed(path: str, count: int):
+    """Bulk-insert synthetic tasks (the FTS triggers index them)."""
+    rng = random.Random(42)
+    columns = Task.__table__.c
+    todo = columns.status.type.code(TaskStatus.TODO)
+    medium = columns.priority.type.code(TaskPriority.MEDIUM)
+    created = to_epoch(datetime(2026, 1, 1))
+    conn = sqlite3.connect(path)
+    rows = (
+        (
+            " ".join(rng.choices(WORDS, k=4)),
+            " ".join(rng.choices(WORDS, k=12)),
+            f'["{rng.choice(WORDS)}"]',
+            todo, medium, created, created,
+        )
+        for _ in range(count)
+    )
+    conn.executemany(
+        "INSERT INTO tasks (user_id, title, description, tags, status, priority, "
+        "priority_rank, queue_score, estimated_pomodoros, completed_pomodoros, "
+        "total_focus_seconds, interrupted_sessions, created_at, updated_at) "
+        "VALUES ('default', ?, ?, ?, ?, ?, 2, 298, 1, 0, 0, 0, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "search.db")
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        start = time.perf_counter()
+        seed(path, args.tasks)
+        print(f"seeded {args.tasks} tasks in {time.perf_counter() - start:.1f}s")
+
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        rng = random.Random(7)
+        timings = []
+        async with factory() as session:
+            for _ in range(args.queries):
+                q = " ".join(word[:rng.randint(4, len(word))] for word in rng.sample(WORDS, 2))
+                start = time.perf_counter()
+                await search_tasks(
+                    q=q, status=None, limit=20, cursor=None, user_id="default", db=session
+                )
+                timings.append((time.perf_counter() - start) * 1000)
+        await engine.dispose()
+
+    timings.sort()
+    print(f"queries={args.queries}")
+    print(f"  p50: {statistics.median(timings):8.2f} ms")
+    print(f"  p95: {timings[int(len(timings) * 0.95) - 1]:8.2f} ms")
+    print(f"  max: {timings[-1]:8.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""Benchmark incremental Obsidian vault scans on a large synthetic vault.
+
+Reports the initial index (every note hashed), a no-change rescan (metadata
+only) and a rescan after editing a handful of notes.
+
+Usage:
+    python -m benchmarks.bench_vault_index [--notes 50000] [--rescans 5] [--edits 10]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core.database import Base
+from src.services.vault_index import VaultIndexer
+
+NOTES_PER_FOLDER = 500
+
+
+def seed(root: str, count: int):
+    """Write ``count`` small notes spread over nested folders."""
+    rng = random.Random(42)
+    for i in range(count):
+        folder = os.path.join(root, f"area-{i % 10}", f"folder-{i // NOTES_PER_FOLDER}")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"note-{i}.md"), "w") as handle:
+            handle.write(f"---\ntags: [t{i % 50}]\n---\n# Note {i}\n")
+            handle.write("".join(f"- [ ] task {i}.{j}\n" for j in range(rng.randint(0, 5))))
+            handle.write("lorem ipsum " * rng.randint(10, 200))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=50_000)
+    parser.add_argument("--rescans", type=int, default=5)
+    parser.add_argument("--edits", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vault = os.path.join(tmp, "vault")
+        start = time.perf_counter()
+        seed(vault, args.notes)
+        print(f"wrote {args.notes} notes in {time.perf_counter() - start:.1f}s")
+
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'index.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        indexer = VaultIndexer(vault, factory)
+
+        start = time.perf_counter()
+        changes = await indexer.run()
+        elapsed = time.perf_counter() - start
+        print(f"initial index: {changes.summary()['added']} notes in {elapsed:.2f}s")
+
+        timings = []
+        for _ in range(args.rescans):
+            start = time.perf_counter()
+            changes = await indexer.run()
+            timings.append(time.perf_counter() - start)
+            assert not changes.changed
+        print(
+            f"no-change rescan: median {statistics.median(timings) * 1000:.0f} ms, "
+            f"max {max(timings) * 1000:.0f} ms ({changes.hashed} files read)"
+        )
+
+        for i in range(args.edits):
+            folder = os.path.join(vault, f"area-{i % 10}", f"folder-{i // NOTES_PER_FOLDER}")
+            path = os.path.join(folder, f"note-{i}.md")
+            with open(path, "a") as handle:
+                handle.write("\n- [ ] edited\n")
+        start = time.perf_counter()
+        changes = await indexer.run()
+        print(
+            f"rescan after {args.edits} edits: {(time.perf_counter() - start) * 1000:.0f} ms "
+            f"({changes.hashed} files read, {len(changes.modified)} modified)"
+        )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""Benchmark vault note parsing throughput against process pool size.
+
+For each pool size, parses every note of a synthetic vault through
+``parse_notes`` and reports notes/sec along with the worst event-loop lag
+seen meanwhile (pool size 0 parses in a thread).
+
+Usage:
+    python -m benchmarks.bench_vault_parse [--notes 20000] [--workers 0 1 2 4] [--chunk-size 64]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.bench_vault_index import seed
+from src.services.vault_index import walk_notes
+from src.services.vault_ingest import parse_notes
+
+
+async def measure_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Largest delay of a periodic timer until ``stop`` is set."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run(root: str, paths, workers: int, chunk_size: int):
+    pool = None
+    if workers:
+        pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        # Start the workers before timing
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(pool, time.sleep, 0.1) for _ in range(workers)
+        ))
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(measure_lag(stop))
+    start = time.perf_counter()
+    parsed = tasks = 0
+    async for chunk in parse_notes(root, paths, pool, chunk_size):
+        parsed += len(chunk)
+        tasks += sum(len(note.tasks) for note in chunk)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    worst_lag = await lag
+    if pool is not None:
+        pool.shutdown()
+    return parsed, tasks, elapsed, worst_lag
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--chunk-size", type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        seed(tmp, args.notes)
+        paths = sorted(walk_notes(tmp))
+        print(f"notes={len(paths)} chunk_size={args.chunk_size} cpus={os.cpu_count()}")
+        for workers in args.workers:
+            parsed, tasks, elapsed, lag = await run(tmp, paths, workers, args.chunk_size)
+            print(
+                f"  workers={workers}: {parsed / elapsed:8.0f} notes/s "
+                f"({tasks} tasks, {elapsed:.2f}s, max loop lag {lag * 1000:.1f} ms)"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
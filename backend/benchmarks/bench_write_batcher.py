@@ -0,0 +1,71 @@
+"""Benchmark write throughput with and without group commit.
+
+Usage:
+    python -m benchmarks.bench_write_batcher [--writes 2000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core.database import Base
+from src.core.write_batcher import WriteBatcher
+from src.models.task import Task
+
+
+def create(i: int):
+    async def apply(tx: AsyncSession) -> Task:
+        task = Task(title=f"Task {i}")
+        tx.add(task)
+        await tx.flush()
+        return task
+    return apply
+
+
+async def run(batched: bool, writes: int, concurrency: int, window_ms: float) -> float:
+    """Insert ``writes`` tasks from ``concurrency`` workers; return writes/sec."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}",
+            connect_args={"timeout": 60},
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        batcher = WriteBatcher(factory, window_ms=window_ms, max_ops=concurrency)
+        queue = iter(range(writes))
+
+        async def worker():
+            for i in queue:
+                if batched:
+                    await batcher.submit(create(i))
+                else:
+                    async with factory() as session:
+                        await create(i)(session)
+                        await session.commit()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        await engine.dispose()
+        return writes / elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    off = await run(False, args.writes, args.concurrency, args.window_ms)
+    on = await run(True, args.writes, args.concurrency, args.window_ms)
+    print(f"writes={args.writes} concurrency={args.concurrency} window={args.window_ms}ms")
+    print(f"  batching off: {off:10.1f} writes/sec")
+    print(f"  batching on:  {on:10.1f} writes/sec  ({on / off:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
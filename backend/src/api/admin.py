@@ -0,0 +1,177 @@
+"""Administrative maintenance endpoints."""
+import json
+import os
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.config import settings
+from src.core.database import get_db, get_user_id, main_session
+from src.core.write_batcher import run_write
+from src.models.job import Job, JobStatus
+from src.schemas.job import JobAccepted, JobCreate, JobResponse
+from src.services.archive import archive_cutoff, archive_user_sessions
+from src.services.backup import backup_service, list_backups
+from src.services.github_sync import github_sync
+from src.services import job_handlers  # noqa: F401  (registers the job kinds)
+from src.services.jobs import JOB_KINDS, enqueue
+from src.services.task_counters import recompute_task_counters
+from src.services.vault_index import vault_indexer
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+async def queue_job(
+    db: AsyncSession,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    priority: int = 0,
+    delay: float = 0.0,
+) -> JSONResponse:
+    """Enqueue a job for the worker and answer 202 with its ID."""
+    async with main_session(db) as session:
+        job_id = await enqueue(session, kind, payload, priority=priority, delay=delay)
+        await session.commit()
+    accepted = JobAccepted(job_id=job_id, status=JobStatus.QUEUED)
+    return JSONResponse(status_code=202, content=accepted.model_dump(mode="json"))
+
+
+@router.post("/repair/task-counters")
+async def repair_task_counters(
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Recompute the focus counters of the user's tasks from their sessions.
+
+    Returns the number of tasks whose stored counters were wrong.
+    """
+    async def apply(tx: AsyncSession) -> int:
+        return await tx.run_sync(lambda session: recompute_task_counters(session, user_id))
+
+    repaired = await run_write(db, apply)
+    return {"repaired": repaired}
+
+
+@router.post("/archive/sessions")
+async def archive_old_sessions(
+    older_than_days: Optional[int] = Query(None, ge=1),
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Move the user's finished sessions to the archive now.
+
+    - **older_than_days**: Age threshold (defaults to ``SESSION_ARCHIVE_AFTER_DAYS``)
+    """
+    cutoff = archive_cutoff(older_than_days)
+    if cutoff is None:
+        raise HTTPException(status_code=400, detail="Session archival is disabled")
+
+    archived = await archive_user_sessions(db, user_id, cutoff)
+    return {"archived": archived, "cutoff": cutoff}
+
+
+@router.post("/backups", status_code=201)
+async def create_backup(db: AsyncSession = Depends(get_db)):
+    """
+    Run an online backup of the database files now.
+
+    Returns 409 while another backup is in progress. With ``WORKER_ENABLED``
+    the backup is queued for the worker instead (202).
+    """
+    if settings.worker_enabled:
+        return await queue_job(db, "backup")
+    if backup_service.running:
+        raise HTTPException(status_code=409, detail="A backup is already running")
+
+    result = await backup_service.run()
+    return {
+        "name": result.name,
+        "files": result.files,
+        "bytes": result.bytes,
+        "duration_seconds": round(result.duration, 3),
+    }
+
+
+@router.get("/backups")
+async def get_backups():
+    """List the retained backup runs, newest first."""
+    return {
+        "backups": [
+            {
+                "name": os.path.basename(path),
+                "files": sorted(os.listdir(path)),
+                "bytes": sum(entry.stat().st_size for entry in os.scandir(path)),
+            }
+            for path in reversed(list_backups())
+        ]
+    }
+
+
+@router.post("/vault/index")
+async def index_vault(db: AsyncSession = Depends(get_db)):
+    """
+    Rescan the Obsidian vault and update the note manifest.
+
+    Only notes whose mtime or size changed are read. With ``WORKER_ENABLED``
+    the scan is queued for the worker instead (202).
+    """
+    if settings.worker_enabled:
+        return await queue_job(db, "vault_index")
+    try:
+        changes = await vault_indexer.run(db)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return changes.summary()
+
+
+@router.post("/github/sync")
+async def sync_github_issues(db: AsyncSession = Depends(get_db)):
+    """
+    Poll the GitHub issues linked to tasks now.
+
+    Issues are requested conditionally, so unchanged ones cost no rate limit.
+    With ``WORKER_ENABLED`` the pass is queued for the worker instead (202).
+    """
+    if settings.worker_enabled:
+        return await queue_job(db, "github_sync")
+    result = await github_sync.sync_once(db)
+    return result.summary()
+
+
+@router.post("/jobs", status_code=202, response_model=JobAccepted)
+async def create_job(job: JobCreate, db: AsyncSession = Depends(get_db)):
+    """
+    Queue a background job for the worker.
+
+    - **kind**: One of the registered job kinds
+    - **priority**: Higher runs first
+    - **delay**: Seconds before the job may start
+    """
+    if job.kind not in JOB_KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {job.kind}")
+    return await queue_job(db, job.kind, job.payload, job.priority, job.delay)
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    """Get a job's status, attempts and result."""
+    async with main_session(db) as session:
+        job = await session.get(Job, job_id, populate_existing=True)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return JobResponse(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        priority=job.priority,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        visible_at=job.visible_at,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        last_error=job.last_error,
+        result=json.loads(job.result) if job.result else None,
+    )
@@ -0,0 +1,217 @@
+"""Request batching API endpoint."""
+import json
+import logging
+import re
+from contextlib import nullcontext
+from typing import Any, List, Optional, Tuple
+from urllib.parse import quote, urlencode
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.coalescing import request_coalescer
+from src.core.config import settings
+from src.core.database import get_db, get_user_id
+from src.core.write_batcher import RequestBatch, current_batch
+from src.schemas.batch import BatchRequest, BatchResponse, BatchSubRequest, BatchSubResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+# ${<index>.<field>[.<field>...]} refers to the body of an earlier response
+REFERENCE = re.compile(r"\$\{(\d+)((?:\.[A-Za-z0-9_]+)*)\}")
+
+# Headers that describe the batch body rather than a sub-request
+BATCH_ONLY_HEADERS = {b"content-length", b"content-type"}
+
+
+class UnresolvedReference(Exception):
+    """A reference points at a missing, failed or later response."""
+
+
+def _lookup(responses: List[BatchSubResponse], index: str, fields: str) -> Any:
+    position = int(index)
+    if position >= len(responses) or responses[position].status >= 400:
+        raise UnresolvedReference(
+            f"${{{index}{fields}}} does not refer to an earlier successful response"
+        )
+    value = responses[position].body
+    for name in filter(None, fields.split(".")):
+        try:
+            value = value[int(name)] if isinstance(value, list) else value[name]
+        except (KeyError, IndexError, TypeError, ValueError):
+            raise UnresolvedReference(f"${{{index}{fields}}} not found in response {index}")
+    return value
+
+
+def resolve_references(
+    value: Any, responses: List[BatchSubResponse], quote_values: bool = False
+) -> Any:
+    """
+    Replace ``${index.field}`` references with values from earlier responses.
+
+    A string that is exactly one reference takes the referenced value as is
+    (keeping numbers numeric); references inside longer strings are
+    interpolated as text.
+
+    Args:
+        value: Path, query or body of a sub-request
+        responses: Responses of the sub-requests executed so far
+        quote_values: URL-quote interpolated values (for paths)
+
+    Raises:
+        UnresolvedReference: If a reference cannot be resolved
+    """
+    if isinstance(value, dict):
+        return {
+            key: resolve_references(item, responses, quote_values) for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [resolve_references(item, responses, quote_values) for item in value]
+    if not isinstance(value, str):
+        return value
+
+    whole = REFERENCE.fullmatch(value)
+    if whole and not quote_values:
+        return _lookup(responses, *whole.groups())
+
+    def interpolate(match: re.Match) -> str:
+        text = str(_lookup(responses, *match.groups()))
+        return quote(text, safe="") if quote_values else text
+
+    return REFERENCE.sub(interpolate, value)
+
+
+async def _dispatch(
+    request: Request,
+    user_id: str,
+    method: str,
+    path: str,
+    query: Optional[dict],
+    body: Any,
+) -> Tuple[int, Any]:
+    """
+    Run one sub-request through the application's router in-process.
+
+    Sub-requests skip the middleware stack (the batch already holds an
+    admission slot), so writes mark the coalescer themselves: a read that
+    arrives after a sub-request committed never shares an older response.
+    """
+    payload = b"" if body is None else json.dumps(body).encode()
+    headers = [(k, v) for k, v in request.scope["headers"] if k not in BATCH_ONLY_HEADERS]
+    if body is not None:
+        headers += [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(payload)).encode()),
+        ]
+
+    scope = {
+        **{
+            k: v for k, v in request.scope.items()
+            if k not in ("router", "endpoint", "route", "path_params")
+        },
+        "method": method,
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(query or {}, doseq=True).encode(),
+        "headers": headers,
+    }
+    received = False
+
+    async def receive():
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    status = 500
+    chunks = []
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    writing = nullcontext() if method == "GET" else request_coalescer.writing(user_id)
+    with writing:
+        await request.app.router(scope, receive, send)
+    content = b"".join(chunks)
+    return status, json.loads(content) if content else None
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Execute an ordered list of task and Pomodoro sub-requests in one call.
+
+    Sub-requests run in order within this request's database session. Path,
+    query and body may refer to earlier response bodies with
+    ``${index.field}``, e.g. ``/api/tasks/${0.id}``; a sub-request whose
+    references cannot be resolved gets status 424.
+
+    - **atomic**: Run everything in one transaction; the first sub-request
+      that fails rolls back the whole batch and the rest are skipped (424).
+      Otherwise each write commits on its own and later sub-requests still run.
+    """
+    if len(batch.requests) > settings.batch_max_requests:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch holds at most {settings.batch_max_requests} requests",
+        )
+
+    state = RequestBatch(session=db, atomic=batch.atomic)
+    responses: List[BatchSubResponse] = []
+    failed = False
+    token = current_batch.set(state)
+    try:
+        for sub in batch.requests:
+            if failed and batch.atomic:
+                responses.append(
+                    BatchSubResponse(status=424, body={"detail": "Skipped: batch aborted"})
+                )
+                continue
+            responses.append(await _run_one(request, user_id, sub, responses))
+            failed = failed or responses[-1].status >= 400
+    finally:
+        current_batch.reset(token)
+
+    if not batch.atomic:
+        return BatchResponse(responses=responses, committed=True)
+
+    if failed:
+        await db.rollback()
+        return BatchResponse(responses=responses, committed=False)
+
+    await db.commit()
+    for callback in state.committed:
+        callback()
+    return BatchResponse(responses=responses, committed=True)
+
+
+async def _run_one(
+    request: Request,
+    user_id: str,
+    sub: BatchSubRequest,
+    responses: List[BatchSubResponse],
+) -> BatchSubResponse:
+    """Resolve a sub-request's references and execute it."""
+    try:
+        path = resolve_references(sub.path, responses, quote_values=True)
+        query = resolve_references(sub.query, responses)
+        body = resolve_references(sub.body, responses)
+    except UnresolvedReference as e:
+        return BatchSubResponse(status=424, body={"detail": str(e)})
+
+    try:
+        status, content = await _dispatch(request, user_id, sub.method, path, query, body)
+    except Exception as e:
+        logger.error(f"Batch sub-request {sub.method} {path} failed: {e}", exc_info=True)
+        return BatchSubResponse(status=500, body={"detail": "Internal server error"})
+    return BatchSubResponse(status=status, body=content)
@@ -0,0 +1,50 @@
+"""Claude assistant endpoints."""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.database import get_db, get_user_id
+from src.schemas.claude import AskRequest, AskResponse, PromptContextResponse, PromptSection
+from src.services.claude import ClaudeError, claude_client
+from src.services.prompt_context import prompt_context
+
+router = APIRouter(prefix="/claude", tags=["claude"])
+
+
+@router.get("/context", response_model=PromptContextResponse)
+async def get_context(
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Show the context sent with the user's prompts."""
+    context = await prompt_context.build(db, user_id)
+    return PromptContextResponse(
+        text=context.text,
+        tokens=context.tokens,
+        prefix_hash=context.prefix_hash,
+        sections=[
+            PromptSection(name=section.name, tokens=section.tokens, cached=section.cached)
+            for section in context.sections
+        ],
+    )
+
+
+@router.post("/ask", response_model=AskResponse)
+async def ask(
+    request: AskRequest,
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Ask Claude about the user's tasks and focus history.
+
+    Returns 503 when no API key is configured and 502 when the API fails.
+    """
+    if not claude_client.configured:
+        raise HTTPException(status_code=503, detail="Claude API key not configured")
+
+    context = await prompt_context.build(db, user_id)
+    try:
+        result = await claude_client.ask(context, request.question)
+    except ClaudeError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    usage = {name: value for name, value in result["usage"].items() if isinstance(value, int)}
+    return AskResponse(answer=result["answer"], prefix_hash=context.prefix_hash, usage=usage)
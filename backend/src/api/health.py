@@ -1,17 +1,29 @@
 """Health check endpoints."""
 from datetime import datetime
 from typing import Dict, Any
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
-import redis.asyncio as redis
+from fastapi import APIRouter, Query, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
+from src.core.admission import admission_controller
 from src.core.config import settings
-from src.core.database import get_db
+from src.services.health_monitor import health_monitor
 
 router = APIRouter(tags=["health"])
 
 
+async def _current_snapshot(live: bool):
+    """
+    Return the monitor's snapshot, running a live check if forced or stale.
+
+    A live check opens its own short-lived session on the main database, so
+    probes never go through ``get_db`` (and its per-user shard routing).
+    """
+    snapshot = None if live else health_monitor.latest()
+    if snapshot is None:
+        return await health_monitor.refresh(), "live"
+    return snapshot, "cached"
+
+
 @router.get("/health")
 async def health_check() -> Dict[str, Any]:
     """
@@ -30,100 +42,51 @@ async def health_check() -> Dict[str, Any]:
 
 
 @router.get("/health/detailed")
-async def detailed_health_check(db: AsyncSession = Depends(get_db)) -> Dict[str, Any]:
+async def detailed_health_check(
+    live: bool = Query(False, description="Bypass the cached snapshot and check now"),
+) -> Dict[str, Any]:
     """
     Detailed health check with dependency checks.
 
+    Answers from the background monitor's snapshot; dependencies are only
+    checked inline when ``live`` is set or the snapshot is stale.
+
     Args:
-        db: Database session
+        live: Force a live check
 
     Returns:
         dict: Detailed health status
     """
-    health_status = {
-        "status": "healthy",
+    snapshot, source = await _current_snapshot(live)
+    return {
+        "status": snapshot.status,
         "service": settings.app_name,
         "version": settings.app_version,
         "environment": settings.environment,
         "timestamp": datetime.utcnow().isoformat(),
-        "checks": {}
+        "checked_at": snapshot.checked_at.isoformat(),
+        "age_seconds": round(snapshot.age, 3),
+        "source": source,
+        "checks": snapshot.checks,
+        "admission": admission_controller.snapshot(),
     }
 
-    # Check database
-    try:
-        await db.execute(text("SELECT 1"))
-        health_status["checks"]["database"] = {
-            "status": "up",
-            "message": "Database connection successful"
-        }
-    except Exception as e:
-        health_status["status"] = "degraded"
-        health_status["checks"]["database"] = {
-            "status": "down",
-            "message": f"Database error: {str(e)}"
-        }
-
-    # Check Redis
-    if settings.redis_enabled:
-        try:
-            redis_client = redis.from_url(settings.redis_url, decode_responses=True)
-            await redis_client.ping()
-            await redis_client.close()
-            health_status["checks"]["redis"] = {
-                "status": "up",
-                "message": "Redis connection successful"
-            }
-        except Exception as e:
-            health_status["status"] = "degraded"
-            health_status["checks"]["redis"] = {
-                "status": "down",
-                "message": f"Redis error: {str(e)}"
-            }
-    else:
-        health_status["checks"]["redis"] = {
-            "status": "disabled",
-            "message": "Redis is disabled"
-        }
-
-    # Check Obsidian vault (if configured)
-    if settings.obsidian_vault_path and settings.obsidian_sync_enabled:
-        import os
-        if os.path.exists(settings.obsidian_vault_path):
-            health_status["checks"]["obsidian"] = {
-                "status": "up",
-                "message": "Obsidian vault accessible"
-            }
-        else:
-            health_status["status"] = "degraded"
-            health_status["checks"]["obsidian"] = {
-                "status": "down",
-                "message": "Obsidian vault not found"
-            }
-    else:
-        health_status["checks"]["obsidian"] = {
-            "status": "disabled",
-            "message": "Obsidian sync is disabled"
-        }
-
-    return health_status
-
 
 @router.get("/ready")
-async def readiness_check(db: AsyncSession = Depends(get_db)) -> Dict[str, str]:
+async def readiness_check(
+    live: bool = Query(False, description="Bypass the cached snapshot and check now"),
+) -> Dict[str, str]:
     """
     Kubernetes readiness probe endpoint.
 
     Args:
-        db: Database session
+        live: Force a live check
 
     Returns:
         dict: Readiness status
     """
-    try:
-        await db.execute(text("SELECT 1"))
-        return {"status": "ready"}
-    except Exception:
-        return {"status": "not ready"}
+    snapshot, _ = await _current_snapshot(live)
+    return {"status": "ready" if snapshot.ready else "not ready"}
 
 
 @router.get("/live")
@@ -135,3 +98,9 @@ async def liveness_check() -> Dict[str, str]:
         dict: Liveness status
     """
     return {"status": "alive"}
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus metrics in the text exposition format."""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
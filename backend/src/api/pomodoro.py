@@ -1,28 +1,73 @@
 """Pomodoro timer API endpoints."""
-from typing import Optional
-from datetime import datetime, timedelta
+from typing import Optional, Tuple, Union
+from datetime import date, datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
-from src.core.database import get_db
-from src.models.pomodoro import PomodoroSession, SessionType, SessionStatus
+from src.core.database import get_db, get_user_id
+from src.core.write_batcher import after_commit, run_write
+from src.models.pomodoro import (
+    ArchivedPomodoroSession,
+    PomodoroSession,
+    SessionType,
+    SessionStatus,
+)
 from src.schemas.pomodoro import (
     PomodoroSessionCreate,
     PomodoroSessionUpdate,
     PomodoroSessionResponse,
     PomodoroSessionListResponse,
     PomodoroStatsResponse,
+    PomodoroTimeseriesBucket,
+    PomodoroTimeseriesResponse,
+    PomodoroHeatmapResponse,
+)
+from src.services.archive import (
+    COLD,
+    HOT,
+    archive_totals,
+    session_source,
+    sessions_union,
+)
+from src.services.daily_notes import enqueue_session, outbox_written
+from src.services.daily_totals import (
+    daily_focus_minutes,
+    day_bounds,
+    encode_uint16,
+    intensity_quantiles,
+    local_day,
+    refresh_daily_totals,
+)
+from src.services.prompt_context import prompt_context
+from src.services.task_counters import apply_session_change, contribution
+from src.services.timeseries import (
+    FIELDS,
+    Bucket,
+    default_start,
+    resolve_timezone,
+    session_timeseries,
+    timeseries_cache,
 )
 
 router = APIRouter(prefix="/pomodoro", tags=["pomodoro"])
 
 
+def _sessions_written(user_id: str, *sessions: PomodoroSession):
+    """Invalidate cached statistics and prompt context for committed session writes."""
+    instants = [session.started_at for session in sessions]
+    # Linked tasks' pomodoro counters change with their sessions
+    sections = ["sessions", "streaks"] + (["tasks"] if any(s.task_id for s in sessions) else [])
+    after_commit(lambda: timeseries_cache.invalidate(user_id, *instants))
+    after_commit(lambda: prompt_context.invalidate(user_id, *sections))
+
+
 @router.get("/sessions", response_model=PomodoroSessionListResponse)
 async def list_sessions(
     status: Optional[SessionStatus] = None,
     task_id: Optional[int] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    user_id: str = Depends(get_user_id),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -33,28 +78,46 @@ async def list_sessions(
     - **skip**: Number of sessions to skip (pagination)
     - **limit**: Maximum number of sessions to return
     """
-    query = select(PomodoroSession)
-
-    conditions = []
-    if status:
-        conditions.append(PomodoroSession.status == status)
-    if task_id:
-        conditions.append(PomodoroSession.task_id == task_id)
-
-    if conditions:
-        query = query.where(and_(*conditions))
+    def filters(table):
+        conditions = [table.c.user_id == user_id]
+        if status:
+            conditions.append(table.c.status == status)
+        if task_id:
+            conditions.append(table.c.task_id == task_id)
+        return and_(*conditions)
 
     # Get total count
-    count_query = select(func.count()).select_from(PomodoroSession)
-    if conditions:
-        count_query = count_query.where(and_(*conditions))
+    count_query = select(func.count()).select_from(PomodoroSession).where(filters(HOT))
     total_result = await db.execute(count_query)
     total = total_result.scalar_one()
 
+    # Rows newer than the archive watermark always sort before archived ones
+    source = HOT
+    carried = await archive_totals(db, user_id)
+    if carried and status != SessionStatus.ACTIVE:
+        recent_query = select(func.count()).select_from(PomodoroSession).where(
+            filters(HOT), HOT.c.started_at >= carried.archived_before
+        )
+        if skip + limit > (await db.execute(recent_query)).scalar_one():
+            source = sessions_union(user_id)
+
+        if task_id:
+            archived_query = select(func.count()).select_from(COLD).where(filters(COLD))
+            total += (await db.execute(archived_query)).scalar_one()
+        elif status == SessionStatus.COMPLETED:
+            total += carried.completed_sessions
+        elif status == SessionStatus.INTERRUPTED:
+            total += carried.sessions - carried.completed_sessions
+        else:
+            total += carried.sessions
+
     # Get sessions
-    query = query.offset(skip).limit(limit).order_by(PomodoroSession.started_at.desc())
+    query = (
+        select(source).where(filters(source))
+        .offset(skip).limit(limit).order_by(source.c.started_at.desc())
+    )
     result = await db.execute(query)
-    sessions = result.scalars().all()
+    sessions = result.all()
 
     return PomodoroSessionListResponse(sessions=sessions, total=total)
 
@@ -62,13 +125,24 @@ async def list_sessions(
 @router.get("/sessions/{session_id}", response_model=PomodoroSessionResponse)
 async def get_session(
     session_id: int,
+    user_id: str = Depends(get_user_id),
     db: AsyncSession = Depends(get_db),
 ):
     """Get a specific Pomodoro session by ID."""
-    query = select(PomodoroSession).where(PomodoroSession.id == session_id)
+    query = select(PomodoroSession).where(
+        PomodoroSession.id == session_id,
+        PomodoroSession.user_id == user_id,
+    )
     result = await db.execute(query)
     session = result.scalar_one_or_none()
 
+    if not session:
+        archived_query = select(ArchivedPomodoroSession).where(
+            ArchivedPomodoroSession.id == session_id,
+            ArchivedPomodoroSession.user_id == user_id,
+        )
+        session = (await db.execute(archived_query)).scalar_one_or_none()
+
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
@@ -77,11 +151,13 @@ async def get_session(
 
 @router.get("/active", response_model=Optional[PomodoroSessionResponse])
 async def get_active_session(
+    user_id: str = Depends(get_user_id),
     db: AsyncSession = Depends(get_db),
 ):
     """Get the currently active Pomodoro session, if any."""
     query = select(PomodoroSession).where(
-        PomodoroSession.status == SessionStatus.ACTIVE
+        PomodoroSession.status == SessionStatus.ACTIVE,
+        PomodoroSession.user_id == user_id,
     ).order_by(PomodoroSession.started_at.desc())
     result = await db.execute(query)
     session = result.scalars().first()
@@ -92,6 +168,7 @@ async def get_active_session(
 @router.post("/sessions", response_model=PomodoroSessionResponse, status_code=201)
 async def start_session(
     session_data: PomodoroSessionCreate,
+    user_id: str = Depends(get_user_id),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -99,26 +176,40 @@ async def start_session(
 
     Automatically marks any active sessions as interrupted before starting new one.
     """
-    # Check for existing active sessions (may be multiple due to data corruption)
-    active_query = select(PomodoroSession).where(
-        PomodoroSession.status == SessionStatus.ACTIVE
-    )
-    active_result = await db.execute(active_query)
-    active_sessions = active_result.scalars().all()
-
-    # Interrupt all active sessions
-    for active_session in active_sessions:
-        active_session.status = SessionStatus.INTERRUPTED
-        active_session.ended_at = datetime.utcnow()
-        active_session.actual_duration = int(
-            (active_session.ended_at - active_session.started_at).total_seconds()
+    interrupted: list[PomodoroSession] = []
+
+    async def apply(tx: AsyncSession) -> PomodoroSession:
+        # Check for existing active sessions (may be multiple due to data corruption)
+        active_query = select(PomodoroSession).where(
+            PomodoroSession.status == SessionStatus.ACTIVE,
+            PomodoroSession.user_id == user_id,
         )
+        active_result = await tx.execute(active_query)
+        active_sessions = active_result.scalars().all()
+
+        # Interrupt all active sessions
+        for active_session in active_sessions:
+            before = contribution(active_session)
+            active_session.status = SessionStatus.INTERRUPTED
+            active_session.ended_at = datetime.utcnow()
+            active_session.actual_duration = int(
+                (active_session.ended_at - active_session.started_at).total_seconds()
+            )
+            await apply_session_change(tx, user_id, active_session, before)
+
+        # Create new session
+        session = PomodoroSession(**session_data.model_dump(), user_id=user_id)
+        tx.add(session)
+        await tx.flush()
+        await tx.refresh(session)
+        await refresh_daily_totals(
+            tx, user_id, session.started_at, *(active.started_at for active in active_sessions)
+        )
+        interrupted.extend(active_sessions)
+        return session
 
-    # Create new session
-    session = PomodoroSession(**session_data.model_dump())
-    db.add(session)
-    await db.commit()
-    await db.refresh(session)
+    session = await run_write(db, apply)
+    _sessions_written(user_id, session, *interrupted)
     return session
 
 
@@ -126,147 +217,300 @@ async def start_session(
 async def update_session(
     session_id: int,
     session_data: PomodoroSessionUpdate,
+    user_id: str = Depends(get_user_id),
     db: AsyncSession = Depends(get_db),
 ):
     """Update a Pomodoro session."""
-    query = select(PomodoroSession).where(PomodoroSession.id == session_id)
-    result = await db.execute(query)
-    session = result.scalar_one_or_none()
-
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    # Update fields
-    update_data = session_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(session, field, value)
-
-    await db.commit()
-    await db.refresh(session)
+    async def apply(tx: AsyncSession) -> PomodoroSession:
+        query = select(PomodoroSession).where(
+            PomodoroSession.id == session_id,
+            PomodoroSession.user_id == user_id,
+        )
+        result = await tx.execute(query)
+        session = result.scalar_one_or_none()
+
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+
+        # Update fields
+        before = contribution(session)
+        update_data = session_data.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(session, field, value)
+
+        await apply_session_change(tx, user_id, session, before)
+        await tx.flush()
+        await tx.refresh(session)
+        await refresh_daily_totals(tx, user_id, session.started_at)
+        return session
+
+    session = await run_write(db, apply)
+    _sessions_written(user_id, session)
     return session
 
 
 @router.post("/sessions/{session_id}/complete", response_model=PomodoroSessionResponse)
 async def complete_session(
     session_id: int,
+    user_id: str = Depends(get_user_id),
     db: AsyncSession = Depends(get_db),
 ):
     """Mark a Pomodoro session as completed."""
-    query = select(PomodoroSession).where(PomodoroSession.id == session_id)
-    result = await db.execute(query)
-    session = result.scalar_one_or_none()
-
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+    async def apply(tx: AsyncSession) -> Tuple[PomodoroSession, bool]:
+        query = select(PomodoroSession).where(
+            PomodoroSession.id == session_id,
+            PomodoroSession.user_id == user_id,
+        )
+        result = await tx.execute(query)
+        session = result.scalar_one_or_none()
 
-    session.status = SessionStatus.COMPLETED
-    session.ended_at = datetime.utcnow()
-    session.actual_duration = int(
-        (session.ended_at - session.started_at).total_seconds()
-    )
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
 
-    await db.commit()
-    await db.refresh(session)
+        before = contribution(session)
+        session.status = SessionStatus.COMPLETED
+        session.ended_at = datetime.utcnow()
+        session.actual_duration = int(
+            (session.ended_at - session.started_at).total_seconds()
+        )
+        await apply_session_change(tx, user_id, session, before)
+
+        await tx.flush()
+        await tx.refresh(session)
+        await refresh_daily_totals(tx, user_id, session.started_at)
+        queued = await enqueue_session(tx, user_id, session)
+        return session, queued
+
+    session, queued = await run_write(db, apply)
+    _sessions_written(user_id, session)
+    if queued:
+        outbox_written()
     return session
 
 
 @router.post("/sessions/{session_id}/interrupt", response_model=PomodoroSessionResponse)
 async def interrupt_session(
     session_id: int,
+    user_id: str = Depends(get_user_id),
     db: AsyncSession = Depends(get_db),
 ):
     """Mark a Pomodoro session as interrupted."""
-    query = select(PomodoroSession).where(PomodoroSession.id == session_id)
-    result = await db.execute(query)
-    session = result.scalar_one_or_none()
+    async def apply(tx: AsyncSession) -> PomodoroSession:
+        query = select(PomodoroSession).where(
+            PomodoroSession.id == session_id,
+            PomodoroSession.user_id == user_id,
+        )
+        result = await tx.execute(query)
+        session = result.scalar_one_or_none()
 
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
 
-    session.status = SessionStatus.INTERRUPTED
-    session.ended_at = datetime.utcnow()
-    session.actual_duration = int(
-        (session.ended_at - session.started_at).total_seconds()
-    )
-    session.interruptions += 1
+        before = contribution(session)
+        session.status = SessionStatus.INTERRUPTED
+        session.ended_at = datetime.utcnow()
+        session.actual_duration = int(
+            (session.ended_at - session.started_at).total_seconds()
+        )
+        session.interruptions += 1
+        await apply_session_change(tx, user_id, session, before)
 
-    await db.commit()
-    await db.refresh(session)
+        await tx.flush()
+        await tx.refresh(session)
+        await refresh_daily_totals(tx, user_id, session.started_at)
+        return session
+
+    session = await run_write(db, apply)
+    _sessions_written(user_id, session)
     return session
 
 
+@router.get("/stats/timeseries", response_model=PomodoroTimeseriesResponse)
+async def get_stats_timeseries(
+    bucket: Bucket = "day",
+    start: Optional[Union[datetime, date]] = Query(None, alias="from"),
+    end: Optional[Union[datetime, date]] = Query(None, alias="to"),
+    tz: Optional[str] = None,
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get Pomodoro statistics per hour, day, week or month.
+
+    Every bucket in the range is returned, including empty ones.
+
+    - **bucket**: ``hour``, ``day``, ``week`` (ISO, Monday first) or ``month``
+    - **from**: Range start, date or datetime (defaults to a bucket-dependent span before ``to``)
+    - **to**: Range end, exclusive, date or datetime (defaults to now)
+    - **tz**: IANA timezone the buckets align to; also applies to naive ``from``/``to``
+    """
+    try:
+        zone = resolve_timezone(tz)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def to_utc(value: Union[datetime, date]) -> datetime:
+        if not isinstance(value, datetime):
+            value = datetime.combine(value, datetime.min.time())
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=zone)
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+    end_utc = to_utc(end) if end else datetime.utcnow()
+    start_utc = to_utc(start) if start else default_start(end_utc, bucket)
+    if start_utc >= end_utc:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+
+    try:
+        rows = await session_timeseries(db, user_id, bucket, start_utc, end_utc, zone)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def local(value: datetime) -> datetime:
+        return value.replace(tzinfo=timezone.utc).astimezone(zone)
+
+    return PomodoroTimeseriesResponse(
+        bucket=bucket,
+        timezone=zone.key,
+        buckets=[
+            PomodoroTimeseriesBucket(
+                start=local(bucket_start), end=local(bucket_end), **dict(zip(FIELDS, values))
+            )
+            for bucket_start, bucket_end, values in rows
+        ],
+    )
+
+
+@router.get("/heatmap", response_model=PomodoroHeatmapResponse)
+async def get_heatmap(
+    year: Optional[int] = Query(None, ge=1970, le=9999),
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get daily focus minutes for a contributions-style calendar.
+
+    Read from the precomputed per-day totals, never from raw sessions.
+
+    - **year**: Calendar year to return (defaults to the past 365 days)
+    """
+    zone = resolve_timezone(None)
+    if year:
+        start = date(year, 1, 1)
+        days = (date(year + 1, 1, 1) - start).days
+    else:
+        days = 365
+        start = local_day(datetime.utcnow(), zone) - timedelta(days=days - 1)
+
+    minutes = await daily_focus_minutes(db, user_id, start, days)
+    return PomodoroHeatmapResponse(
+        start=start,
+        days=days,
+        timezone=zone.key,
+        minutes=encode_uint16(minutes),
+        quantiles=intensity_quantiles(minutes),
+        total_minutes=sum(minutes),
+        active_days=sum(1 for value in minutes if value),
+    )
+
+
 @router.get("/stats", response_model=PomodoroStatsResponse)
 async def get_stats(
+    user_id: str = Depends(get_user_id),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get Pomodoro session statistics."""
+    """
+    Get Pomodoro session statistics.
+
+    All-time totals add the carried-forward aggregates of archived sessions
+    to the hot table; windowed figures only read the archive when their
+    window reaches into it.
+    """
+    owned = PomodoroSession.user_id == user_id
+    carried = await archive_totals(db, user_id)
+
+    def archived(name: str) -> int:
+        return getattr(carried, name) if carried else 0
+
     # Total sessions
-    total_query = select(func.count()).select_from(PomodoroSession)
+    total_query = select(func.count()).select_from(PomodoroSession).where(owned)
     total_result = await db.execute(total_query)
-    total_sessions = total_result.scalar_one()
+    total_sessions = total_result.scalar_one() + archived("sessions")
 
     # Completed sessions
     completed_query = select(func.count()).select_from(PomodoroSession).where(
-        PomodoroSession.status == SessionStatus.COMPLETED
+        owned,
+        PomodoroSession.status == SessionStatus.COMPLETED,
     )
     completed_result = await db.execute(completed_query)
-    completed_sessions = completed_result.scalar_one()
+    completed_sessions = completed_result.scalar_one() + archived("completed_sessions")
 
     # Total work and break time
     work_query = select(func.sum(PomodoroSession.actual_duration)).where(
         and_(
+            owned,
             PomodoroSession.session_type == SessionType.WORK,
             PomodoroSession.actual_duration.isnot(None)
         )
     )
     work_result = await db.execute(work_query)
-    total_work_time = work_result.scalar_one() or 0
+    total_work_time = (work_result.scalar_one() or 0) + archived("work_time")
 
     break_query = select(func.sum(PomodoroSession.actual_duration)).where(
         and_(
+            owned,
             PomodoroSession.session_type.in_([SessionType.SHORT_BREAK, SessionType.LONG_BREAK]),
             PomodoroSession.actual_duration.isnot(None)
         )
     )
     break_result = await db.execute(break_query)
-    total_break_time = break_result.scalar_one() or 0
+    total_break_time = (break_result.scalar_one() or 0) + archived("break_time")
 
     # Average session duration
-    avg_query = select(func.avg(PomodoroSession.actual_duration)).where(
-        PomodoroSession.actual_duration.isnot(None)
-    )
-    avg_result = await db.execute(avg_query)
-    average_duration = avg_result.scalar_one() or 0.0
+    avg_query = select(
+        func.coalesce(func.sum(PomodoroSession.actual_duration), 0),
+        func.count(PomodoroSession.actual_duration),
+    ).where(owned)
+    duration_sum, duration_count = (await db.execute(avg_query)).one()
+    duration_sum += archived("duration_sum")
+    duration_count += archived("duration_count")
+    average_duration = duration_sum / duration_count if duration_count else 0.0
 
     # Interruptions
-    interruptions_query = select(func.sum(PomodoroSession.interruptions)).select_from(PomodoroSession)
+    interruptions_query = select(func.sum(PomodoroSession.interruptions)).where(owned)
     interruptions_result = await db.execute(interruptions_query)
-    interruptions_count = interruptions_result.scalar_one() or 0
-
-    # Today's sessions
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    today_query = select(func.count()).select_from(PomodoroSession).where(
-        PomodoroSession.started_at >= today_start
+    interruptions_count = (interruptions_result.scalar_one() or 0) + archived("interruptions")
+
+    # Today's sessions (local day in the stats timezone)
+    zone = resolve_timezone(None)
+    today = local_day(datetime.utcnow(), zone)
+    today_source = await session_source(db, user_id, day_bounds(today, zone)[0])
+    today_query = select(func.count()).select_from(today_source).where(
+        today_source.c.user_id == user_id,
+        today_source.c.day == today,
     )
     today_result = await db.execute(today_query)
     today_sessions = today_result.scalar_one()
 
     # Today's work time
-    today_work_query = select(func.sum(PomodoroSession.actual_duration)).where(
+    today_work_query = select(func.sum(today_source.c.actual_duration)).where(
         and_(
-            PomodoroSession.session_type == SessionType.WORK,
-            PomodoroSession.started_at >= today_start,
-            PomodoroSession.actual_duration.isnot(None)
+            today_source.c.user_id == user_id,
+            today_source.c.day == today,
+            today_source.c.session_type == SessionType.WORK,
+            today_source.c.actual_duration.isnot(None)
         )
     )
     today_work_result = await db.execute(today_work_query)
     today_work_time = today_work_result.scalar_one() or 0
 
     # Current streak (consecutive days with at least one session)
-    # Simplified: count sessions in last 7 days
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    streak_query = select(func.count(func.distinct(func.date(PomodoroSession.started_at)))).where(
-        PomodoroSession.started_at >= week_ago
+    # Simplified: count active days in the last week
+    week_ago = today - timedelta(days=7)
+    week = await session_source(db, user_id, day_bounds(week_ago, zone)[0])
+    streak_query = select(func.count(func.distinct(week.c.day))).where(
+        week.c.user_id == user_id,
+        week.c.day >= week_ago,
     )
     streak_result = await db.execute(streak_query)
     current_streak = streak_result.scalar_one()
@@ -0,0 +1,67 @@
+"""Incremental sync API endpoint."""
+import heapq
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.database import get_db, get_user_id
+from src.models.pomodoro import PomodoroSession
+from src.models.sync import SyncTombstone
+from src.models.task import Task
+from src.schemas.pomodoro import PomodoroSessionResponse
+from src.schemas.sync import SyncDeletion, SyncResponse
+from src.schemas.task import TaskResponse
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("", response_model=SyncResponse)
+async def get_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get tasks, sessions and deletions changed after version ``since``.
+
+    Changes come in version order, at most ``limit`` per page; keep calling
+    with the returned ``version`` until ``has_more`` is false.
+
+    - **since**: Last version the client has seen (0 for a full sync)
+    - **limit**: Maximum number of changes per page
+    """
+    # Each source is read from its (user_id, row_version) index, capped at the
+    # page size; versions are unique across sources, so the merged page ends
+    # at the limit-th smallest one.
+    pages = []
+    for model in (Task, PomodoroSession, SyncTombstone):
+        result = await db.execute(
+            select(model)
+            .where(model.user_id == user_id, model.row_version > since)
+            .order_by(model.row_version)
+            .limit(limit + 1)
+        )
+        pages.append(result.scalars().all())
+
+    versions = list(heapq.merge(*([row.row_version for row in page] for page in pages)))
+    has_more = len(versions) > limit
+    version = versions[min(limit, len(versions)) - 1] if versions else since
+    tasks, sessions, tombstones = (
+        [row for row in page if row.row_version <= version] for page in pages
+    )
+
+    return SyncResponse(
+        version=version,
+        has_more=has_more,
+        tasks=[TaskResponse.model_validate(task) for task in tasks],
+        sessions=[PomodoroSessionResponse.model_validate(session) for session in sessions],
+        deleted=[
+            SyncDeletion(
+                entity=tombstone.entity,
+                id=tombstone.entity_id,
+                row_version=tombstone.row_version,
+                deleted_at=tombstone.deleted_at,
+            )
+            for tombstone in tombstones
+        ],
+    )
@@ -1,62 +1,235 @@
 """Task management API endpoints."""
-from typing import Optional
+import base64
+import json
+import re
+from typing import List, Literal, Optional
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from src.core.database import get_db
+from sqlalchemy import select, func, and_, or_, column, literal_column, table
+from src.core.database import get_db, get_user_id
+from src.core.write_batcher import after_commit, run_write
+from src.models.tag import Tag, task_tags
 from src.models.task import Task, TaskStatus
 from src.schemas.task import (
     TaskCreate,
     TaskUpdate,
     TaskResponse,
     TaskListResponse,
+    TaskSearchHit,
+    TaskSearchResponse,
+    TagCount,
+    TagListResponse,
 )
+from src.services.prompt_context import prompt_context
+from src.services.tags import clear_task_tags, normalize_tag, sync_task_tags
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
+def _tasks_written(user_id: str):
+    """Invalidate the cached task section of the user's prompt context once committed."""
+    after_commit(lambda: prompt_context.invalidate(user_id, "tasks"))
+
+
 @router.get("", response_model=TaskListResponse)
 async def list_tasks(
     status: Optional[TaskStatus] = None,
+    tag: Optional[List[str]] = Query(None),
+    tag_mode: Literal["any", "all"] = "any",
+    sort: Literal["created", "priority"] = "created",
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    user_id: str = Depends(get_user_id),
     db: AsyncSession = Depends(get_db),
 ):
     """
     List tasks with optional filtering.
 
     - **status**: Filter by task status
+    - **tag**: Filter by tag (repeatable)
+    - **tag_mode**: Match tasks having ``any`` or ``all`` of the given tags
+    - **sort**: ``created`` (newest first) or ``priority`` (most urgent first)
     - **skip**: Number of tasks to skip (pagination)
     - **limit**: Maximum number of tasks to return
     """
-    query = select(Task)
-
+    conditions = [Task.user_id == user_id]
     if status:
-        query = query.where(Task.status == status)
+        conditions.append(Task.status == status)
+
+    names = sorted({normalize_tag(name) for name in tag or []} - {""})
+    if names:
+        # Resolved through the (tag_id, task_id) index, never by parsing Task.tags
+        tagged = (
+            select(task_tags.c.task_id)
+            .join(Tag, Tag.id == task_tags.c.tag_id)
+            .where(Tag.user_id == user_id, Tag.name.in_(names))
+        )
+        if tag_mode == "all":
+            tagged = tagged.group_by(task_tags.c.task_id).having(
+                func.count(task_tags.c.tag_id) == len(names)
+            )
+        conditions.append(Task.id.in_(tagged))
+
+    query = select(Task).where(and_(*conditions))
 
     # Get total count
-    count_query = select(func.count()).select_from(Task)
-    if status:
-        count_query = count_query.where(Task.status == status)
+    count_query = select(func.count()).select_from(Task).where(and_(*conditions))
     total_result = await db.execute(count_query)
     total = total_result.scalar_one()
 
     # Get tasks
-    query = query.offset(skip).limit(limit).order_by(Task.created_at.desc())
+    if sort == "priority":
+        order = (Task.priority_rank.desc(), Task.created_at)
+    else:
+        order = (Task.created_at.desc(),)
+    query = query.offset(skip).limit(limit).order_by(*order)
     result = await db.execute(query)
     tasks = result.scalars().all()
 
     return TaskListResponse(tasks=tasks, total=total)
 
 
+@router.get("/next", response_model=List[TaskResponse])
+async def next_tasks(
+    n: int = Query(5, ge=1, le=100),
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get the open tasks to work on next.
+
+    Ordered by the precomputed queue score (priority, then fewest pomodoros
+    remaining), oldest first on ties. Served from the
+    ``(user_id, queue_score, created_at)`` index; closed tasks have no score.
+
+    - **n**: Number of tasks to return
+    """
+    query = (
+        select(Task)
+        .where(Task.user_id == user_id, Task.queue_score.is_not(None))
+        .order_by(Task.queue_score.desc(), Task.created_at)
+        .limit(n)
+    )
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+@router.get("/tags", response_model=TagListResponse)
+async def list_tags(
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """List tags in use with the number of tasks carrying each."""
+    query = (
+        select(Tag.name, func.count(task_tags.c.task_id).label("count"))
+        .join(task_tags, task_tags.c.tag_id == Tag.id)
+        .where(Tag.user_id == user_id)
+        .group_by(Tag.id)
+        .order_by(func.count(task_tags.c.task_id).desc(), Tag.name)
+    )
+    result = await db.execute(query)
+    return TagListResponse(tags=[TagCount(name=name, count=count) for name, count in result.all()])
+
+
+tasks_fts = table("tasks_fts", column("rowid"))
+
+# Column weights for bm25: title matches count most, then tags
+SEARCH_WEIGHTS = (10.0, 1.0, 5.0)
+
+
+def _fts_query(q: str) -> Optional[str]:
+    """Turn free text into an FTS5 query of quoted prefix terms (AND-ed)."""
+    terms = re.findall(r"\w+", q)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _encode_cursor(score: float, task_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([score, task_id]).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        score, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(score), int(task_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/search", response_model=TaskSearchResponse)
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    status: Optional[List[TaskStatus]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Full-text search over task titles, descriptions and tags.
+
+    - **q**: Search text; every word is matched as a prefix
+    - **status**: Only return tasks in these statuses (repeatable)
+    - **limit**: Maximum number of results to return
+    - **cursor**: ``next_cursor`` from the previous page
+    """
+    match = _fts_query(q)
+    if match is None:
+        return TaskSearchResponse(results=[])
+
+    score = func.bm25(literal_column("tasks_fts"), *SEARCH_WEIGHTS)
+    snippet = func.snippet(literal_column("tasks_fts"), -1, "<mark>", "</mark>", "…", 12)
+
+    conditions = [literal_column("tasks_fts").op("MATCH")(match), Task.user_id == user_id]
+    if status:
+        conditions.append(Task.status.in_(status))
+
+    ranked = (
+        select(Task.id.label("id"), score.label("score"), snippet.label("snippet"))
+        .select_from(tasks_fts.join(Task, Task.id == tasks_fts.c.rowid))
+        .where(and_(*conditions))
+        .subquery()
+    )
+    query = select(ranked.c.id, ranked.c.score, ranked.c.snippet)
+
+    # Keyset paging on (score, id)
+    if cursor:
+        last_score, last_id = _decode_cursor(cursor)
+        query = query.where(or_(
+            ranked.c.score > last_score,
+            and_(ranked.c.score == last_score, ranked.c.id > last_id),
+        ))
+
+    query = query.order_by(ranked.c.score, ranked.c.id).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].score, rows[-1].id)
+
+    tasks_result = await db.execute(select(Task).where(Task.id.in_([row.id for row in rows])))
+    tasks_by_id = {task.id: task for task in tasks_result.scalars().all()}
+
+    return TaskSearchResponse(
+        results=[
+            TaskSearchHit(task=tasks_by_id[row.id], score=row.score, snippet=row.snippet)
+            for row in rows
+        ],
+        next_cursor=next_cursor,
+    )
+
+
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: int,
+    user_id: str = Depends(get_user_id),
     db: AsyncSession = Depends(get_db),
 ):
     """Get a specific task by ID."""
-    query = select(Task).where(Task.id == task_id)
+    query = select(Task).where(Task.id == task_id, Task.user_id == user_id)
     result = await db.execute(query)
     task = result.scalar_one_or_none()
 
@@ -69,13 +242,20 @@ async def get_task(
 @router.post("", response_model=TaskResponse, status_code=201)
 async def create_task(
     task_data: TaskCreate,
+    user_id: str = Depends(get_user_id),
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new task."""
-    task = Task(**task_data.model_dump())
-    db.add(task)
-    await db.commit()
-    await db.refresh(task)
+    async def apply(tx: AsyncSession) -> Task:
+        task = Task(**task_data.model_dump(), user_id=user_id)
+        tx.add(task)
+        await tx.flush()
+        await sync_task_tags(tx, user_id, task.id, task.tags)
+        await tx.refresh(task)
+        return task
+
+    task = await run_write(db, apply)
+    _tasks_written(user_id)
     return task
 
 
@@ -83,94 +263,123 @@ async def create_task(
 async def update_task(
     task_id: int,
     task_data: TaskUpdate,
+    user_id: str = Depends(get_user_id),
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing task."""
-    query = select(Task).where(Task.id == task_id)
-    result = await db.execute(query)
-    task = result.scalar_one_or_none()
-
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    # Update fields
-    update_data = task_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(task, field, value)
-
-    # Set completed_at if status changed to completed
-    if task_data.status == TaskStatus.COMPLETED and not task.completed_at:
-        task.completed_at = datetime.utcnow()
-    elif task_data.status and task_data.status != TaskStatus.COMPLETED:
-        task.completed_at = None
-
-    task.updated_at = datetime.utcnow()
-    await db.commit()
-    await db.refresh(task)
+    async def apply(tx: AsyncSession) -> Task:
+        query = select(Task).where(Task.id == task_id, Task.user_id == user_id)
+        result = await tx.execute(query)
+        task = result.scalar_one_or_none()
+
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+
+        # Update fields
+        update_data = task_data.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(task, field, value)
+
+        # Set completed_at if status changed to completed
+        if task_data.status == TaskStatus.COMPLETED and not task.completed_at:
+            task.completed_at = datetime.utcnow()
+        elif task_data.status and task_data.status != TaskStatus.COMPLETED:
+            task.completed_at = None
+
+        task.updated_at = datetime.utcnow()
+        await tx.flush()
+        if "tags" in update_data:
+            await sync_task_tags(tx, user_id, task.id, task.tags)
+        await tx.refresh(task)
+        return task
+
+    task = await run_write(db, apply)
+    _tasks_written(user_id)
     return task
 
 
 @router.delete("/{task_id}", status_code=204)
 async def delete_task(
     task_id: int,
+    user_id: str = Depends(get_user_id),
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a task."""
-    query = select(Task).where(Task.id == task_id)
-    result = await db.execute(query)
-    task = result.scalar_one_or_none()
+    async def apply(tx: AsyncSession) -> None:
+        query = select(Task).where(Task.id == task_id, Task.user_id == user_id)
+        result = await tx.execute(query)
+        task = result.scalar_one_or_none()
 
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+
+        await clear_task_tags(tx, task.id)
+        await tx.delete(task)
+        await tx.flush()
 
-    await db.delete(task)
-    await db.commit()
+    await run_write(db, apply)
+    _tasks_written(user_id)
     return None
 
 
 @router.post("/{task_id}/complete", response_model=TaskResponse)
 async def complete_task(
     task_id: int,
+    user_id: str = Depends(get_user_id),
     db: AsyncSession = Depends(get_db),
 ):
     """Mark a task as completed."""
-    query = select(Task).where(Task.id == task_id)
-    result = await db.execute(query)
-    task = result.scalar_one_or_none()
+    async def apply(tx: AsyncSession) -> Task:
+        query = select(Task).where(Task.id == task_id, Task.user_id == user_id)
+        result = await tx.execute(query)
+        task = result.scalar_one_or_none()
 
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
 
-    task.status = TaskStatus.COMPLETED
-    task.completed_at = datetime.utcnow()
-    task.updated_at = datetime.utcnow()
+        task.status = TaskStatus.COMPLETED
+        task.completed_at = datetime.utcnow()
+        task.updated_at = datetime.utcnow()
+
+        await tx.flush()
+        await tx.refresh(task)
+        return task
 
-    await db.commit()
-    await db.refresh(task)
+    task = await run_write(db, apply)
+    _tasks_written(user_id)
     return task
 
 
 @router.post("/{task_id}/increment-pomodoro", response_model=TaskResponse)
 async def increment_pomodoro(
     task_id: int,
+    user_id: str = Depends(get_user_id),
     db: AsyncSession = Depends(get_db),
 ):
     """Increment the completed pomodoros count for a task."""
-    query = select(Task).where(Task.id == task_id)
-    result = await db.execute(query)
-    task = result.scalar_one_or_none()
-
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    task.completed_pomodoros += 1
-    task.updated_at = datetime.utcnow()
-
-    # Auto-complete if estimated pomodoros reached
-    if task.completed_pomodoros >= task.estimated_pomodoros and task.status != TaskStatus.COMPLETED:
-        task.status = TaskStatus.COMPLETED
-        task.completed_at = datetime.utcnow()
-
-    await db.commit()
-    await db.refresh(task)
+    async def apply(tx: AsyncSession) -> Task:
+        query = select(Task).where(Task.id == task_id, Task.user_id == user_id)
+        result = await tx.execute(query)
+        task = result.scalar_one_or_none()
+
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+
+        task.completed_pomodoros += 1
+        task.updated_at = datetime.utcnow()
+
+        # Auto-complete if estimated pomodoros reached
+        if (
+            task.completed_pomodoros >= task.estimated_pomodoros
+            and task.status != TaskStatus.COMPLETED
+        ):
+            task.status = TaskStatus.COMPLETED
+            task.completed_at = datetime.utcnow()
+
+        await tx.flush()
+        await tx.refresh(task)
+        return task
+
+    task = await run_write(db, apply)
+    _tasks_written(user_id)
     return task
@@ -0,0 +1,202 @@
+"""Admission control for API requests.
+
+The app runs as a single uvicorn worker on SQLite, so under overload
+requests would otherwise pile up behind the database until they time out.
+Read and write routes each get a concurrency limit and a bounded FIFO
+queue; a request that finds its queue full, or waits longer than the
+queue timeout, gets an immediate ``503`` with ``Retry-After`` instead.
+"""
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.config import settings
+from src.core.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_REJECTED,
+    ADMISSION_WAIT,
+)
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class Overloaded(Exception):
+    """A request could not be admitted; ``reason`` is ``queue_full`` or ``timeout``."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdmissionGate:
+    """
+    Concurrency limit with a bounded FIFO queue for one lane of requests.
+
+    A released slot is handed directly to the oldest waiter, so queued
+    requests are admitted in arrival order.
+    """
+
+    def __init__(self, lane: str, limit: int, max_queue: int, timeout: float):
+        self.lane = lane
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.in_flight = 0
+        self.rejected = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _update_gauges(self):
+        ADMISSION_QUEUE_DEPTH.labels(lane=self.lane).set(len(self._waiters))
+        ADMISSION_IN_FLIGHT.labels(lane=self.lane).set(self.in_flight)
+
+    def _reject(self, reason: str) -> Overloaded:
+        self.rejected += 1
+        ADMISSION_REJECTED.labels(lane=self.lane, reason=reason).inc()
+        return Overloaded(reason)
+
+    async def acquire(self) -> float:
+        """
+        Wait for a slot.
+
+        Returns:
+            float: Seconds spent queued
+
+        Raises:
+            Overloaded: If the queue is full or the wait exceeds the timeout
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self._update_gauges()
+            ADMISSION_WAIT.labels(lane=self.lane).observe(0)
+            return 0.0
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_gauges()
+        start = time.monotonic()
+        try:
+            # Returns normally if the slot was handed over just as the timeout hit
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            raise self._reject("timeout")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._update_gauges()
+
+        waited = time.monotonic() - start
+        ADMISSION_WAIT.labels(lane=self.lane).observe(waited)
+        return waited
+
+    def release(self):
+        """Give the slot to the oldest waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update_gauges()
+                return
+        self.in_flight -= 1
+        self._update_gauges()
+
+    def snapshot(self) -> Dict[str, int]:
+        """Current limits, occupancy and rejections."""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionController:
+    """Read and write gates for the API, configured from settings."""
+
+    def __init__(self, read: Optional[AdmissionGate] = None, write: Optional[AdmissionGate] = None):
+        self.read = read or AdmissionGate(
+            "read",
+            settings.admission_read_limit,
+            settings.admission_read_queue,
+            settings.admission_queue_timeout,
+        )
+        self.write = write or AdmissionGate(
+            "write",
+            settings.admission_write_limit,
+            settings.admission_write_queue,
+            settings.admission_queue_timeout,
+        )
+
+    def gate_for(self, method: str) -> AdmissionGate:
+        """Gate for a request method (reads or writes)."""
+        return self.read if method in READ_METHODS else self.write
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Snapshot of both gates, for ``/health/detailed``."""
+        return {"read": self.read.snapshot(), "write": self.write.snapshot()}
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware admitting ``/api`` requests through the controller's gates.
+
+    Health, readiness and metrics endpoints are never queued.
+    """
+
+    def __init__(self, app: ASGIApp, controller: "AdmissionController", prefix: str = "/api"):
+        self.app = app
+        self.controller = controller
+        self.prefix = prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        gate = self.controller.gate_for(scope["method"])
+        try:
+            await gate.acquire()
+        except Overloaded as e:
+            await self._overloaded(send, gate, e.reason)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
+
+    async def _overloaded(self, send: Send, gate: AdmissionGate, reason: str):
+        body = json.dumps(
+            {"detail": "Server is overloaded, retry later", "reason": reason}
+        ).encode()
+        retry_after = max(1, math.ceil(settings.admission_retry_after))
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# Global controller, installed as middleware by the application
+admission_controller = AdmissionController()
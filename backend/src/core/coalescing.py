@@ -0,0 +1,172 @@
+"""Single-flight coalescing of identical concurrent GET requests.
+
+When a focus session ends, every open tab and device asks for the same
+stats at once. For the configured routes, concurrent requests with the
+same user, path and normalized query share one in-flight computation and
+its serialized response.
+
+A request only joins a flight that started at most
+``settings.coalesce_max_age`` seconds ago and in the same write
+generation: every non-GET request of the user bumps the generation when it
+arrives and again when it finishes, so a read that arrives after a write
+has committed never receives a response computed before it.
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.config import settings
+from src.core.metrics import COALESCED_REQUESTS
+
+FlightKey = Tuple[str, str, str]
+
+
+@dataclass
+class Flight:
+    """One in-flight computation and the requests waiting on it."""
+    generation: int
+    started: float = field(default_factory=time.monotonic)
+    result: "asyncio.Future[List[Message]]" = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+
+def _user_of(scope: Scope) -> str:
+    for name, value in scope["headers"]:
+        if name == b"x-user-id":
+            return value.decode("latin-1")
+    return settings.default_user_id
+
+
+def _copy(message: Message) -> Message:
+    """Copy of a captured message (middleware outside may edit its headers)."""
+    if "headers" not in message:
+        return dict(message)
+    return {**message, "headers": list(message["headers"])}
+
+
+def _normalize_query(query_string: bytes) -> str:
+    return urlencode(sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)))
+
+
+class RequestCoalescer:
+    """Tracks in-flight GETs and per-user write generations."""
+
+    def __init__(self, paths: Sequence[str], max_age: float):
+        self.paths = frozenset(paths)
+        self.max_age = max_age
+        self._flights: Dict[FlightKey, Flight] = {}
+        self._generations: Dict[str, int] = {}
+
+    def generation(self, user_id: str) -> int:
+        """Number of write boundaries seen for the user."""
+        return self._generations.get(user_id, 0)
+
+    def bump(self, user_id: str):
+        """Mark the user's data as changing; later reads start fresh flights."""
+        self._generations[user_id] = self.generation(user_id) + 1
+
+    @contextmanager
+    def writing(self, user_id: str) -> Iterator[None]:
+        """Bump the user's generation around a write, when it starts and ends."""
+        self.bump(user_id)
+        try:
+            yield
+        finally:
+            self.bump(user_id)
+
+    def join(self, key: FlightKey, user_id: str) -> Tuple[Flight, bool]:
+        """
+        Find a flight to join or start a new one.
+
+        Returns:
+            tuple: The flight and whether the caller leads it
+        """
+        generation = self.generation(user_id)
+        flight = self._flights.get(key)
+        if (
+            flight is not None
+            and not flight.result.done()
+            and flight.generation == generation
+            and time.monotonic() - flight.started <= self.max_age
+        ):
+            return flight, False
+        flight = Flight(generation=generation)
+        self._flights[key] = flight
+        return flight, True
+
+    def finish(self, key: FlightKey, flight: Flight):
+        """Stop new requests from joining a completed flight."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+class CoalescingMiddleware:
+    """ASGI middleware sharing responses between identical concurrent GETs."""
+
+    def __init__(self, app: ASGIApp, coalescer: RequestCoalescer):
+        self.app = app
+        self.coalescer = coalescer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] != "GET":
+            with self.coalescer.writing(_user_of(scope)):
+                await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path not in self.coalescer.paths:
+            await self.app(scope, receive, send)
+            return
+
+        user_id = _user_of(scope)
+        key = (user_id, path, _normalize_query(scope["query_string"]))
+        flight, leader = self.coalescer.join(key, user_id)
+
+        if not leader:
+            try:
+                messages = await asyncio.shield(flight.result)
+            except Exception:
+                # The leader failed; compute this response independently
+                messages = None
+            if messages is not None:
+                COALESCED_REQUESTS.labels(path=path, role="follower").inc()
+                for message in messages:
+                    await send(_copy(message))
+                return
+            await self.app(scope, receive, send)
+            return
+
+        COALESCED_REQUESTS.labels(path=path, role="leader").inc()
+        messages: List[Message] = []
+
+        async def capture(message: Message):
+            messages.append(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        except BaseException as e:
+            # Followers fall back to computing their own response
+            error = e if isinstance(e, Exception) else RuntimeError("Leader request cancelled")
+            flight.result.set_exception(error)
+            flight.result.exception()  # retrieved, even when nobody was waiting
+            raise
+        finally:
+            self.coalescer.finish(key, flight)
+
+        flight.result.set_result(messages)
+        for message in messages:
+            await send(_copy(message))
+
+
+# Global coalescer, installed as middleware by the application
+request_coalescer = RequestCoalescer(settings.coalesce_paths, settings.coalesce_max_age)
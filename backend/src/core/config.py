@@ -27,12 +27,33 @@ class Settings(BaseSettings):
         env="DATABASE_URL"
     )
 
+    # Per-user data partitioning (one SQLite file per user when enabled)
+    default_user_id: str = Field(default="default", env="DEFAULT_USER_ID")
+    db_sharding_enabled: bool = Field(default=False, env="DB_SHARDING_ENABLED")
+    db_shard_dir: str = Field(default="/app/data/shards", env="DB_SHARD_DIR")
+    db_shard_max_open: int = Field(default=32, env="DB_SHARD_MAX_OPEN")
+    db_shard_idle_timeout: float = Field(default=300.0, env="DB_SHARD_IDLE_TIMEOUT")  # seconds
+
+    # Group commit of concurrent writes
+    write_batching_enabled: bool = Field(default=False, env="WRITE_BATCHING_ENABLED")
+    write_batch_window_ms: float = Field(default=5.0, env="WRITE_BATCH_WINDOW_MS")
+    write_batch_max_ops: int = Field(default=64, env="WRITE_BATCH_MAX_OPS")
+
     # Redis
     redis_url: str = Field(
         default="redis://redis:6379",
         env="REDIS_URL"
     )
     redis_enabled: bool = True
+    redis_max_connections: int = Field(default=10, env="REDIS_MAX_CONNECTIONS")
+    redis_socket_timeout: float = Field(default=2.0, env="REDIS_SOCKET_TIMEOUT")  # seconds
+
+    # Health checks (per-check timeouts in seconds)
+    health_check_database_timeout: float = Field(default=2.0, env="HEALTH_CHECK_DATABASE_TIMEOUT")
+    health_check_redis_timeout: float = Field(default=1.0, env="HEALTH_CHECK_REDIS_TIMEOUT")
+    health_check_obsidian_timeout: float = Field(default=1.0, env="HEALTH_CHECK_OBSIDIAN_TIMEOUT")
+    health_monitor_interval: float = Field(default=5.0, env="HEALTH_MONITOR_INTERVAL")
+    health_max_staleness: float = Field(default=15.0, env="HEALTH_MAX_STALENESS")
 
     # Obsidian
     obsidian_vault_path: Optional[str] = Field(
@@ -40,11 +61,69 @@ class Settings(BaseSettings):
         env="OBSIDIAN_VAULT_PATH"
     )
     obsidian_sync_enabled: bool = Field(default=False, env="OBSIDIAN_SYNC_ENABLED")
+    # Note parsing for vault import (0 workers: parse in a thread)
+    obsidian_parse_workers: int = Field(default=2, env="OBSIDIAN_PARSE_WORKERS")
+    obsidian_parse_chunk_size: int = Field(default=64, env="OBSIDIAN_PARSE_CHUNK_SIZE")
+    # Write-back of completed sessions to daily notes
+    obsidian_daily_notes_folder: str = Field(default="Daily", env="OBSIDIAN_DAILY_NOTES_FOLDER")
+    obsidian_daily_note_format: str = Field(default="%Y-%m-%d", env="OBSIDIAN_DAILY_NOTE_FORMAT")
+    obsidian_daily_note_heading: str = Field(
+        default="## Focus sessions",
+        env="OBSIDIAN_DAILY_NOTE_HEADING"
+    )
+    obsidian_writeback_debounce: float = Field(
+        default=2.0,  # seconds
+        env="OBSIDIAN_WRITEBACK_DEBOUNCE"
+    )
+    obsidian_writeback_retry: float = Field(default=60.0, env="OBSIDIAN_WRITEBACK_RETRY")  # seconds
+    # Filesystem watcher: events are grouped until the vault is quiet for
+    # step ms (at most debounce ms); batches over max_batch paths trigger a
+    # full manifest rescan instead
+    obsidian_watch_enabled: bool = Field(default=True, env="OBSIDIAN_WATCH_ENABLED")
+    obsidian_watch_debounce_ms: int = Field(default=1600, env="OBSIDIAN_WATCH_DEBOUNCE_MS")
+    obsidian_watch_step_ms: int = Field(default=200, env="OBSIDIAN_WATCH_STEP_MS")
+    obsidian_watch_max_batch: int = Field(default=1000, env="OBSIDIAN_WATCH_MAX_BATCH")
+    obsidian_watch_retry: float = Field(default=30.0, env="OBSIDIAN_WATCH_RETRY")  # seconds
+
+    # Background worker (python -m src.worker). When enabled, scheduled and
+    # heavy work runs there and the API only enqueues jobs
+    worker_enabled: bool = Field(default=False, env="WORKER_ENABLED")
+    worker_concurrency: int = Field(default=2, env="WORKER_CONCURRENCY")
+    worker_poll_interval: float = Field(default=1.0, env="WORKER_POLL_INTERVAL")  # seconds
+    # Visibility timeout: a running job whose lease is not renewed in time
+    # is handed to another worker
+    worker_lease_seconds: float = Field(default=60.0, env="WORKER_LEASE_SECONDS")
+    worker_retry_delay: float = Field(
+        default=10.0,  # seconds, doubled per attempt
+        env="WORKER_RETRY_DELAY"
+    )
+    # Finished jobs are deleted after this many days
+    worker_job_retention_days: int = Field(default=7, env="WORKER_JOB_RETENTION_DAYS")
 
     # External APIs
     claude_api_key: Optional[str] = Field(default=None, env="CLAUDE_API_KEY")
+    claude_api_url: str = Field(default="https://api.anthropic.com", env="CLAUDE_API_URL")
+    claude_model: str = Field(default="claude-3-5-sonnet-latest", env="CLAUDE_MODEL")
+    claude_max_tokens: int = Field(default=1024, env="CLAUDE_MAX_TOKENS")
+    claude_request_timeout: float = Field(default=60.0, env="CLAUDE_REQUEST_TIMEOUT")  # seconds
+    # Prompt context (see services.prompt_context)
+    claude_context_token_budget: int = Field(default=2000, env="CLAUDE_CONTEXT_TOKEN_BUDGET")
+    claude_context_session_days: int = Field(default=7, env="CLAUDE_CONTEXT_SESSION_DAYS")
+    claude_context_cache_entries: int = Field(default=1024, env="CLAUDE_CONTEXT_CACHE_ENTRIES")
     github_client_id: Optional[str] = Field(default=None, env="GITHUB_CLIENT_ID")
     github_client_secret: Optional[str] = Field(default=None, env="GITHUB_CLIENT_SECRET")
+    # Issue sync (see services.github_sync); a token raises the rate limit
+    # to 5000 requests/hour, conditional requests answered 304 are free
+    github_token: Optional[str] = Field(default=None, env="GITHUB_TOKEN")
+    github_api_url: str = Field(default="https://api.github.com", env="GITHUB_API_URL")
+    github_sync_enabled: bool = Field(default=False, env="GITHUB_SYNC_ENABLED")
+    github_sync_interval: float = Field(default=300.0, env="GITHUB_SYNC_INTERVAL")  # seconds
+    github_sync_concurrency: int = Field(default=4, env="GITHUB_SYNC_CONCURRENCY")
+    # Repos with at least this many linked issues are polled with one list request
+    github_sync_batch_min: int = Field(default=2, env="GITHUB_SYNC_BATCH_MIN")
+    # Requests kept in hand for other clients of the same token
+    github_rate_limit_reserve: int = Field(default=100, env="GITHUB_RATE_LIMIT_RESERVE")
+    github_request_timeout: float = Field(default=10.0, env="GITHUB_REQUEST_TIMEOUT")  # seconds
 
     # Security
     secret_key: str = Field(
@@ -59,6 +138,52 @@ class Settings(BaseSettings):
     pomodoro_long_break: int = 15
     pomodoro_sessions_until_long_break: int = 4
 
+    # Statistics
+    stats_timezone: str = Field(default="UTC", env="STATS_TIMEZONE")  # default for bucketing
+    stats_cache_max_entries: int = Field(default=100_000, env="STATS_CACHE_MAX_ENTRIES")
+
+    # Session archival (0 days disables it)
+    session_archive_after_days: int = Field(default=0, env="SESSION_ARCHIVE_AFTER_DAYS")
+    session_archive_batch_size: int = Field(default=500, env="SESSION_ARCHIVE_BATCH_SIZE")
+    session_archive_batch_pause: float = Field(
+        default=0.05,  # seconds
+        env="SESSION_ARCHIVE_BATCH_PAUSE"
+    )
+    session_archive_interval: float = Field(
+        default=3600.0,  # seconds
+        env="SESSION_ARCHIVE_INTERVAL"
+    )
+
+    # Online database backups
+    backup_enabled: bool = Field(default=False, env="BACKUP_ENABLED")
+    backup_dir: str = Field(default="/app/data/backups", env="BACKUP_DIR")
+    backup_interval: float = Field(default=86400.0, env="BACKUP_INTERVAL")  # seconds
+    backup_retention: int = Field(default=7, env="BACKUP_RETENTION")  # backup runs kept
+    backup_pages_per_step: int = Field(default=256, env="BACKUP_PAGES_PER_STEP")
+    backup_step_sleep: float = Field(default=0.01, env="BACKUP_STEP_SLEEP")  # seconds
+    # Restarts caused by concurrent writes before a backup copies in one step
+    backup_max_restarts: int = Field(default=3, env="BACKUP_MAX_RESTARTS")
+
+    # Admission control (per-lane concurrency limits and bounded queues)
+    admission_control_enabled: bool = Field(default=True, env="ADMISSION_CONTROL_ENABLED")
+    admission_read_limit: int = Field(default=32, env="ADMISSION_READ_LIMIT")
+    admission_read_queue: int = Field(default=256, env="ADMISSION_READ_QUEUE")
+    admission_write_limit: int = Field(default=8, env="ADMISSION_WRITE_LIMIT")
+    admission_write_queue: int = Field(default=64, env="ADMISSION_WRITE_QUEUE")
+    admission_queue_timeout: float = Field(default=2.0, env="ADMISSION_QUEUE_TIMEOUT")  # seconds
+    admission_retry_after: float = Field(default=1.0, env="ADMISSION_RETRY_AFTER")  # seconds
+
+    # Coalescing of identical concurrent GETs
+    coalesce_enabled: bool = Field(default=True, env="COALESCE_ENABLED")
+    coalesce_paths: list[str] = Field(
+        default=["/api/pomodoro/stats", "/api/pomodoro/active", "/api/tasks"],
+        env="COALESCE_PATHS",
+    )
+    coalesce_max_age: float = Field(default=1.0, env="COALESCE_MAX_AGE")  # seconds
+
+    # POST /api/batch
+    batch_max_requests: int = Field(default=50, env="BATCH_MAX_REQUESTS")
+
     class Config:
         env_file = ".env"
         case_sensitive = False
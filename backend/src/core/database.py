@@ -1,10 +1,20 @@
 """Database configuration and session management."""
 import os
+import re
+import time
+import asyncio
 import logging
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, AsyncIterator, Dict, List, Optional
+from fastapi import Depends, Header, HTTPException
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker,
+)
 from sqlalchemy.orm import declarative_base
 from src.core.config import settings
+from src.core.write_batcher import current_batch, discard_write_batcher
 
 logger = logging.getLogger(__name__)
 
@@ -37,33 +47,319 @@ async_session_maker = async_sessionmaker(
 # Base class for models
 Base = declarative_base()
 
+USER_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+async def get_user_id(x_user_id: Optional[str] = Header(None)) -> str:
+    """
+    Dependency resolving the user that owns the request's data.
+
+    Args:
+        x_user_id: Value of the ``X-User-ID`` header
+
+    Returns:
+        str: User identifier (the configured default when the header is absent)
+    """
+    if x_user_id is None:
+        return settings.default_user_id
+    if not USER_ID_PATTERN.match(x_user_id) or x_user_id.strip(".") == "":
+        raise HTTPException(status_code=400, detail="Invalid X-User-ID header")
+    return x_user_id
+
+
+@dataclass
+class _Shard:
+    """An open shard engine and its bookkeeping."""
+    engine: AsyncEngine
+    session_maker: async_sessionmaker
+    last_used: float = field(default_factory=time.monotonic)
+    active: int = 0
+
+
+class ShardRouter:
+    """
+    Maps each user to their own SQLite database file.
+
+    Engines are opened on first use and kept in an LRU; engines that have
+    been idle longer than ``idle_timeout`` (checked periodically once
+    ``start`` is called) or that fall off the end of the LRU are disposed,
+    unless a session is still using them. Opening a shard (and migrating its
+    schema) happens outside the router lock, so it only delays requests for
+    that user.
+    """
+
+    def __init__(
+        self,
+        shard_dir: str,
+        max_open: int = 32,
+        idle_timeout: float = 300.0,
+        echo: bool = False,
+    ):
+        self.shard_dir = shard_dir
+        self.max_open = max_open
+        self.idle_timeout = idle_timeout
+        self.echo = echo
+        self._shards: "OrderedDict[str, _Shard]" = OrderedDict()
+        # Users whose shard is being opened; resolved when the attempt ends
+        self._opening: Dict[str, asyncio.Future] = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def shard_path(self, user_id: str) -> str:
+        """Return the SQLite file path for a user's shard."""
+        return os.path.join(self.shard_dir, f"{user_id}.db")
+
+    @property
+    def open_shards(self) -> list[str]:
+        """User IDs with an open engine, least recently used first."""
+        return list(self._shards)
+
+    def shard_users(self) -> List[str]:
+        """User IDs with a shard file, open or not."""
+        if not os.path.isdir(self.shard_dir):
+            return []
+        return sorted(
+            name[:-3] for name in os.listdir(self.shard_dir)
+            if name.endswith(".db") and USER_ID_PATTERN.match(name[:-3])
+        )
+
+    async def _open(self, user_id: str) -> _Shard:
+        """Create the engine for a shard and make sure its schema is current."""
+        from src.core.migrations import prepare_schema
+
+        os.makedirs(self.shard_dir, exist_ok=True)
+        shard_engine = create_async_engine(
+            f"sqlite+aiosqlite:///{self.shard_path(user_id)}",
+            echo=self.echo,
+            connect_args={"check_same_thread": False},
+        )
+        async with shard_engine.begin() as conn:
+            await conn.run_sync(prepare_schema)
+        logger.info(f"Opened database shard for user {user_id}")
+        return _Shard(
+            engine=shard_engine,
+            session_maker=async_sessionmaker(
+                shard_engine,
+                class_=AsyncSession,
+                expire_on_commit=False,
+                autocommit=False,
+                autoflush=False,
+            ),
+        )
+
+    async def acquire(self, user_id: str) -> _Shard:
+        """Return the user's shard, opening it if needed, and mark it in use."""
+        while True:
+            async with self._lock:
+                shard = self._shards.get(user_id)
+                if shard is not None:
+                    return await self._use(user_id, shard)
+                opening = self._opening.get(user_id)
+                if opening is None:
+                    opening = asyncio.get_running_loop().create_future()
+                    self._opening[user_id] = opening
+                    break
+            # Another request is opening this shard; check again once it is done
+            await asyncio.shield(opening)
+
+        try:
+            shard = await self._open(user_id)
+        except BaseException:
+            async with self._lock:
+                del self._opening[user_id]
+                opening.set_result(None)
+            raise
+        async with self._lock:
+            del self._opening[user_id]
+            opening.set_result(None)
+            self._shards[user_id] = shard
+            return await self._use(user_id, shard)
+
+    async def _use(self, user_id: str, shard: _Shard) -> _Shard:
+        """Mark an open shard in use (caller holds the lock)."""
+        self._shards.move_to_end(user_id)
+        shard.active += 1
+        shard.last_used = time.monotonic()
+        await self._evict()
+        return shard
+
+    def release(self, shard: _Shard):
+        """Mark a shard as no longer used by the caller."""
+        shard.active -= 1
+        shard.last_used = time.monotonic()
+
+    async def _evict(self):
+        """Dispose idle engines and trim the LRU to ``max_open``."""
+        now = time.monotonic()
+        for user_id, shard in list(self._shards.items()):
+            if shard.active:
+                continue
+            over_capacity = len(self._shards) > self.max_open
+            if over_capacity or now - shard.last_used > self.idle_timeout:
+                del self._shards[user_id]
+                discard_write_batcher(shard.engine)
+                await shard.engine.dispose()
+                logger.info(f"Closed database shard for user {user_id}")
+
+    async def evict_idle(self):
+        """Dispose engines that have been idle too long."""
+        async with self._lock:
+            await self._evict()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 2, 1.0))
+            try:
+                await self.evict_idle()
+            except Exception as e:
+                logger.error(f"Evicting idle shards failed: {e}", exc_info=True)
+
+    def start(self):
+        """Start disposing idle engines in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="shard-evictor")
+
+    async def close(self):
+        """Stop the evictor and dispose every open shard engine."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        async with self._lock:
+            for shard in self._shards.values():
+                discard_write_batcher(shard.engine)
+                await shard.engine.dispose()
+            self._shards.clear()
+
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+# Global shard router (only used when sharding is enabled)
+shard_router = ShardRouter(
+    settings.db_shard_dir,
+    max_open=settings.db_shard_max_open,
+    idle_timeout=settings.db_shard_idle_timeout,
+    echo=settings.debug,
+)
+
+
+async def get_db(user_id: str = Depends(get_user_id)) -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency for getting async database sessions.
 
+    With sharding enabled the session is bound to the requesting user's
+    shard; otherwise every user shares the main database. Sub-requests of a
+    request batch share the batch's session.
+
+    Args:
+        user_id: Requesting user
+
     Yields:
         AsyncSession: Database session
     """
-    async with async_session_maker() as session:
-        try:
+    batch = current_batch.get()
+    if batch is not None:
+        # Sub-request of POST /api/batch: the batch owns the session
+        yield batch.session
+        return
+
+    shard = None
+    session_maker = async_session_maker
+    if settings.db_sharding_enabled:
+        shard = await shard_router.acquire(user_id)
+        session_maker = shard.session_maker
+
+    try:
+        async with session_maker() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+            finally:
+                await session.close()
+    finally:
+        if shard is not None:
+            shard_router.release(shard)
+
+
+@asynccontextmanager
+async def user_session(
+    user_id: str,
+    session_factory: Optional[async_sessionmaker] = None,
+) -> AsyncIterator[AsyncSession]:
+    """
+    Session on the database holding a user's data, for background work.
+
+    Args:
+        user_id: Owner of the data
+        session_factory: Use this factory instead of routing (tests, tools)
+    """
+    if session_factory is not None or not settings.db_sharding_enabled:
+        async with (session_factory or async_session_maker)() as session:
             yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
+        return
+    shard = await shard_router.acquire(user_id)
+    try:
+        async with shard.session_maker() as session:
+            yield session
+    finally:
+        shard_router.release(shard)
+
+
+async def session_makers(
+    session_factory: Optional[async_sessionmaker] = None,
+) -> AsyncIterator[async_sessionmaker]:
+    """
+    Session factories of every database holding user data.
+
+    The main database, then (with sharding enabled) each user's shard, which
+    is held open until the caller moves on to the next one.
+
+    Args:
+        session_factory: Yield only this factory (tests, tools)
+    """
+    if session_factory is not None:
+        yield session_factory
+        return
+    yield async_session_maker
+    if not settings.db_sharding_enabled:
+        return
+    for user_id in shard_router.shard_users():
+        shard = await shard_router.acquire(user_id)
+        try:
+            yield shard.session_maker
         finally:
-            await session.close()
+            shard_router.release(shard)
+
+
+@asynccontextmanager
+async def main_session(db: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """
+    Session on the main database, which holds process-wide tables (the job queue).
+
+    That is the request's own session unless sharding is enabled, in which
+    case ``db`` is bound to a user shard and a separate session is opened.
+    """
+    if not settings.db_sharding_enabled:
+        yield db
+        return
+    async with async_session_maker() as session:
+        yield session
 
 
 async def init_db():
-    """Initialize database - create all tables."""
+    """Initialize database - create all tables and apply migrations."""
     try:
         logger.info("Initializing database...")
-        # Import models to register them with Base
-        from src.models import Task, PomodoroSession  # noqa: F401
+        from src.core.migrations import prepare_schema
         async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(prepare_schema)
+        if settings.db_sharding_enabled:
+            # Dispose shard engines that sit idle
+            shard_router.start()
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}", exc_info=True)
@@ -72,4 +368,5 @@ async def init_db():
 
 async def close_db():
     """Close database connections."""
+    await shard_router.close()
     await engine.dispose()
@@ -0,0 +1,89 @@
+"""Prometheus metrics exposed on ``/metrics``."""
+from prometheus_client import Counter, Gauge, Histogram
+
+# Database backups
+BACKUP_DURATION = Histogram(
+    "focus_agent_backup_duration_seconds",
+    "Time taken by a database backup run",
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+BACKUP_BYTES = Gauge(
+    "focus_agent_backup_last_size_bytes",
+    "Compressed size of the most recent backup run",
+)
+BACKUP_LAST_SUCCESS = Gauge(
+    "focus_agent_backup_last_success_timestamp_seconds",
+    "Unix time of the most recent successful backup",
+)
+BACKUPS = Counter(
+    "focus_agent_backups_total",
+    "Backup runs by result",
+    ["result"],
+)
+
+# Admission control
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "focus_agent_admission_queue_depth",
+    "Requests waiting for an admission slot",
+    ["lane"],
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "focus_agent_admission_in_flight",
+    "Requests currently admitted",
+    ["lane"],
+)
+ADMISSION_WAIT = Histogram(
+    "focus_agent_admission_wait_seconds",
+    "Time admitted requests spent queued",
+    ["lane"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+ADMISSION_REJECTED = Counter(
+    "focus_agent_admission_rejected_total",
+    "Requests turned away with 503",
+    ["lane", "reason"],
+)
+
+# Request coalescing
+COALESCED_REQUESTS = Counter(
+    "focus_agent_coalesced_requests_total",
+    "GET requests on coalesced routes, by whether they computed or shared the response",
+    ["path", "role"],
+)
+
+# GitHub issue sync
+GITHUB_REQUESTS = Counter(
+    "focus_agent_github_requests_total",
+    "GitHub API requests made by the issue sync, by result",
+    ["result"],
+)
+GITHUB_RATE_REMAINING = Gauge(
+    "focus_agent_github_rate_limit_remaining",
+    "Requests left in the current GitHub rate-limit window",
+)
+
+# Claude prompt context
+PROMPT_CONTEXT_BUILD = Histogram(
+    "focus_agent_prompt_context_build_seconds",
+    "Time taken to render a prompt context section",
+    ["section"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+PROMPT_CONTEXT_LOOKUPS = Counter(
+    "focus_agent_prompt_context_lookups_total",
+    "Prompt context section lookups, by whether the cached rendering was used",
+    ["section", "result"],
+)
+
+# Background jobs
+JOBS_PROCESSED = Counter(
+    "focus_agent_jobs_processed_total",
+    "Job attempts finished by the worker, by kind and result",
+    ["kind", "result"],
+)
+JOB_DURATION = Histogram(
+    "focus_agent_job_duration_seconds",
+    "Time taken by a job attempt",
+    ["kind"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900),
+)
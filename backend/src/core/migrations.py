@@ -0,0 +1,294 @@
+"""Lightweight schema migrations for SQLite databases.
+
+``Base.metadata.create_all`` only creates missing tables, so changes to
+existing tables are applied here. The schema version is tracked with
+``PRAGMA user_version``; a brand-new database is created at the latest
+version directly.
+"""
+import logging
+from datetime import date, datetime
+from typing import Any, Callable, List, Tuple
+from sqlalchemy import MetaData, Table, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateTable
+
+from src.core.config import settings
+from src.core.database import Base
+from src.models.pomodoro import (
+    ArchivedPomodoroSession,
+    PomodoroArchiveTotal,
+    PomodoroDailyTotal,
+    PomodoroSession,
+)
+from src.models.sync import SYNC_SEED, SYNC_TRIGGERS
+from src.models.task import OPEN_STATUSES, PRIORITY_RANKS, TASK_SEARCH_DDL, Task
+from src.models.types import EnumCode, EpochDate, EpochDateTime
+from src.services.daily_totals import rebuild_daily_totals, rebuild_session_days
+from src.services.task_counters import recompute_task_counters
+from src.services.tags import apply_task_tags, parse_tags
+
+logger = logging.getLogger(__name__)
+
+
+def _has_column(conn: Connection, table: str, column: str) -> bool:
+    """Check whether a table already has a column."""
+    return any(col["name"] == column for col in inspect(conn).get_columns(table))
+
+
+def _add_column(conn: Connection, table: str, column: str, ddl: str):
+    """Add a column to an existing table if it is missing."""
+    if not _has_column(conn, table, column):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def _add_user_id(conn: Connection):
+    """Add the owning user to tasks and pomodoro sessions."""
+    default = settings.default_user_id.replace("'", "''")
+    for table in ("tasks", "pomodoro_sessions"):
+        _add_column(conn, table, "user_id", f"VARCHAR(64) NOT NULL DEFAULT '{default}'")
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_user_id ON {table} (user_id)"))
+
+
+def _add_task_search(conn: Connection):
+    """Create the tasks full-text index and populate it from existing rows."""
+    for statement in TASK_SEARCH_DDL:
+        conn.execute(text(statement))
+    conn.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"))
+
+
+def _backfill_task_tags(conn: Connection):
+    """Index the tags of existing tasks in the normalized tag tables."""
+    rows = conn.execute(text(
+        "SELECT id, user_id, tags FROM tasks WHERE tags IS NOT NULL AND tags != ''"
+    ))
+    for task_id, user_id, raw in rows.all():
+        apply_task_tags(conn, user_id, task_id, parse_tags(raw))
+
+
+def _add_priority_ordering(conn: Connection):
+    """Add the numeric priority rank and queue score, backfilled in SQL."""
+    _add_column(conn, "tasks", "priority_rank", "INTEGER NOT NULL DEFAULT 2")
+    _add_column(conn, "tasks", "queue_score", "INTEGER")
+
+    # Enum columns store member names, e.g. 'HIGH' / 'IN_PROGRESS'
+    rank = " ".join(f"WHEN '{p.name}' THEN {r}" for p, r in PRIORITY_RANKS.items())
+    open_names = ", ".join(f"'{s.name}'" for s in OPEN_STATUSES)
+    conn.execute(text(f"UPDATE tasks SET priority_rank = CASE priority {rank} ELSE 2 END"))
+    conn.execute(text(
+        f"UPDATE tasks SET queue_score = CASE WHEN status IN ({open_names}) "
+        "THEN priority_rank * 100 + 99 "
+        "- MIN(MAX(estimated_pomodoros - completed_pomodoros, 0), 99) "
+        "END"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_user_priority "
+        "ON tasks (user_id, priority_rank DESC, created_at)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_user_queue "
+        "ON tasks (user_id, queue_score DESC, created_at)"
+    ))
+
+
+def _add_session_time_index(conn: Connection):
+    """Add the covering index used by time-range session aggregates."""
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_pomodoro_sessions_user_started ON pomodoro_sessions "
+        "(user_id, started_at, session_type, status, actual_duration, interruptions)"
+    ))
+
+
+def _add_task_counters(conn: Connection):
+    """Add per-task focus counters and compute them from existing sessions."""
+    _add_column(conn, "tasks", "total_focus_seconds", "INTEGER NOT NULL DEFAULT 0")
+    _add_column(conn, "tasks", "interrupted_sessions", "INTEGER NOT NULL DEFAULT 0")
+    _add_column(conn, "tasks", "last_worked_at", "DATETIME")
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_pomodoro_sessions_task_id ON pomodoro_sessions (task_id)"
+    ))
+    recompute_task_counters(conn)
+
+
+def _add_row_versions(conn: Connection):
+    """Add sync row versions, assign them to existing rows and install the triggers."""
+    for table in ("tasks", "pomodoro_sessions", "pomodoro_sessions_archive"):
+        _add_column(conn, table, "row_version", "INTEGER NOT NULL DEFAULT 0")
+    conn.execute(text(SYNC_SEED))
+    for table, statements in SYNC_TRIGGERS.items():
+        for statement in statements:
+            conn.execute(text(statement))
+        # A no-op update fires the version trigger for every row
+        conn.execute(text(f"UPDATE {table} SET row_version = row_version"))
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_user_version ON {table} (user_id, row_version)"
+        ))
+
+
+def _add_task_source(conn: Connection):
+    """Add the Obsidian source of imported tasks."""
+    _add_column(conn, "tasks", "source_path", "VARCHAR")
+    _add_column(conn, "tasks", "source_key", "VARCHAR(32)")
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_tasks_vault_source "
+        "ON tasks (user_id, source_path, source_key)"
+    ))
+
+
+# Rows copied per batch when rebuilding a table
+REBUILD_BATCH_SIZE = 5000
+
+
+def _legacy_value(column_type: Any, value: Any) -> Any:
+    """Python value of a column stored by ``DateTime``/``Date`` (ISO text) or ``Enum`` (name)."""
+    if not isinstance(value, str):
+        return value
+    if isinstance(column_type, EpochDateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, EpochDate):
+        return date.fromisoformat(value)
+    if isinstance(column_type, EnumCode):
+        return column_type.enum_class[value]
+    return value
+
+
+def _rebuild_table(conn: Connection, model_table: Table):
+    """
+    Recreate a table with its current column types and convert its rows.
+
+    Follows SQLite's procedure for schema changes ALTER TABLE cannot make:
+    create the new table, copy the rows, drop the old table, rename the new
+    one and recreate the indexes. Column affinity changes (VARCHAR to
+    SMALLINT) need the rebuild; an in-place UPDATE would store the codes as
+    text again. Columns the old table lacks get their insert defaults.
+    """
+    name = model_table.name
+    staging = f"{name}_new"
+    ddl = str(CreateTable(model_table).compile(dialect=conn.dialect))
+    conn.execute(text(ddl.replace(f"CREATE TABLE {name} (", f"CREATE TABLE {staging} (", 1)))
+
+    existing = {col["name"] for col in inspect(conn).get_columns(name)}
+    columns = [col for col in model_table.columns if col.name in existing]
+    target = model_table.to_metadata(MetaData(), name=staging)
+    rows = conn.execute(text(f"SELECT {', '.join(col.name for col in columns)} FROM {name}"))
+    while batch := rows.fetchmany(REBUILD_BATCH_SIZE):
+        conn.execute(target.insert(), [
+            {col.name: _legacy_value(col.type, value) for col, value in zip(columns, row)}
+            for row in batch
+        ])
+
+    conn.execute(text(f"DROP TABLE {name}"))
+    conn.execute(text(f"ALTER TABLE {staging} RENAME TO {name}"))
+    for index in model_table.indexes:
+        index.create(conn)
+
+
+def _precompute_daily_totals(conn: Connection):
+    # create_all made the table; migration 10 fills it once sessions use the current columns
+    pass
+
+
+def _compact_storage(conn: Connection):
+    """Store timestamps and days as epoch integers and enums as integer codes (see models.types)."""
+    for model in (
+        Task, PomodoroSession, ArchivedPomodoroSession, PomodoroArchiveTotal, PomodoroDailyTotal,
+    ):
+        _rebuild_table(conn, model.__table__)
+
+    # Dropping the tables dropped their triggers
+    for statement in TASK_SEARCH_DDL:
+        conn.execute(text(statement))
+    for statements in SYNC_TRIGGERS.values():
+        for statement in statements:
+            conn.execute(text(statement))
+
+    # Migration 7 derives from sessions with the integer encoding; on a
+    # database upgraded across it it read text, so derive again (the rebuilt
+    # daily totals already have the columns of migration 13)
+    rebuild_daily_totals(conn)
+    recompute_task_counters(conn)
+
+
+def _add_session_day(conn: Connection):
+    """Add the local day of sessions, backfilled in the stats timezone, and its indexes."""
+    for model in (PomodoroSession, ArchivedPomodoroSession):
+        # Present when migration 10 rebuilt the table with the current model
+        _add_column(conn, model.__tablename__, "day", "INTEGER NOT NULL DEFAULT 0")
+    rebuild_session_days(conn)
+    for model in (PomodoroSession, ArchivedPomodoroSession):
+        for index in model.__table__.indexes:
+            if "day" in index.columns:
+                index.create(conn, checkfirst=True)
+
+
+def _add_task_source_state(conn: Connection):
+    """Add the last-read checkbox state of imported tasks (unknown until the next import)."""
+    # Present when migration 10 rebuilt the table with the current model
+    _add_column(conn, "tasks", "source_done", "BOOLEAN")
+
+
+def _add_daily_total_columns(conn: Connection):
+    """Add the break and outcome columns of the daily totals if missing."""
+    for column in ("break_seconds", "completed_sessions", "interrupted_sessions", "interruptions"):
+        _add_column(conn, "pomodoro_daily_totals", column, "INTEGER NOT NULL DEFAULT 0")
+
+
+def _add_daily_timeseries_totals(conn: Connection):
+    """Add the remaining timeseries fields to the daily totals and derive them."""
+    _add_daily_total_columns(conn)
+    rebuild_daily_totals(conn)
+
+
+# (version, description, upgrade function) in application order
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "add user_id to tasks and pomodoro_sessions", _add_user_id),
+    (2, "add tasks full-text search index", _add_task_search),
+    (3, "index task tags in tags/task_tags", _backfill_task_tags),
+    (4, "add task priority rank and queue score", _add_priority_ordering),
+    (5, "add pomodoro session time-range index", _add_session_time_index),
+    (6, "precompute pomodoro daily totals", _precompute_daily_totals),
+    (7, "add task focus counters", _add_task_counters),
+    (8, "add sync row versions and tombstones", _add_row_versions),
+    (9, "add task vault source", _add_task_source),
+    (10, "store timestamps and enums as integers", _compact_storage),
+    (11, "add pomodoro session local day", _add_session_day),
+    (12, "add task source checkbox state", _add_task_source_state),
+    (13, "add timeseries fields to pomodoro daily totals", _add_daily_timeseries_totals),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: Connection) -> int:
+    """Return the schema version recorded in the database."""
+    return conn.execute(text("PRAGMA user_version")).scalar_one()
+
+
+def _set_schema_version(conn: Connection, version: int):
+    conn.execute(text(f"PRAGMA user_version = {int(version)}"))
+
+
+def prepare_schema(conn: Connection):
+    """
+    Create missing tables and bring an existing database up to date.
+
+    Runs synchronously; call it through ``AsyncConnection.run_sync``.
+
+    Args:
+        conn: Connection inside an open transaction
+    """
+    # Import models to register them with Base
+    from src import models  # noqa: F401
+
+    existing = inspect(conn).has_table("tasks")
+    Base.metadata.create_all(conn)
+
+    if not existing:
+        _set_schema_version(conn, LATEST_VERSION)
+        return
+
+    current = get_schema_version(conn)
+    for version, description, upgrade in MIGRATIONS:
+        if version > current:
+            logger.info(f"Applying migration {version}: {description}")
+            upgrade(conn)
+            _set_schema_version(conn, version)
@@ -0,0 +1,50 @@
+"""Shared Redis client management."""
+import logging
+from typing import Optional
+import redis.asyncio as redis
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Process-wide pooled client, owned by the application lifespan
+redis_client: Optional[redis.Redis] = None
+
+
+async def init_redis() -> Optional[redis.Redis]:
+    """
+    Create the shared Redis client backed by a connection pool.
+
+    Connections are opened lazily by the pool, so this does not fail when
+    Redis is temporarily unreachable.
+
+    Returns:
+        Redis client, or None when Redis is disabled
+    """
+    global redis_client
+    if not settings.redis_enabled:
+        logger.info("Redis is disabled")
+        return None
+
+    redis_client = redis.from_url(
+        settings.redis_url,
+        max_connections=settings.redis_max_connections,
+        socket_connect_timeout=settings.redis_socket_timeout,
+        socket_timeout=settings.redis_socket_timeout,
+        decode_responses=True,
+    )
+    logger.info(f"Redis client initialized (max {settings.redis_max_connections} connections)")
+    return redis_client
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """Return the shared Redis client, or None if it is not initialized."""
+    return redis_client
+
+
+async def close_redis():
+    """Close the shared Redis client and disconnect its pool."""
+    global redis_client
+    if redis_client is not None:
+        await redis_client.aclose()
+        redis_client = None
@@ -0,0 +1,204 @@
+"""Group commit for concurrent write requests.
+
+Every committed SQLite transaction costs an fsync. When write batching is
+enabled, mutations submitted within a short window are applied in one
+transaction, each inside its own savepoint, so a burst of N writes costs
+one commit instead of N. A failing operation only rolls back its own
+savepoint; the others still commit.
+"""
+import asyncio
+import logging
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+WriteOp = Callable[[AsyncSession], Awaitable[T]]
+
+
+class WriteBatcher:
+    """
+    Collects write operations and applies them in shared transactions.
+
+    A batch is flushed when ``max_ops`` operations are pending or when the
+    ``window_ms`` window since the batch opened has elapsed. Operations
+    arriving while a batch is being committed join the next batch.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        window_ms: Optional[float] = None,
+        max_ops: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        if window_ms is None:
+            window_ms = settings.write_batch_window_ms
+        self.window = window_ms / 1000
+        self.max_ops = max_ops if max_ops is not None else settings.write_batch_max_ops
+        self._pending: List[Tuple[WriteOp, asyncio.Future]] = []
+        self._full = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self.batches_committed = 0
+
+    async def submit(self, op: WriteOp[T]) -> T:
+        """
+        Queue a write operation and wait for its batch to commit.
+
+        Args:
+            op: Coroutine function applying the write to the given session.
+                It should flush rather than commit.
+
+        Returns:
+            Whatever ``op`` returned, once the batch has committed
+
+        Raises:
+            Exception: The error raised by ``op``, or the commit error
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((op, future))
+        if len(self._pending) >= self.max_ops:
+            self._full.set()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+        return await future
+
+    async def _flush_loop(self):
+        """Flush batches until no operations are pending."""
+        while self._pending:
+            if len(self._pending) < self.max_ops:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.window)
+                except asyncio.TimeoutError:
+                    pass
+            self._full.clear()
+
+            batch = self._pending[:self.max_ops]
+            self._pending = self._pending[self.max_ops:]
+            await self._apply(batch)
+
+    async def _apply(self, batch: List[Tuple[WriteOp, asyncio.Future]]):
+        """Apply a batch in one transaction, isolating each op in a savepoint."""
+        outcomes: List[Tuple[asyncio.Future, Any, Optional[BaseException]]] = []
+        try:
+            async with self.session_factory() as session:
+                # pysqlite only opens a transaction before DML, so without an
+                # explicit BEGIN the first SAVEPOINT would start one and its
+                # RELEASE would commit every op on its own
+                await (await session.connection()).exec_driver_sql("BEGIN IMMEDIATE")
+                for op, future in batch:
+                    if future.cancelled():
+                        continue
+                    try:
+                        async with session.begin_nested():
+                            result = await op(session)
+                        outcomes.append((future, result, None))
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Write batch of {len(batch)} failed to commit: {e}", exc_info=True)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches_committed += 1
+        for future, result, error in outcomes:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+# One batcher per engine (the main database and each open shard)
+_batchers: Dict[AsyncEngine, WriteBatcher] = {}
+
+
+def get_write_batcher(engine: AsyncEngine) -> WriteBatcher:
+    """Return the write batcher for an engine, creating it on first use."""
+    batcher = _batchers.get(engine)
+    if batcher is None:
+        batcher = WriteBatcher(async_sessionmaker(
+            engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autocommit=False,
+            autoflush=False,
+        ))
+        _batchers[engine] = batcher
+    return batcher
+
+
+def discard_write_batcher(engine: AsyncEngine):
+    """Forget the batcher of an engine that is being disposed."""
+    _batchers.pop(engine, None)
+
+
+@dataclass
+class RequestBatch:
+    """
+    Sub-requests of one ``POST /api/batch`` call sharing a database session.
+
+    When ``atomic`` is set, writes are only flushed and the batch endpoint
+    commits (or rolls back) them all at the end; callbacks registered with
+    ``after_commit`` are deferred until then.
+    """
+    session: AsyncSession
+    atomic: bool = False
+    committed: List[Callable[[], None]] = field(default_factory=list)
+
+
+# Set by the batch endpoint while it runs its sub-requests
+current_batch: ContextVar[Optional[RequestBatch]] = ContextVar("current_batch", default=None)
+
+
+def after_commit(callback: Callable[[], None]):
+    """Run a callback once the current write is durable (deferred in atomic batches)."""
+    batch = current_batch.get()
+    if batch is not None and batch.atomic:
+        batch.committed.append(callback)
+    else:
+        callback()
+
+
+async def run_write(db: AsyncSession, op: WriteOp[T]) -> T:
+    """
+    Apply a write operation, group-committed when batching is enabled.
+
+    Inside a request batch the write goes to the batch's shared session
+    instead: committed immediately, or left for the batch to commit when
+    it is atomic.
+
+    Args:
+        db: The request's session; its engine selects the batcher
+        op: Coroutine function applying the write to a session
+
+    Returns:
+        Whatever ``op`` returned, after the write has been committed
+    """
+    batch = current_batch.get()
+    if batch is not None:
+        if batch.atomic:
+            return await op(db)
+        try:
+            result = await op(db)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        return result
+
+    if settings.write_batching_enabled:
+        return await get_write_batcher(db.bind).submit(op)
+
+    result = await op(db)
+    await db.commit()
+    return result
@@ -5,8 +5,19 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+from src.core.admission import AdmissionControlMiddleware, admission_controller
+from src.core.coalescing import CoalescingMiddleware, request_coalescer
 from src.core.config import settings
 from src.core.database import init_db, close_db
+from src.core.redis_client import init_redis, close_redis
+from src.services.archive import session_archiver
+from src.services.backup import backup_service
+from src.services.claude import claude_client
+from src.services.daily_notes import daily_note_writer
+from src.services.github_sync import github_sync
+from src.services.health_monitor import health_monitor
+from src.services.vault_ingest import shutdown_parse_pool
+from src.services.vault_watcher import vault_watcher
 from src.api import health
 
 # Configure logging
@@ -37,10 +48,43 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize database: {e}")
         raise
 
+    # Shared Redis connection pool
+    await init_redis()
+
+    # Background dependency checks for /ready and /health/detailed
+    health_monitor.start()
+
+    # Scheduled maintenance runs here unless the worker (python -m src.worker)
+    # has taken it over
+    if not settings.worker_enabled:
+        # Move old sessions to the archive table (when enabled)
+        session_archiver.start()
+
+        # Scheduled online backups (when enabled)
+        backup_service.start()
+
+        # Append completed sessions to Obsidian daily notes (when sync is enabled)
+        daily_note_writer.start()
+
+        # Keep the vault index current from filesystem events (when sync is enabled)
+        vault_watcher.start()
+
+        # Poll linked GitHub issues (when enabled)
+        github_sync.start()
+
     yield
 
     # Shutdown
     logger.info("Shutting down application...")
+    await github_sync.stop()
+    await claude_client.close()
+    await vault_watcher.stop()
+    await daily_note_writer.stop()
+    await backup_service.stop()
+    await session_archiver.stop()
+    await health_monitor.stop()
+    shutdown_parse_pool()
+    await close_redis()
     await close_db()
     logger.info("Database connections closed")
 
@@ -55,6 +99,15 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+# Bounded queues for API requests (added first so CORS headers wrap the 503s)
+if settings.admission_control_enabled:
+    app.add_middleware(AdmissionControlMiddleware, controller=admission_controller)
+
+# Share responses between identical concurrent GETs (outside admission, so
+# followers wait without holding a slot)
+if settings.coalesce_enabled:
+    app.add_middleware(CoalescingMiddleware, coalescer=request_coalescer)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -84,14 +137,21 @@ app.include_router(health.router)
 # API routers
 from src.api.tasks import router as tasks_router
 from src.api.pomodoro import router as pomodoro_router
+from src.api.admin import router as admin_router
+from src.api.sync import router as sync_router
+from src.api.batch import router as batch_router
+from src.api.claude import router as claude_router
 
 app.include_router(tasks_router, prefix="/api")
 app.include_router(pomodoro_router, prefix="/api")
+app.include_router(admin_router, prefix="/api")
+app.include_router(sync_router, prefix="/api")
+app.include_router(batch_router, prefix="/api")
+app.include_router(claude_router, prefix="/api")
 
 # Future routers will be added here:
 # app.include_router(github.router, prefix=f"{settings.api_prefix}/github")
 # app.include_router(obsidian.router, prefix=f"{settings.api_prefix}/obsidian")
-# app.include_router(claude.router, prefix=f"{settings.api_prefix}/claude")
 
 
 # Global exception handler
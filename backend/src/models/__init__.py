@@ -1,5 +1,31 @@
 """Database models."""
 from src.models.task import Task
-from src.models.pomodoro import PomodoroSession
+from src.models.pomodoro import (
+    ArchivedPomodoroSession,
+    PomodoroArchiveTotal,
+    PomodoroDailyTotal,
+    PomodoroSession,
+)
+from src.models.tag import Tag, task_tags
+from src.models.sync import SyncState, SyncTombstone
+from src.models.obsidian import ObsidianOutbox, VaultNote
+from src.models.github import GithubIssue, GithubRepo
+from src.models.job import Job, JobStatus
 
-__all__ = ["Task", "PomodoroSession"]
+__all__ = [
+    "Task",
+    "PomodoroSession",
+    "PomodoroDailyTotal",
+    "ArchivedPomodoroSession",
+    "PomodoroArchiveTotal",
+    "Tag",
+    "task_tags",
+    "SyncState",
+    "SyncTombstone",
+    "ObsidianOutbox",
+    "VaultNote",
+    "GithubRepo",
+    "GithubIssue",
+    "Job",
+    "JobStatus",
+]
@@ -0,0 +1,40 @@
+"""GitHub issue sync state."""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from src.core.database import Base
+
+
+class GithubRepo(Base):
+    """Polling state of a repository whose issues are linked to tasks."""
+    __tablename__ = "github_repos"
+
+    # "owner/name", lowercased
+    repo: Mapped[str] = mapped_column(String, primary_key=True)
+    # Issues updated at or after this time are listed (GitHub ISO timestamp)
+    since: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    # ETag of the issue list at ``since``
+    etag: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    checked_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<GithubRepo {self.repo} since {self.since}>"
+
+
+class GithubIssue(Base):
+    """Last known state of a linked issue."""
+    __tablename__ = "github_issues"
+
+    repo: Mapped[str] = mapped_column(String, primary_key=True)
+    number: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # "open" or "closed"
+    state: Mapped[str] = mapped_column(String(16), nullable=False)
+    title: Mapped[str] = mapped_column(String, nullable=False)
+    updated_at: Mapped[str] = mapped_column(String(32), nullable=False)
+    # ETag of the single-issue request
+    etag: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    checked_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<GithubIssue {self.repo}#{self.number} ({self.state})>"
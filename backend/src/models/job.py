@@ -0,0 +1,56 @@
+"""Background job queue model."""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DateTime, Enum, Index, Integer, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+import enum
+from src.core.database import Base
+
+
+class JobStatus(str, enum.Enum):
+    """Job status."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(Base):
+    """A unit of background work, run by ``python -m src.worker``."""
+    __tablename__ = "jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Handler name (see services.jobs)
+    kind: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # JSON object
+    # Higher runs first
+    priority: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    status: Mapped[JobStatus] = mapped_column(
+        Enum(JobStatus), default=JobStatus.QUEUED, nullable=False
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3, nullable=False)
+    # Queued: earliest start. Running: when the worker's lease expires and
+    # the job becomes visible to other workers again
+    visible_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    # At most one queued job per key (e.g. a scheduled job not picked up yet)
+    unique_key: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    locked_by: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    result: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # JSON
+    last_error: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<Job {self.id}: {self.kind} ({self.status})>"
+
+
+# Claim order: highest priority, then oldest visible
+Index("ix_jobs_claim", Job.status, Job.priority.desc(), Job.visible_at)
+Index(
+    "ix_jobs_unique_active",
+    Job.unique_key,
+    unique=True,
+    sqlite_where=text("status = 'QUEUED' AND unique_key IS NOT NULL"),
+)
@@ -0,0 +1,37 @@
+"""Obsidian vault models."""
+from datetime import datetime
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from src.core.database import Base
+
+
+class VaultNote(Base):
+    """Manifest entry for a markdown note in the Obsidian vault."""
+    __tablename__ = "vault_notes"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Vault-relative POSIX path
+    path: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+    mtime_ns: Mapped[int] = mapped_column(Integer, nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    # SHA-256 of the file contents, used to detect renames
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    indexed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<VaultNote {self.id}: {self.path}>"
+
+
+class ObsidianOutbox(Base):
+    """Line waiting to be appended to a daily note (see services.daily_notes)."""
+    __tablename__ = "obsidian_outbox"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    session_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Vault-relative path of the daily note
+    note_path: Mapped[str] = mapped_column(String, nullable=False)
+    line: Mapped[str] = mapped_column(String, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ObsidianOutbox {self.id}: {self.note_path}>"
@@ -1,10 +1,13 @@
 """Pomodoro session model."""
-from datetime import datetime
+from datetime import date, datetime, timezone
 from typing import Optional
-from sqlalchemy import String, Integer, DateTime, ForeignKey, Enum
+from zoneinfo import ZoneInfo
+from sqlalchemy import String, Integer, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
+from src.core.config import settings
 from src.core.database import Base
+from src.models.types import EnumCode, EpochDate, EpochDateTime
 
 
 class SessionType(str, enum.Enum):
@@ -21,19 +24,32 @@ class SessionStatus(str, enum.Enum):
     INTERRUPTED = "interrupted"
 
 
+def session_day(context) -> date:
+    """Insert default of ``day``: the local day of ``started_at`` in ``settings.stats_timezone``."""
+    started_at = context.get_current_parameters()["started_at"]
+    local = started_at.replace(tzinfo=timezone.utc).astimezone(ZoneInfo(settings.stats_timezone))
+    return local.date()
+
+
 class PomodoroSession(Base):
     """Pomodoro session model."""
     __tablename__ = "pomodoro_sessions"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    user_id: Mapped[str] = mapped_column(
+        String(64),
+        default=lambda: settings.default_user_id,
+        nullable=False,
+        index=True
+    )
 
     # Session details
     session_type: Mapped[SessionType] = mapped_column(
-        Enum(SessionType),
+        EnumCode(SessionType),
         nullable=False
     )
     status: Mapped[SessionStatus] = mapped_column(
-        Enum(SessionStatus),
+        EnumCode(SessionStatus),
         default=SessionStatus.ACTIVE,
         nullable=False
     )
@@ -44,17 +60,22 @@ class PomodoroSession(Base):
 
     # Timestamps
     started_at: Mapped[datetime] = mapped_column(
-        DateTime,
+        EpochDateTime,
         default=datetime.utcnow,
         nullable=False
     )
-    ended_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    ended_at: Mapped[Optional[datetime]] = mapped_column(EpochDateTime, nullable=True)
+
+    # Local day of started_at, the key of per-day queries (set on insert;
+    # after changing the stats timezone run daily_totals.rebuild_session_days)
+    day: Mapped[date] = mapped_column(EpochDate, default=session_day, nullable=False)
 
     # Optional task association
     task_id: Mapped[Optional[int]] = mapped_column(
         Integer,
         ForeignKey("tasks.id"),
-        nullable=True
+        nullable=True,
+        index=True
     )
 
     # Session number (for tracking breaks)
@@ -66,5 +87,120 @@ class PomodoroSession(Base):
     # Interruptions count
     interruptions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
 
+    # Change version for incremental sync (assigned by triggers, see models.sync)
+    row_version: Mapped[int] = mapped_column(Integer, server_default="0", nullable=False)
+
     def __repr__(self) -> str:
         return f"<PomodoroSession {self.id}: {self.session_type} ({self.status})>"
+
+
+Index("ix_pomodoro_sessions_user_version", PomodoroSession.user_id, PomodoroSession.row_version)
+
+# Covering index for time-range aggregates (timeseries stats)
+Index(
+    "ix_pomodoro_sessions_user_started",
+    PomodoroSession.user_id,
+    PomodoroSession.started_at,
+    PomodoroSession.session_type,
+    PomodoroSession.status,
+    PomodoroSession.actual_duration,
+    PomodoroSession.interruptions,
+)
+
+# Covering index for per-day aggregates (streaks, daily totals, day buckets)
+Index(
+    "ix_pomodoro_sessions_user_day",
+    PomodoroSession.user_id,
+    PomodoroSession.day,
+    PomodoroSession.session_type,
+    PomodoroSession.status,
+    PomodoroSession.actual_duration,
+    PomodoroSession.interruptions,
+)
+
+
+class PomodoroDailyTotal(Base):
+    """
+    Per-user, per-day session totals (days in ``settings.stats_timezone``).
+
+    Derived from ``pomodoro_sessions``; each session write recomputes the
+    row of the day it touched.
+    """
+    __tablename__ = "pomodoro_daily_totals"
+
+    user_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    day: Mapped[date] = mapped_column(EpochDate, primary_key=True)
+    work_seconds: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    sessions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Remaining timeseries fields, so daily buckets never read sessions
+    break_seconds: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    completed_sessions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    interrupted_sessions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    interruptions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<PomodoroDailyTotal {self.user_id} {self.day}: {self.work_seconds}s>"
+
+
+class ArchivedPomodoroSession(Base):
+    """
+    A finished session moved out of ``pomodoro_sessions`` by the archiver.
+
+    Same columns as ``PomodoroSession`` so the two tables can be unioned.
+    """
+    __tablename__ = "pomodoro_sessions_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    session_type: Mapped[SessionType] = mapped_column(EnumCode(SessionType), nullable=False)
+    status: Mapped[SessionStatus] = mapped_column(EnumCode(SessionStatus), nullable=False)
+    planned_duration: Mapped[int] = mapped_column(Integer, nullable=False)
+    actual_duration: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    started_at: Mapped[datetime] = mapped_column(EpochDateTime, nullable=False)
+    ended_at: Mapped[Optional[datetime]] = mapped_column(EpochDateTime, nullable=True)
+    day: Mapped[date] = mapped_column(EpochDate, default=session_day, nullable=False)
+    task_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
+    session_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    notes: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    interruptions: Mapped[int] = mapped_column(Integer, nullable=False)
+    row_version: Mapped[int] = mapped_column(Integer, server_default="0", nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ArchivedPomodoroSession {self.id}: {self.session_type} ({self.status})>"
+
+
+Index(
+    "ix_pomodoro_sessions_archive_user_started",
+    ArchivedPomodoroSession.user_id,
+    ArchivedPomodoroSession.started_at,
+)
+
+Index(
+    "ix_pomodoro_sessions_archive_user_day",
+    ArchivedPomodoroSession.user_id,
+    ArchivedPomodoroSession.day,
+    ArchivedPomodoroSession.session_type,
+)
+
+
+class PomodoroArchiveTotal(Base):
+    """
+    Aggregates of a user's archived sessions, carried forward into stats.
+
+    Every archived session started before ``archived_before``; ranges that
+    start at or after it never need the archive.
+    """
+    __tablename__ = "pomodoro_archive_totals"
+
+    user_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    archived_before: Mapped[datetime] = mapped_column(EpochDateTime, nullable=False)
+    sessions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    completed_sessions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    work_time: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    break_time: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    duration_sum: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    duration_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    interruptions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<PomodoroArchiveTotal {self.user_id}: {self.sessions} sessions>"
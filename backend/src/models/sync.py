@@ -0,0 +1,77 @@
+"""Change tracking for incremental client sync."""
+from datetime import datetime
+from sqlalchemy import DDL, DateTime, Index, Integer, String, event
+from sqlalchemy.orm import Mapped, mapped_column
+from src.core.database import Base
+from src.models.pomodoro import PomodoroSession
+from src.models.task import Task
+
+
+class SyncState(Base):
+    """Single-row counter handing out row versions for the whole database."""
+    __tablename__ = "sync_state"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class SyncTombstone(Base):
+    """Record of a deleted row, so syncing clients can drop it too."""
+    __tablename__ = "sync_tombstones"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    entity: Mapped[str] = mapped_column(String(16), nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    row_version: Mapped[int] = mapped_column(Integer, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+Index("ix_sync_tombstones_user_version", SyncTombstone.user_id, SyncTombstone.row_version)
+
+
+def _bump(table: str, row: str) -> str:
+    return f"""
+        UPDATE sync_state SET version = version + 1 WHERE id = 1;
+        UPDATE {table} SET row_version = (SELECT version FROM sync_state WHERE id = 1)
+        WHERE id = {row}.id;
+    """
+
+
+# Row versions are assigned by triggers so every write path (ORM, bulk SQL,
+# counter updates) bumps them in the same transaction. The WHEN clause skips
+# the trigger's own row_version update.
+SYNC_SEED = "INSERT OR IGNORE INTO sync_state (id, version) VALUES (1, 0)"
+SYNC_TRIGGERS = {
+    table: [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_version_ai AFTER INSERT ON {table} BEGIN
+            {_bump(table, "new")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_version_au AFTER UPDATE ON {table}
+        WHEN new.row_version = old.row_version BEGIN
+            {_bump(table, "new")}
+        END
+        """,
+    ]
+    for table in (Task.__tablename__, PomodoroSession.__tablename__)
+}
+SYNC_TRIGGERS[Task.__tablename__].append(
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_tombstone_ad AFTER DELETE ON tasks BEGIN
+        UPDATE sync_state SET version = version + 1 WHERE id = 1;
+        INSERT INTO sync_tombstones (user_id, entity, entity_id, row_version, deleted_at)
+        VALUES (old.user_id, 'task', old.id,
+                (SELECT version FROM sync_state WHERE id = 1), datetime('now'));
+    END
+    """
+)
+
+# Only on newly created tables; existing databases get the triggers from a
+# migration once the row_version columns exist.
+event.listen(SyncState.__table__, "after_create", DDL(SYNC_SEED))
+for _table, _statements in SYNC_TRIGGERS.items():
+    for _statement in _statements:
+        event.listen(Base.metadata.tables[_table], "after_create", DDL(_statement))
@@ -0,0 +1,28 @@
+"""Normalized tag index for tasks."""
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Table, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from src.core.database import Base
+
+
+class Tag(Base):
+    """A distinct tag name owned by a user."""
+    __tablename__ = "tags"
+    __table_args__ = (UniqueConstraint("user_id", "name", name="uq_tags_user_name"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    name: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<Tag {self.id}: {self.name}>"
+
+
+# Task <-> tag links; the primary key serves task lookups and the
+# (tag_id, task_id) index serves tag filtering and cardinality counts
+task_tags = Table(
+    "task_tags",
+    Base.metadata,
+    Column("task_id", Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_task_tags_tag_id_task_id", "tag_id", "task_id"),
+)
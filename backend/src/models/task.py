@@ -1,10 +1,12 @@
 """Task model for task management."""
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, Boolean, DateTime, Integer, Enum
+from sqlalchemy import DDL, String, Boolean, Integer, Index, event
 from sqlalchemy.orm import Mapped, mapped_column
 import enum
+from src.core.config import settings
 from src.core.database import Base
+from src.models.types import EnumCode, EpochDateTime
 
 
 class TaskPriority(str, enum.Enum):
@@ -23,41 +25,86 @@ class TaskStatus(str, enum.Enum):
     ARCHIVED = "archived"
 
 
+PRIORITY_RANKS = {
+    TaskPriority.LOW: 1,
+    TaskPriority.MEDIUM: 2,
+    TaskPriority.HIGH: 3,
+    TaskPriority.URGENT: 4,
+}
+
+OPEN_STATUSES = (TaskStatus.TODO, TaskStatus.IN_PROGRESS)
+
+
+def compute_queue_score(
+    status: TaskStatus,
+    priority: TaskPriority,
+    estimated_pomodoros: int,
+    completed_pomodoros: int,
+) -> Optional[int]:
+    """
+    Score used to order the "what next" queue (higher comes first).
+
+    Priority dominates; within a priority, tasks with fewer pomodoros left
+    come first. Ties are broken by age through the index. Tasks that are
+    not open have no score, which keeps them out of the queue index range.
+    """
+    if status not in OPEN_STATUSES:
+        return None
+    remaining = max(estimated_pomodoros - completed_pomodoros, 0)
+    return PRIORITY_RANKS[priority] * 100 + (99 - min(remaining, 99))
+
+
 class Task(Base):
     """Task model."""
     __tablename__ = "tasks"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    user_id: Mapped[str] = mapped_column(
+        String(64),
+        default=lambda: settings.default_user_id,
+        nullable=False,
+        index=True
+    )
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     status: Mapped[TaskStatus] = mapped_column(
-        Enum(TaskStatus),
+        EnumCode(TaskStatus),
         default=TaskStatus.TODO,
         nullable=False
     )
     priority: Mapped[TaskPriority] = mapped_column(
-        Enum(TaskPriority),
+        EnumCode(TaskPriority),
         default=TaskPriority.MEDIUM,
         nullable=False
     )
 
+    # Numeric priority (SQL ordering on the enum would be alphabetical)
+    priority_rank: Mapped[int] = mapped_column(Integer, default=2, nullable=False)
+    # Precomputed "what next" score, NULL unless the task is open
+    queue_score: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
     # Pomodoro tracking
     estimated_pomodoros: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
     completed_pomodoros: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
 
+    # Counters maintained from linked sessions (see services.task_counters)
+    total_focus_seconds: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    interrupted_sessions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_worked_at: Mapped[Optional[datetime]] = mapped_column(EpochDateTime, nullable=True)
+
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
-        DateTime,
+        EpochDateTime,
         default=datetime.utcnow,
         nullable=False
     )
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime,
+        EpochDateTime,
         default=datetime.utcnow,
         onupdate=datetime.utcnow,
         nullable=False
     )
-    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(EpochDateTime, nullable=True)
 
     # Optional GitHub integration
     github_issue_url: Mapped[Optional[str]] = mapped_column(String, nullable=True)
@@ -65,5 +112,72 @@ class Task(Base):
     # Optional tags
     tags: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # JSON string
 
+    # Obsidian checkbox this task was imported from (see services.vault_ingest)
+    source_path: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    source_key: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    # Checkbox state last read from the note (NULL: not yet observed)
+    source_done: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+
+    # Change version for incremental sync (assigned by triggers, see models.sync)
+    row_version: Mapped[int] = mapped_column(Integer, server_default="0", nullable=False)
+
     def __repr__(self) -> str:
         return f"<Task {self.id}: {self.title} ({self.status})>"
+
+
+Index("ix_tasks_user_priority", Task.user_id, Task.priority_rank.desc(), Task.created_at)
+Index("ix_tasks_user_queue", Task.user_id, Task.queue_score.desc(), Task.created_at)
+Index("ix_tasks_user_version", Task.user_id, Task.row_version)
+Index("ix_tasks_vault_source", Task.user_id, Task.source_path, Task.source_key, unique=True)
+
+
+@event.listens_for(Task, "before_insert")
+@event.listens_for(Task, "before_update")
+def _maintain_priority_columns(mapper, connection, target: Task):
+    """Keep the derived ordering columns in step with every ORM write."""
+    status = target.status or TaskStatus.TODO
+    priority = target.priority or TaskPriority.MEDIUM
+    estimated = target.estimated_pomodoros if target.estimated_pomodoros is not None else 1
+    completed = target.completed_pomodoros or 0
+    target.priority_rank = PRIORITY_RANKS[priority]
+    target.queue_score = compute_queue_score(status, priority, estimated, completed)
+
+
+# Full-text index over title, description and tags. It is an external
+# content FTS5 table kept in sync with ``tasks`` by triggers, so every write
+# path (ORM or raw SQL) updates it in the same transaction.
+TASK_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description, tags,
+        content='tasks', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, description, tags)
+        VALUES (new.id, new.title, new.description, new.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description, tags)
+        VALUES ('delete', old.id, old.title, old.description, old.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_au
+    AFTER UPDATE OF title, description, tags ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description, tags)
+        VALUES ('delete', old.id, old.title, old.description, old.tags);
+        INSERT INTO tasks_fts(rowid, title, description, tags)
+        VALUES (new.id, new.title, new.description, new.tags);
+    END
+    """,
+]
+
+for statement in TASK_SEARCH_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement))
+event.listen(Task.__table__, "before_drop", DDL("DROP TABLE IF EXISTS tasks_fts"))
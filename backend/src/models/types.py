@@ -0,0 +1,96 @@
+"""Compact column types for SQLite.
+
+SQLAlchemy's ``DateTime`` and ``Enum`` store ISO strings and member names
+on SQLite, so every range comparison is a string comparison and rows and
+indexes carry 26-byte timestamps and 4-11 byte labels. These types keep the
+Python values (naive UTC datetimes, enum members) and store integers:
+
+- ``EpochDateTime``: microseconds since the Unix epoch, UTC. Microseconds
+  keep every datetime round-tripping unchanged.
+- ``EpochDate``: days since the Unix epoch.
+- ``EnumCode``: the member's position in its enum. Append new members and
+  never reorder them, or stored codes change meaning.
+"""
+import enum
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Optional, Type
+
+from sqlalchemy import BigInteger, Integer, SmallInteger, type_coerce
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.types import TypeDecorator
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_DATE = EPOCH.date()
+MICROSECONDS = 1_000_000
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_epoch(value: datetime) -> int:
+    """Microseconds since the epoch of a naive UTC (or aware) datetime."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // _ONE_MICROSECOND
+
+
+def from_epoch(value: int) -> datetime:
+    """Naive UTC datetime of a stored epoch value."""
+    return EPOCH + timedelta(microseconds=value)
+
+
+def epoch_seconds(column: ColumnElement) -> ColumnElement:
+    """SQL expression for an ``EpochDateTime`` column in whole seconds."""
+    return type_coerce(column, Integer) // MICROSECONDS
+
+
+class EpochDateTime(TypeDecorator):
+    """Naive UTC datetime stored as integer microseconds since the epoch."""
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[datetime], dialect) -> Optional[int]:
+        return None if value is None else to_epoch(value)
+
+    def process_result_value(self, value: Optional[int], dialect) -> Optional[datetime]:
+        return None if value is None else from_epoch(value)
+
+
+class EpochDate(TypeDecorator):
+    """Calendar date stored as integer days since the epoch."""
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[date], dialect) -> Optional[int]:
+        return None if value is None else (value - EPOCH_DATE).days
+
+    def process_result_value(self, value: Optional[int], dialect) -> Optional[date]:
+        return None if value is None else EPOCH_DATE + timedelta(days=value)
+
+
+class EnumCode(TypeDecorator):
+    """Enum member stored as a small integer code (its declaration position)."""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_class: Type[enum.Enum]):
+        super().__init__()
+        self.enum_class = enum_class
+        self._members = list(enum_class)
+        self._codes = {member: code for code, member in enumerate(self._members)}
+
+    def code(self, value: Any) -> int:
+        """Code of a member, its value or its name."""
+        if not isinstance(value, self.enum_class):
+            try:
+                value = self.enum_class(value)
+            except ValueError:
+                value = self.enum_class[value]
+        return self._codes[value]
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[int]:
+        return None if value is None else self.code(value)
+
+    def process_result_value(self, value: Optional[int], dialect) -> Optional[enum.Enum]:
+        return None if value is None else self._members[value]
@@ -4,21 +4,52 @@ from src.schemas.task import (
     TaskUpdate,
     TaskResponse,
     TaskListResponse,
+    TaskSearchHit,
+    TaskSearchResponse,
+    TagCount,
+    TagListResponse,
 )
 from src.schemas.pomodoro import (
     PomodoroSessionCreate,
     PomodoroSessionResponse,
     PomodoroSessionListResponse,
     PomodoroStatsResponse,
+    PomodoroTimeseriesBucket,
+    PomodoroTimeseriesResponse,
+    PomodoroHeatmapResponse,
 )
+from src.schemas.batch import BatchRequest, BatchResponse, BatchSubRequest, BatchSubResponse
+from src.schemas.sync import SyncDeletion, SyncResponse
+from src.schemas.claude import AskRequest, AskResponse, PromptContextResponse, PromptSection
+from src.schemas.job import JobAccepted, JobCreate, JobResponse
 
 __all__ = [
     "TaskCreate",
     "TaskUpdate",
     "TaskResponse",
     "TaskListResponse",
+    "TaskSearchHit",
+    "TaskSearchResponse",
+    "TagCount",
+    "TagListResponse",
     "PomodoroSessionCreate",
     "PomodoroSessionResponse",
     "PomodoroSessionListResponse",
     "PomodoroStatsResponse",
+    "PomodoroTimeseriesBucket",
+    "PomodoroTimeseriesResponse",
+    "PomodoroHeatmapResponse",
+    "BatchRequest",
+    "BatchResponse",
+    "BatchSubRequest",
+    "BatchSubResponse",
+    "SyncDeletion",
+    "SyncResponse",
+    "AskRequest",
+    "AskResponse",
+    "PromptContextResponse",
+    "PromptSection",
+    "JobCreate",
+    "JobAccepted",
+    "JobResponse",
 ]
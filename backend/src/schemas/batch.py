@@ -0,0 +1,41 @@
+"""Request batch schemas."""
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field, field_validator
+
+BATCH_PATH_PREFIXES = ("/api/tasks", "/api/pomodoro")
+
+
+class BatchSubRequest(BaseModel):
+    """Schema for one sub-request of a batch."""
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"]
+    path: str = Field(..., description="e.g. /api/tasks/${0.id}")
+    query: Optional[Dict[str, Any]] = None
+    body: Optional[Any] = None
+
+    @field_validator("path")
+    @classmethod
+    def check_path(cls, path: str) -> str:
+        """Only the task and Pomodoro routes can be batched."""
+        if not any(
+            path == prefix or path.startswith(f"{prefix}/") for prefix in BATCH_PATH_PREFIXES
+        ):
+            raise ValueError(f"path must start with one of {', '.join(BATCH_PATH_PREFIXES)}")
+        return path
+
+
+class BatchRequest(BaseModel):
+    """Schema for an ordered list of sub-requests."""
+    requests: List[BatchSubRequest] = Field(..., min_length=1)
+    atomic: bool = Field(False, description="Commit all writes together or none")
+
+
+class BatchSubResponse(BaseModel):
+    """Schema for the response to one sub-request."""
+    status: int
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    """Schema for the responses of a batch, in request order."""
+    responses: List[BatchSubResponse]
+    committed: bool
@@ -0,0 +1,30 @@
+"""Claude prompt schemas."""
+from typing import Dict, List
+from pydantic import BaseModel, Field
+
+
+class PromptSection(BaseModel):
+    """Schema for one section of the prompt context."""
+    name: str
+    tokens: int
+    cached: bool
+
+
+class PromptContextResponse(BaseModel):
+    """Schema for the context prepended to the user's prompts."""
+    text: str
+    tokens: int
+    prefix_hash: str = Field(..., description="Changes whenever the context text changes")
+    sections: List[PromptSection]
+
+
+class AskRequest(BaseModel):
+    """Schema for a question to Claude."""
+    question: str = Field(..., min_length=1, max_length=4000)
+
+
+class AskResponse(BaseModel):
+    """Schema for Claude's answer."""
+    answer: str
+    prefix_hash: str
+    usage: Dict[str, int]
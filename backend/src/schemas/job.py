@@ -0,0 +1,35 @@
+"""Background job schemas."""
+from datetime import datetime
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, Field
+from src.models.job import JobStatus
+
+
+class JobCreate(BaseModel):
+    """Schema for enqueuing a job."""
+    kind: str
+    payload: Dict[str, Any] = Field(default_factory=dict)
+    priority: int = Field(default=0, description="Higher runs first")
+    delay: float = Field(default=0.0, ge=0, description="Seconds before the job may start")
+
+
+class JobAccepted(BaseModel):
+    """Schema for a job handed to the worker."""
+    job_id: int
+    status: JobStatus
+
+
+class JobResponse(BaseModel):
+    """Schema for a job's state."""
+    id: int
+    kind: str
+    status: JobStatus
+    priority: int
+    attempts: int
+    max_attempts: int
+    visible_at: datetime
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    result: Optional[Any] = None
@@ -1,5 +1,5 @@
 """Pomodoro session schemas for API requests and responses."""
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List
 from pydantic import BaseModel, Field
 from src.models.pomodoro import SessionType, SessionStatus
@@ -35,6 +35,7 @@ class PomodoroSessionResponse(BaseModel):
     session_number: int
     notes: Optional[str] = None
     interruptions: int
+    row_version: int = 0
 
     class Config:
         from_attributes = True
@@ -57,3 +58,37 @@ class PomodoroStatsResponse(BaseModel):
     today_sessions: int
     today_work_time: int
     current_streak: int
+
+
+class PomodoroTimeseriesBucket(BaseModel):
+    """Schema for the session totals of one time bucket."""
+    start: datetime
+    end: datetime
+    work_time: int  # in seconds
+    break_time: int  # in seconds
+    sessions: int
+    completed_sessions: int
+    interrupted_sessions: int
+    interruptions: int
+
+
+class PomodoroTimeseriesResponse(BaseModel):
+    """Schema for bucketed Pomodoro statistics."""
+    bucket: str
+    timezone: str
+    buckets: List[PomodoroTimeseriesBucket]
+
+
+class PomodoroHeatmapResponse(BaseModel):
+    """Schema for the daily focus-minutes calendar."""
+    start: date
+    days: int
+    timezone: str
+    encoding: str = Field(
+        default="uint16le-base64",
+        description="Daily focus minutes as base64 of little-endian uint16 values",
+    )
+    minutes: str
+    quantiles: List[int] = Field(..., description="Quartile cut points of active days")
+    total_minutes: int
+    active_days: int
@@ -0,0 +1,23 @@
+"""Incremental sync schemas."""
+from datetime import datetime
+from typing import List
+from pydantic import BaseModel, Field
+from src.schemas.pomodoro import PomodoroSessionResponse
+from src.schemas.task import TaskResponse
+
+
+class SyncDeletion(BaseModel):
+    """Schema for a deleted row."""
+    entity: str
+    id: int
+    row_version: int
+    deleted_at: datetime
+
+
+class SyncResponse(BaseModel):
+    """Schema for one page of changes since a version."""
+    version: int = Field(..., description="Pass as `since` to fetch the next changes")
+    has_more: bool
+    tasks: List[TaskResponse]
+    sessions: List[PomodoroSessionResponse]
+    deleted: List[SyncDeletion]
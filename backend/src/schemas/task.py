@@ -37,9 +37,14 @@ class TaskResponse(TaskBase):
     id: int
     status: TaskStatus
     completed_pomodoros: int
+    total_focus_seconds: int = 0
+    interrupted_sessions: int = 0
+    last_worked_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
     completed_at: Optional[datetime] = None
+    source_path: Optional[str] = None
+    row_version: int = 0
 
     class Config:
         from_attributes = True
@@ -49,3 +54,27 @@ class TaskListResponse(BaseModel):
     """Schema for list of tasks."""
     tasks: List[TaskResponse]
     total: int
+
+
+class TaskSearchHit(BaseModel):
+    """Schema for a single full-text search result."""
+    task: TaskResponse
+    score: float = Field(..., description="bm25 score (lower is more relevant)")
+    snippet: str
+
+
+class TaskSearchResponse(BaseModel):
+    """Schema for a page of full-text search results."""
+    results: List[TaskSearchHit]
+    next_cursor: Optional[str] = None
+
+
+class TagCount(BaseModel):
+    """Schema for a tag and the number of tasks carrying it."""
+    name: str
+    count: int
+
+
+class TagListResponse(BaseModel):
+    """Schema for tag cardinalities."""
+    tags: List[TagCount]
@@ -0,0 +1 @@
+"""Business logic and background services."""
@@ -0,0 +1,253 @@
+"""Hot/cold storage for Pomodoro sessions.
+
+Finished sessions older than ``settings.session_archive_after_days`` are
+moved to ``pomodoro_sessions_archive`` in small batches, each its own short
+transaction. Their aggregates are carried forward in
+``pomodoro_archive_totals`` so all-time stats stay correct without reading
+the archive; queries over a range that starts before a user's
+``archived_before`` watermark read the union of both tables.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import case, delete, func, insert as core_insert, select, union_all
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.sql import FromClause
+
+from src.core.config import settings
+from src.core.database import session_makers
+from src.models.pomodoro import (
+    ArchivedPomodoroSession,
+    PomodoroArchiveTotal,
+    PomodoroSession,
+    SessionStatus,
+    SessionType,
+)
+
+logger = logging.getLogger(__name__)
+
+HOT = PomodoroSession.__table__
+COLD = ArchivedPomodoroSession.__table__
+SESSION_COLUMNS = tuple(column.name for column in HOT.columns)
+
+
+def sessions_union(user_id: Optional[str] = None, since: Optional[datetime] = None) -> FromClause:
+    """
+    Hot and archived sessions as one selectable with the session columns.
+
+    Filters are applied inside both halves so each uses its own indexes.
+    """
+    halves = []
+    for table in (HOT, COLD):
+        half = select(*(table.c[name] for name in SESSION_COLUMNS))
+        if user_id is not None:
+            half = half.where(table.c.user_id == user_id)
+        if since is not None:
+            half = half.where(table.c.started_at >= since)
+        halves.append(half)
+    return union_all(*halves).subquery("all_sessions")
+
+
+async def archive_watermark(db: AsyncSession, user_id: str) -> Optional[datetime]:
+    """Start time before which some of the user's sessions may be archived."""
+    result = await db.execute(
+        select(PomodoroArchiveTotal.archived_before).where(PomodoroArchiveTotal.user_id == user_id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def session_source(
+    db: AsyncSession,
+    user_id: str,
+    since: Optional[datetime] = None,
+) -> FromClause:
+    """
+    Sessions table to read for a range starting at ``since`` (None: all time).
+
+    Returns the hot table unless the range reaches into archived data.
+    """
+    watermark = await archive_watermark(db, user_id)
+    if watermark is None or (since is not None and since >= watermark):
+        return HOT
+    return sessions_union(user_id, since)
+
+
+async def archive_totals(db: AsyncSession, user_id: str) -> Optional[PomodoroArchiveTotal]:
+    """Carried-forward aggregates of the user's archived sessions, if any."""
+    result = await db.execute(
+        select(PomodoroArchiveTotal).where(PomodoroArchiveTotal.user_id == user_id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def archive_user_sessions(
+    db: AsyncSession,
+    user_id: str,
+    cutoff: datetime,
+    batch_size: Optional[int] = None,
+    pause: Optional[float] = None,
+) -> int:
+    """
+    Move a user's finished sessions that started before ``cutoff`` to the archive.
+
+    Each batch copies, aggregates and deletes up to ``batch_size`` sessions
+    in one transaction, then sleeps ``pause`` seconds so API writers get the
+    write lock in between.
+
+    Args:
+        db: Database session (committed after every batch)
+        user_id: Owner of the sessions
+        cutoff: Archive sessions that started before this time (naive UTC)
+        batch_size: Sessions per transaction
+        pause: Seconds to sleep between batches
+
+    Returns:
+        int: Number of sessions archived
+    """
+    batch_size = batch_size or settings.session_archive_batch_size
+    pause = settings.session_archive_batch_pause if pause is None else pause
+    archived = 0
+
+    while True:
+        ids = (await db.execute(
+            select(HOT.c.id)
+            .where(
+                HOT.c.user_id == user_id,
+                HOT.c.started_at < cutoff,
+                HOT.c.status != SessionStatus.ACTIVE,
+            )
+            .order_by(HOT.c.started_at)
+            .limit(batch_size)
+        )).scalars().all()
+        if not ids:
+            break
+
+        batch = HOT.c.id.in_(ids)
+        duration = func.coalesce(HOT.c.actual_duration, 0)
+        is_break = HOT.c.session_type.in_([SessionType.SHORT_BREAK, SessionType.LONG_BREAK])
+        totals = (await db.execute(
+            select(
+                func.count(),
+                func.sum(case((HOT.c.status == SessionStatus.COMPLETED, 1), else_=0)),
+                func.sum(case((HOT.c.session_type == SessionType.WORK, duration), else_=0)),
+                func.sum(case((is_break, duration), else_=0)),
+                func.coalesce(func.sum(HOT.c.actual_duration), 0),
+                func.count(HOT.c.actual_duration),
+                func.sum(HOT.c.interruptions),
+            ).where(batch)
+        )).one()
+        values = dict(zip(
+            ("sessions", "completed_sessions", "work_time", "break_time",
+             "duration_sum", "duration_count", "interruptions"),
+            totals,
+        ))
+
+        await db.execute(core_insert(COLD).from_select(
+            SESSION_COLUMNS, select(*(HOT.c[name] for name in SESSION_COLUMNS)).where(batch)
+        ))
+        upsert = insert(PomodoroArchiveTotal).values(
+            user_id=user_id, archived_before=cutoff, **values
+        )
+        await db.execute(upsert.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={
+                "archived_before": func.max(
+                    PomodoroArchiveTotal.archived_before, upsert.excluded.archived_before
+                ),
+                **{
+                    name: getattr(PomodoroArchiveTotal, name) + getattr(upsert.excluded, name)
+                    for name in values
+                },
+            },
+        ))
+        await db.execute(delete(HOT).where(batch))
+        await db.commit()
+
+        archived += len(ids)
+        if len(ids) < batch_size:
+            break
+        await asyncio.sleep(pause)
+
+    return archived
+
+
+async def archive_sessions(
+    db: AsyncSession,
+    cutoff: datetime,
+    batch_size: Optional[int] = None,
+    pause: Optional[float] = None,
+) -> int:
+    """Archive every user's sessions that started before ``cutoff``."""
+    users = (await db.execute(select(HOT.c.user_id).distinct())).scalars().all()
+    archived = 0
+    for user_id in users:
+        archived += await archive_user_sessions(db, user_id, cutoff, batch_size, pause)
+    return archived
+
+
+def archive_cutoff(days: Optional[int] = None) -> Optional[datetime]:
+    """Cutoff for the configured policy, or None when archival is disabled."""
+    days = settings.session_archive_after_days if days is None else days
+    if days <= 0:
+        return None
+    return datetime.utcnow() - timedelta(days=days)
+
+
+class SessionArchiver:
+    """Runs the archival policy periodically in the background."""
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        interval: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval if interval is not None else settings.session_archive_interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self, cutoff: Optional[datetime] = None) -> int:
+        """Archive everything started before ``cutoff`` (defaults to the configured age)."""
+        cutoff = cutoff or archive_cutoff()
+        if cutoff is None:
+            return 0
+        archived = 0
+        # The main database and, with sharding enabled, every user's shard
+        async for factory in session_makers(self.session_factory):
+            async with factory() as session:
+                archived += await archive_sessions(session, cutoff)
+        if archived:
+            logger.info(f"Archived {archived} sessions started before {cutoff.isoformat()}")
+        return archived
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Session archival failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start the background archival task (no-op when archival is disabled)."""
+        if self._task is None and settings.session_archive_after_days > 0:
+            self._task = asyncio.create_task(self._run(), name="session-archiver")
+            logger.info(
+                f"Session archiver started (after {settings.session_archive_after_days} days)"
+            )
+
+    async def stop(self):
+        """Stop the background archival task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global archiver instance, started by the application lifespan
+session_archiver = SessionArchiver()
@@ -0,0 +1,248 @@
+"""Online backups of the SQLite database files.
+
+Each run copies every database file (the main database plus per-user shards
+when sharding is enabled) with SQLite's online backup API, a few pages per
+step with a short sleep in between, so the read lock on the live database is
+only held for milliseconds at a time. A write from another connection makes
+the backup start over; after ``settings.backup_max_restarts`` restarts the
+file is copied in a single step instead, which always finishes. Copies are
+integrity-checked, gzipped and published atomically as one timestamped
+directory per run; only the newest ``settings.backup_retention`` runs are
+kept.
+"""
+import asyncio
+import glob
+import gzip
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy.engine import make_url
+
+from src.core.config import settings
+from src.core.metrics import BACKUP_BYTES, BACKUP_DURATION, BACKUP_LAST_SUCCESS, BACKUPS
+
+logger = logging.getLogger(__name__)
+
+RUN_NAME_FORMAT = "%Y%m%dT%H%M%S.%fZ"
+RUN_NAME_PATTERN = re.compile(r"^\d{8}T\d{6}\.\d{6}Z$")
+
+
+class BackupError(Exception):
+    """A backup copy failed its integrity check."""
+
+
+class _TooManyRestarts(Exception):
+    """Writes keep restarting a stepped backup."""
+
+
+@dataclass
+class BackupResult:
+    """Outcome of one backup run."""
+    name: str
+    path: str
+    files: List[str] = field(default_factory=list)
+    bytes: int = 0
+    duration: float = 0.0
+
+
+def database_files() -> List[str]:
+    """Paths of the SQLite files holding application data."""
+    paths = []
+    main = make_url(settings.database_url).database
+    if main and main != ":memory:" and os.path.exists(main):
+        paths.append(main)
+    if settings.db_sharding_enabled:
+        paths.extend(sorted(glob.glob(os.path.join(settings.db_shard_dir, "*.db"))))
+    return paths
+
+
+def backup_file(
+    source: str,
+    target: str,
+    pages_per_step: Optional[int] = None,
+    step_sleep: Optional[float] = None,
+    max_restarts: Optional[int] = None,
+) -> int:
+    """
+    Copy a live SQLite database to a gzipped file.
+
+    Args:
+        source: Database file to back up
+        target: Path of the ``.gz`` file to write
+        pages_per_step: Pages copied per backup step
+        step_sleep: Seconds to sleep between steps (no lock is held meanwhile)
+        max_restarts: Restarts caused by concurrent writes before the rest
+            is copied in a single step
+
+    Returns:
+        int: Size of the compressed file in bytes
+
+    Raises:
+        BackupError: If the copy fails ``PRAGMA integrity_check``
+    """
+    pages = pages_per_step or settings.backup_pages_per_step
+    pause = settings.backup_step_sleep if step_sleep is None else step_sleep
+    limit = settings.backup_max_restarts if max_restarts is None else max_restarts
+    copy = f"{target}.db"
+    restarts = 0
+    previous = None
+
+    def between_steps(status: int, remaining: int, total: int):
+        nonlocal restarts, previous
+        # A write from another connection sends the copy back to the start
+        if previous is not None and remaining > previous:
+            restarts += 1
+            if restarts > limit:
+                raise _TooManyRestarts()
+        previous = remaining
+        if remaining:
+            time.sleep(pause)
+
+    src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    dst = sqlite3.connect(copy)
+    try:
+        try:
+            src.backup(dst, pages=pages, progress=between_steps)
+        except _TooManyRestarts:
+            logger.warning(
+                f"Backup of {source} restarted {restarts} times, copying in one step"
+            )
+            src.backup(dst)
+        result = dst.execute("PRAGMA integrity_check").fetchone()[0]
+        if result != "ok":
+            raise BackupError(f"Integrity check failed for {source}: {result}")
+    finally:
+        dst.close()
+        src.close()
+
+    try:
+        with open(copy, "rb") as raw, gzip.open(target, "wb") as compressed:
+            shutil.copyfileobj(raw, compressed)
+    finally:
+        os.remove(copy)
+    return os.path.getsize(target)
+
+
+def list_backups(backup_dir: Optional[str] = None) -> List[str]:
+    """Completed backup run directories, oldest first."""
+    backup_dir = backup_dir or settings.backup_dir
+    if not os.path.isdir(backup_dir):
+        return []
+    return sorted(
+        os.path.join(backup_dir, name)
+        for name in os.listdir(backup_dir)
+        if RUN_NAME_PATTERN.match(name)
+    )
+
+
+def rotate_backups(retention: Optional[int] = None, backup_dir: Optional[str] = None) -> List[str]:
+    """
+    Delete all but the newest ``retention`` backup runs.
+
+    Returns:
+        list: Removed run directories
+    """
+    retention = settings.backup_retention if retention is None else retention
+    runs = list_backups(backup_dir)
+    expired = runs[:-retention] if retention > 0 else runs
+    for path in expired:
+        shutil.rmtree(path, ignore_errors=True)
+    return expired
+
+
+def run_backup(backup_dir: Optional[str] = None) -> BackupResult:
+    """
+    Back up every database file into a new run directory (synchronous).
+
+    The run is written to a ``.partial`` directory and renamed once every
+    file has been copied and checked, so incomplete runs are never listed.
+    """
+    backup_dir = backup_dir or settings.backup_dir
+    name = datetime.utcnow().strftime(RUN_NAME_FORMAT)
+    final = os.path.join(backup_dir, name)
+    partial = f"{final}.partial"
+    os.makedirs(partial)
+
+    start = time.perf_counter()
+    result = BackupResult(name=name, path=final)
+    try:
+        for source in database_files():
+            target = os.path.join(partial, f"{os.path.basename(source)}.gz")
+            result.bytes += backup_file(source, target)
+            result.files.append(os.path.basename(target))
+        os.rename(partial, final)
+    except Exception:
+        shutil.rmtree(partial, ignore_errors=True)
+        raise
+    result.duration = time.perf_counter() - start
+    return result
+
+
+class BackupService:
+    """Runs backups on demand and on a schedule, one at a time."""
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval if interval is not None else settings.backup_interval
+        self.last_result: Optional[BackupResult] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    async def run(self) -> BackupResult:
+        """Back up, rotate old runs and record metrics."""
+        async with self._lock:
+            try:
+                result = await asyncio.to_thread(run_backup)
+                await asyncio.to_thread(rotate_backups)
+            except Exception:
+                BACKUPS.labels(result="failure").inc()
+                raise
+
+        BACKUPS.labels(result="success").inc()
+        BACKUP_DURATION.observe(result.duration)
+        BACKUP_BYTES.set(result.bytes)
+        BACKUP_LAST_SUCCESS.set(time.time())
+        self.last_result = result
+        logger.info(
+            f"Backup {result.name}: {len(result.files)} files, "
+            f"{result.bytes} bytes in {result.duration:.2f}s"
+        )
+        return result
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run()
+            except Exception as e:
+                logger.error(f"Backup failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start scheduled backups (no-op unless ``BACKUP_ENABLED``)."""
+        if self._task is None and settings.backup_enabled:
+            self._task = asyncio.create_task(self._run(), name="backup-scheduler")
+            logger.info(f"Backup scheduler started (interval {self.interval}s)")
+
+    async def stop(self):
+        """Stop scheduled backups."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global backup service, scheduled by the application lifespan
+backup_service = BackupService()
@@ -0,0 +1,104 @@
+"""Client for the Claude Messages API.
+
+Prompts put the fixed instructions and the user's context (see
+``prompt_context``) in the system prompt and only the question in the
+messages. Each context section is its own system block with a cache
+breakpoint, so after a write the API still serves the prefix up to the
+first changed section from its prompt cache.
+"""
+from typing import Any, Dict, Optional
+
+import httpx
+
+from src.core.config import settings
+from src.services.prompt_context import PromptContext
+
+ANTHROPIC_VERSION = "2023-06-01"
+
+INSTRUCTIONS = (
+    "You are the focus coach of a Pomodoro and task manager. Answer using the "
+    "user's tasks, sessions and streaks below. Be brief and concrete; when "
+    "suggesting what to work on, name tasks exactly as listed."
+)
+
+
+class ClaudeError(Exception):
+    """The Messages API could not be reached or returned an error."""
+
+
+class ClaudeClient:
+    """Pooled async client for the Messages API."""
+
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None):
+        self.base_url = base_url or settings.claude_api_url
+        self.api_key = api_key or settings.claude_api_key
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "x-api-key": self.api_key or "",
+                    "anthropic-version": ANTHROPIC_VERSION,
+                    "content-type": "application/json",
+                },
+                timeout=settings.claude_request_timeout,
+            )
+        return self._client
+
+    @staticmethod
+    def request_body(context: PromptContext, question: str) -> Dict[str, Any]:
+        """Messages API request with one cache breakpoint after each context section."""
+        sections = [
+            {"type": "text", "text": section.text, "cache_control": {"type": "ephemeral"}}
+            for section in context.sections
+        ]
+        return {
+            "model": settings.claude_model,
+            "max_tokens": settings.claude_max_tokens,
+            "system": [{"type": "text", "text": INSTRUCTIONS}, *sections],
+            "messages": [{"role": "user", "content": question}],
+        }
+
+    async def ask(self, context: PromptContext, question: str) -> Dict[str, Any]:
+        """
+        Ask a question about the user's focus data.
+
+        Args:
+            context: Prompt context of the user
+            question: The user's question
+
+        Returns:
+            dict: ``answer`` text and the API's token ``usage``
+
+        Raises:
+            ClaudeError: If the request fails
+        """
+        try:
+            response = await self._get_client().post(
+                "/v1/messages", json=self.request_body(context, question)
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise ClaudeError(f"Claude request failed: {e}") from e
+
+        data = response.json()
+        blocks = data.get("content", [])
+        answer = "".join(
+            block.get("text", "") for block in blocks if block.get("type") == "text"
+        )
+        return {"answer": answer, "usage": data.get("usage", {})}
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Global client instance
+claude_client = ClaudeClient()
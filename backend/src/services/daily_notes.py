@@ -0,0 +1,326 @@
+"""Write-back of completed Pomodoro sessions to Obsidian daily notes.
+
+Completing a session only inserts a line into the ``obsidian_outbox``
+table, in the same transaction, so request latency never includes vault
+I/O and nothing is lost across restarts. The ``DailyNoteWriter`` wakes up
+after commits, waits a debounce window so a burst of completions costs one
+write per note, and rewrites each affected note atomically (temp file in
+the same directory, then rename) with ``aiofiles``. Every line ends with a
+``^focus-<id>`` block id, so replaying the outbox after a crash never
+duplicates a line.
+
+With ``WORKER_ENABLED`` the API does not write notes itself: the commit
+also queues a ``daily_notes`` job, delayed by the debounce window, that
+the worker runs.
+"""
+import asyncio
+import logging
+import os
+import re
+import uuid
+from collections import defaultdict
+from contextlib import nullcontext
+from datetime import timezone
+from typing import Dict, List, Optional, Set
+
+import aiofiles
+import aiofiles.os
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import async_session_maker, user_session
+from src.core.write_batcher import after_commit
+from src.models.obsidian import ObsidianOutbox
+from src.models.pomodoro import PomodoroSession, SessionType
+from src.models.task import Task
+from src.services.daily_totals import local_day
+from src.services.jobs import enqueue
+from src.services.timeseries import resolve_timezone
+
+logger = logging.getLogger(__name__)
+
+# Block id at the end of a line, matched exactly (^focus-1 is not ^focus-12)
+BLOCK_ID = re.compile(r"\^focus-\d+(?=\s*$)")
+
+SESSION_LABELS = {
+    SessionType.WORK: "Focus",
+    SessionType.SHORT_BREAK: "Short break",
+    SessionType.LONG_BREAK: "Long break",
+}
+
+
+def block_id(session_id: int) -> str:
+    """Obsidian block id marking a session's line."""
+    return f"^focus-{session_id}"
+
+
+def daily_note_path(session: PomodoroSession) -> str:
+    """Vault-relative path of the daily note for the session's local day."""
+    day = local_day(session.started_at, resolve_timezone(None))
+    name = f"{day.strftime(settings.obsidian_daily_note_format)}.md"
+    folder = settings.obsidian_daily_notes_folder.strip("/")
+    return f"{folder}/{name}" if folder else name
+
+
+def session_line(session: PomodoroSession, task_title: Optional[str] = None) -> str:
+    """Markdown list item describing a finished session."""
+    tz = resolve_timezone(None)
+    start = session.started_at.replace(tzinfo=timezone.utc).astimezone(tz)
+    end = (session.ended_at or session.started_at).replace(tzinfo=timezone.utc).astimezone(tz)
+    minutes = round((session.actual_duration or 0) / 60)
+    line = f"- {start:%H:%M}-{end:%H:%M} {SESSION_LABELS[session.session_type]} ({minutes} min)"
+    if task_title:
+        line += f": {task_title}"
+    return f"{line} {block_id(session.id)}"
+
+
+def merge_lines(content: str, lines: List[str], heading: Optional[str] = None) -> str:
+    """
+    Add lines under the heading of a note, skipping ones already present.
+
+    The heading is created at the end of the note when missing; new lines
+    go after the last non-blank line of its section.
+
+    Args:
+        content: Current note contents
+        lines: Lines ending in a ``^focus-<id>`` block id
+        heading: Section heading (defaults to the configured one)
+
+    Returns:
+        str: New note contents (unchanged when every line is present)
+    """
+    heading = heading or settings.obsidian_daily_note_heading
+    present = {match.group() for match in map(BLOCK_ID.search, content.splitlines()) if match}
+    missing = [line for line in lines if line.rsplit(" ", 1)[-1] not in present]
+    if not missing:
+        return content
+
+    existing = content.splitlines()
+    level = len(heading) - len(heading.lstrip("#"))
+    try:
+        start = existing.index(heading)
+    except ValueError:
+        prefix = content.rstrip("\n")
+        section = "\n".join([heading, *missing]) + "\n"
+        return f"{prefix}\n\n{section}" if prefix else section
+
+    end = len(existing)
+    for index in range(start + 1, len(existing)):
+        stripped = existing[index].lstrip()
+        if stripped.startswith("#") and len(stripped) - len(stripped.lstrip("#")) <= level:
+            end = index
+            break
+    insert_at = end
+    while insert_at > start + 1 and not existing[insert_at - 1].strip():
+        insert_at -= 1
+    merged = existing[:insert_at] + missing + existing[insert_at:]
+    return "\n".join(merged) + "\n"
+
+
+async def enqueue_session(db: AsyncSession, user_id: str, session: PomodoroSession) -> bool:
+    """
+    Add a completed session's line to the outbox, in the write transaction.
+
+    Only the default user's sessions are written back, matching the user
+    vault tasks are imported for. Once the write has committed, call
+    ``outbox_written`` if a line was added.
+
+    Returns:
+        bool: Whether a line was added
+    """
+    if not settings.obsidian_sync_enabled or user_id != settings.default_user_id:
+        return False
+    title = None
+    if session.task_id is not None:
+        title = (await db.execute(
+            select(Task.title).where(Task.id == session.task_id, Task.user_id == user_id)
+        )).scalar_one_or_none()
+    db.add(ObsidianOutbox(
+        session_id=session.id,
+        note_path=daily_note_path(session),
+        line=session_line(session, title),
+    ))
+    if settings.worker_enabled and not settings.db_sharding_enabled:
+        # The worker writes the notes; queued once per debounce window
+        await enqueue(
+            db, "daily_notes", delay=settings.obsidian_writeback_debounce, unique_key="daily_notes",
+        )
+    return True
+
+
+def outbox_written():
+    """Start writing the notes of outbox lines added by a committed write."""
+    if not settings.worker_enabled:
+        after_commit(daily_note_writer.notify)
+    elif settings.db_sharding_enabled:
+        # The queue is in the main database, not in this user's shard
+        after_commit(_queue_flush_job)
+
+
+# Flush jobs being queued in the main database
+_queueing: Set[asyncio.Task] = set()
+
+
+def _queue_flush_job():
+    """Queue a ``daily_notes`` job in the main database, in the background."""
+    async def queue():
+        try:
+            async with async_session_maker() as session:
+                await enqueue(
+                    session, "daily_notes",
+                    delay=settings.obsidian_writeback_debounce, unique_key="daily_notes",
+                )
+                await session.commit()
+        except Exception as e:
+            # The periodic daily_notes job drains the outbox anyway
+            logger.error(f"Queueing daily note write-back failed: {e}", exc_info=True)
+
+    task = asyncio.create_task(queue())
+    _queueing.add(task)
+    task.add_done_callback(_queueing.discard)
+
+
+async def write_note(path: str, lines: List[str]) -> bool:
+    """
+    Merge lines into a note, replacing the file atomically.
+
+    The temporary file is a dotfile in the note's directory, so the rename
+    stays on one filesystem and the vault indexer never sees it.
+
+    Returns:
+        bool: Whether the note changed
+    """
+    try:
+        async with aiofiles.open(path, "r", encoding="utf-8") as handle:
+            content = await handle.read()
+    except FileNotFoundError:
+        content = ""
+
+    merged = merge_lines(content, lines)
+    if merged == content:
+        return False
+
+    directory, name = os.path.split(path)
+    await aiofiles.os.makedirs(directory, exist_ok=True)
+    temp = os.path.join(directory, f".{name}.{uuid.uuid4().hex}.tmp")
+    try:
+        async with aiofiles.open(temp, "w", encoding="utf-8") as handle:
+            await handle.write(merged)
+            await handle.flush()
+            await asyncio.to_thread(os.fsync, handle.fileno())
+        await aiofiles.os.replace(temp, path)
+    except BaseException:
+        try:
+            await aiofiles.os.remove(temp)
+        except FileNotFoundError:
+            pass
+        raise
+    return True
+
+
+class DailyNoteWriter:
+    """Drains the outbox into daily notes, debounced and one note at a time."""
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        root: Optional[str] = None,
+        debounce: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.root = root or settings.obsidian_vault_path
+        self.debounce = settings.obsidian_writeback_debounce if debounce is None else debounce
+        self.notes_written = 0
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def notify(self):
+        """Signal that new lines were committed to the outbox."""
+        self._wake.set()
+
+    async def flush(self, db: Optional[AsyncSession] = None) -> int:
+        """
+        Write every queued line to its note and clear it from the outbox.
+
+        Args:
+            db: Session to use (a new one is opened when omitted)
+
+        Returns:
+            int: Number of notes rewritten
+
+        Raises:
+            FileNotFoundError: If the vault directory does not exist
+        """
+        if not self.root or not os.path.isdir(self.root):
+            raise FileNotFoundError(f"Obsidian vault not found: {self.root}")
+
+        async with self._lock:
+            # The outbox is written with the default user's sessions
+            context = (
+                nullcontext(db) if db is not None
+                else user_session(settings.default_user_id, self.session_factory)
+            )
+            async with context as session:
+                rows = (await session.execute(
+                    select(ObsidianOutbox).order_by(ObsidianOutbox.id)
+                )).scalars().all()
+                by_note: Dict[str, List[ObsidianOutbox]] = defaultdict(list)
+                for row in rows:
+                    by_note[row.note_path].append(row)
+
+                written = 0
+                for note_path, entries in by_note.items():
+                    full = os.path.join(self.root, *note_path.split("/"))
+                    if await write_note(full, [entry.line for entry in entries]):
+                        written += 1
+                    # Cleared note by note, so a failure keeps only unwritten lines
+                    await session.execute(
+                        delete(ObsidianOutbox).where(ObsidianOutbox.id.in_([e.id for e in entries]))
+                    )
+                    await session.commit()
+
+        self.notes_written += written
+        if rows:
+            logger.info(f"Wrote {len(rows)} sessions to {len(by_note)} daily notes")
+        return written
+
+    async def _run(self):
+        retry: Optional[float] = None
+        # Drain whatever was queued before a restart
+        self._wake.set()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=retry)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            # Let a burst of completions accumulate
+            await asyncio.sleep(self.debounce)
+            try:
+                await self.flush()
+                retry = None
+            except Exception as e:
+                logger.error(f"Daily note write-back failed: {e}", exc_info=True)
+                retry = settings.obsidian_writeback_retry
+
+    def start(self):
+        """Start the write-back loop (no-op unless ``OBSIDIAN_SYNC_ENABLED``)."""
+        if self._task is None and settings.obsidian_sync_enabled:
+            self._task = asyncio.create_task(self._run(), name="daily-note-writer")
+            logger.info(f"Daily note write-back started (vault {self.root})")
+
+    async def stop(self):
+        """Stop the write-back loop; queued lines stay in the outbox."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global writer, started by the application lifespan
+daily_note_writer = DailyNoteWriter()
@@ -0,0 +1,184 @@
+"""Precomputed per-day Pomodoro totals backing the activity heatmap.
+
+Days follow ``settings.stats_timezone``. Session writes recompute only the
+rows of the days they touched, so reading a year of activity never scans
+``pomodoro_sessions``. The rows hold every timeseries field and also
+serve the day, week and month stats timeseries (see ``timeseries``).
+Totals are grouped by the sessions' ``day`` column; after changing the
+timezone, run ``rebuild_session_days`` and then ``rebuild_daily_totals``.
+"""
+import base64
+import statistics
+import struct
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.pomodoro import (
+    ArchivedPomodoroSession,
+    PomodoroDailyTotal,
+    PomodoroSession,
+)
+from src.services.archive import session_source, sessions_union
+from src.services.timeseries import DAILY_TOTAL_COLUMNS, resolve_timezone, session_totals
+
+UINT16_MAX = 0xFFFF
+
+# Sessions re-bucketed per statement by rebuild_session_days
+REBUCKET_BATCH_SIZE = 5000
+
+
+def local_day(instant: datetime, tz: ZoneInfo) -> date:
+    """Local calendar day of a naive UTC instant."""
+    return instant.replace(tzinfo=timezone.utc).astimezone(tz).date()
+
+
+def day_bounds(day: date, tz: ZoneInfo) -> Tuple[datetime, datetime]:
+    """Naive UTC ``[start, end)`` of a local calendar day."""
+    start, end = (
+        datetime.combine(d, time(), tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+        for d in (day, day + timedelta(days=1))
+    )
+    return start, end
+
+
+async def refresh_daily_totals(db: AsyncSession, user_id: str, *instants: datetime):
+    """
+    Recompute the totals of the days containing the given session start times.
+
+    Call it inside the write transaction, after flushing the session changes.
+
+    Args:
+        db: Database session
+        user_id: Owner of the sessions
+        *instants: ``started_at`` of every session the write touched
+    """
+    tz = resolve_timezone(None)
+    for day in sorted({local_day(instant, tz) for instant in instants}):
+        start, _ = day_bounds(day, tz)
+        source = await session_source(db, user_id, start)
+        totals = (await db.execute(
+            select(*session_totals(source)).where(
+                source.c.user_id == user_id,
+                source.c.day == day,
+            )
+        )).one()
+        values = {name: value or 0 for name, value in zip(DAILY_TOTAL_COLUMNS, totals)}
+
+        if not values["sessions"]:
+            await db.execute(delete(PomodoroDailyTotal).where(
+                PomodoroDailyTotal.user_id == user_id,
+                PomodoroDailyTotal.day == day,
+            ))
+            continue
+
+        await db.execute(
+            insert(PomodoroDailyTotal)
+            .values(user_id=user_id, day=day, **values)
+            .on_conflict_do_update(index_elements=["user_id", "day"], set_=values)
+        )
+
+
+def rebuild_session_days(conn: Connection) -> int:
+    """
+    Recompute the ``day`` of every hot and archived session (synchronous).
+
+    Needed after changing ``settings.stats_timezone``. Updates bump the
+    sessions' sync row versions, so clients pull them again.
+
+    Args:
+        conn: Connection inside a transaction
+
+    Returns:
+        int: Number of sessions whose day changed
+    """
+    tz = resolve_timezone(None)
+    changed = 0
+    for source in (PomodoroSession.__table__, ArchivedPomodoroSession.__table__):
+        statement = (
+            update(source)
+            .where(source.c.id == bindparam("session_id"))
+            .values(day=bindparam("session_day"))
+        )
+        moved = []
+        for session_id, started_at, day in conn.execute(
+            select(source.c.id, source.c.started_at, source.c.day)
+        ).all():
+            local = local_day(started_at, tz)
+            if local != day:
+                moved.append({"session_id": session_id, "session_day": local})
+        for first in range(0, len(moved), REBUCKET_BATCH_SIZE):
+            conn.execute(statement, moved[first:first + REBUCKET_BATCH_SIZE])
+        changed += len(moved)
+    return changed
+
+
+def rebuild_daily_totals(conn: Connection):
+    """
+    Recompute the whole table from hot and archived sessions (synchronous).
+
+    Args:
+        conn: Connection inside a transaction
+    """
+    source = sessions_union()
+    rows = conn.execute(
+        select(source.c.user_id, source.c.day, *session_totals(source))
+        .group_by(source.c.user_id, source.c.day)
+    ).all()
+
+    conn.execute(delete(PomodoroDailyTotal))
+    if rows:
+        conn.execute(insert(PomodoroDailyTotal), [
+            {
+                "user_id": user_id,
+                "day": day,
+                **{name: value or 0 for name, value in zip(DAILY_TOTAL_COLUMNS, totals)},
+            }
+            for user_id, day, *totals in rows
+        ])
+
+
+async def daily_focus_minutes(db: AsyncSession, user_id: str, first: date, days: int) -> List[int]:
+    """
+    Focus minutes per day for ``days`` consecutive days from ``first``.
+
+    Returns:
+        list: One value per day, zero for days without sessions
+    """
+    rows = await db.execute(
+        select(PomodoroDailyTotal.day, PomodoroDailyTotal.work_seconds).where(
+            PomodoroDailyTotal.user_id == user_id,
+            PomodoroDailyTotal.day >= first,
+            PomodoroDailyTotal.day < first + timedelta(days=days),
+        )
+    )
+    minutes = [0] * days
+    for day, work_seconds in rows:
+        minutes[(day - first).days] = work_seconds // 60
+    return minutes
+
+
+def encode_uint16(values: List[int]) -> str:
+    """Base64 of the values as little-endian uint16, saturating at 65535."""
+    packed = struct.pack(f"<{len(values)}H", *(min(value, UINT16_MAX) for value in values))
+    return base64.b64encode(packed).decode("ascii")
+
+
+def intensity_quantiles(values: List[int]) -> List[int]:
+    """
+    Quartile cut points of the non-zero values, for mapping days to levels.
+
+    Returns:
+        list: ``[q1, q2, q3]`` (empty when no day has activity)
+    """
+    active = sorted(value for value in values if value > 0)
+    if not active:
+        return []
+    if len(active) == 1:
+        return active * 3
+    return [int(q) for q in statistics.quantiles(active, n=4, method="inclusive")]
@@ -0,0 +1,459 @@
+"""Sync of GitHub issue state into linked tasks.
+
+Tasks link to an issue through ``github_issue_url``. The sync worker polls
+those issues over one pooled ``httpx.AsyncClient`` with at most
+``GITHUB_SYNC_CONCURRENCY`` requests in flight, and spends as little of
+GitHub's rate limit as it can:
+
+- Every request is conditional (``If-None-Match`` with the stored ETag);
+  GitHub answers an unchanged resource with 304, which does not count
+  against the rate limit.
+- A repo with several linked issues is polled with one list request for
+  the issues updated since a stored high-water mark, instead of one
+  request per issue. The mark only moves when a page fills up, so the URL,
+  and with it the ETag, stays the same between changes.
+- Before each request the scheduler checks the budget GitHub reported;
+  once only the reserve is left the rest of the pass is deferred, and the
+  next pass waits for the window to reset. The least recently checked
+  repos go first, so deferred repos are not starved.
+
+Closing an issue completes its open tasks and reopening it reopens tasks
+that were completed. Only state changes seen by the sync are applied, so a
+task completed in the app while its issue stays open is left alone.
+"""
+import asyncio
+import logging
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import httpx
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import session_makers
+from src.core.metrics import GITHUB_RATE_REMAINING, GITHUB_REQUESTS
+from src.models.github import GithubIssue, GithubRepo
+from src.models.task import OPEN_STATUSES, Task, TaskStatus, compute_queue_score
+from src.services.prompt_context import prompt_context
+
+logger = logging.getLogger(__name__)
+
+TASKS = Task.__table__
+
+ISSUE_URL = re.compile(
+    r"^https?://(?:www\.)?github\.com/(?P<owner>[\w.-]+)/(?P<name>[\w.-]+)"
+    r"/(?:issues|pull)/(?P<number>\d+)",
+    re.IGNORECASE,
+)
+PER_PAGE = 100
+
+IssueKey = Tuple[str, int]
+
+
+def parse_issue_url(url: str) -> Optional[IssueKey]:
+    """``("owner/name", number)`` of a GitHub issue or pull request URL."""
+    match = ISSUE_URL.match(url.strip())
+    if not match:
+        return None
+    return f"{match.group('owner')}/{match.group('name')}".lower(), int(match.group("number"))
+
+
+class RateLimiter:
+    """Tracks GitHub's rate-limit headers and decides whether to send more requests."""
+
+    def __init__(self, reserve: Optional[int] = None):
+        self.reserve = settings.github_rate_limit_reserve if reserve is None else reserve
+        self.remaining: Optional[int] = None
+        # Unix time the current window resets
+        self.reset_at = 0.0
+        # Requests sent but not answered yet (not reflected in ``remaining``)
+        self.pending = 0
+
+    def exhausted(self) -> bool:
+        """Whether only the reserve is left before the window resets."""
+        if time.time() >= self.reset_at:
+            return False
+        return self.remaining is not None and self.remaining - self.pending <= self.reserve
+
+    def delay(self) -> float:
+        """Seconds until requests may be sent again."""
+        return max(self.reset_at - time.time(), 0.0) if self.exhausted() else 0.0
+
+    def begin(self):
+        """Count a request about to be sent."""
+        self.pending += 1
+
+    def finish(self, response: Optional[httpx.Response] = None):
+        """Count a request as answered, reading the budget left from its response."""
+        self.pending -= 1
+        if response is None:
+            return
+        headers = response.headers
+        reset_at = float(headers.get("x-ratelimit-reset", self.reset_at))
+        if "x-ratelimit-remaining" in headers:
+            remaining = int(headers["x-ratelimit-remaining"])
+            if self.remaining is not None and reset_at == self.reset_at:
+                # Concurrent responses can arrive out of order within a window
+                remaining = min(remaining, self.remaining)
+            self.remaining = remaining
+            GITHUB_RATE_REMAINING.set(remaining)
+        self.reset_at = reset_at
+        if response.status_code in (403, 429) and (self.remaining == 0 or "retry-after" in headers):
+            # Primary or secondary rate limit hit
+            self.remaining = 0
+            retry_after = float(headers.get("retry-after", 60))
+            self.reset_at = max(self.reset_at, time.time() + retry_after)
+
+
+@dataclass
+class GithubSyncResult:
+    """Outcome of one sync pass."""
+    requests: int = 0
+    not_modified: int = 0
+    errors: int = 0
+    # Requests skipped to stay within the rate limit
+    deferred: int = 0
+    issues_changed: int = 0
+    tasks_updated: int = 0
+    duration: float = 0.0
+
+    def add(self, other: "GithubSyncResult"):
+        """Accumulate the counts of a pass over another database."""
+        for name in self.__dataclass_fields__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def summary(self) -> Dict[str, float]:
+        """Counts for logs and API responses."""
+        return {
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "errors": self.errors,
+            "deferred": self.deferred,
+            "issues_changed": self.issues_changed,
+            "tasks_updated": self.tasks_updated,
+            "duration": round(self.duration, 4),
+        }
+
+
+class _Pass:
+    """State shared by the requests of one sync pass."""
+
+    def __init__(self, db: AsyncSession, issues: Dict[IssueKey, GithubIssue]):
+        self.db = db
+        self.issues = issues
+        self.now = datetime.utcnow()
+        self.result = GithubSyncResult()
+        # Issues whose state changed, with the new state
+        self.changes: Dict[IssueKey, str] = {}
+
+    def record(self, repo: str, data: Dict[str, Any], etag: Optional[str] = None):
+        """Store an issue as returned by the API."""
+        key = (repo, int(data["number"]))
+        row = self.issues.get(key)
+        if row is None:
+            row = GithubIssue(repo=repo, number=key[1])
+            self.db.add(row)
+            self.issues[key] = row
+            # First sighting: nothing to reopen, but a closed issue completes its tasks
+            if data["state"] == "closed":
+                self.changes[key] = "closed"
+        elif row.state != data["state"]:
+            self.changes[key] = data["state"]
+        row.state = data["state"]
+        row.title = data["title"]
+        row.updated_at = data["updated_at"]
+        if etag:
+            row.etag = etag
+        row.checked_at = self.now
+
+
+class GithubSync:
+    """Polls linked GitHub issues and applies their state to tasks."""
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        base_url: Optional[str] = None,
+        concurrency: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.base_url = base_url or settings.github_api_url
+        self.concurrency = concurrency or settings.github_sync_concurrency
+        self.limiter = RateLimiter()
+        self.last_result: Optional[GithubSyncResult] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            headers = {
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+                "User-Agent": settings.app_name,
+            }
+            auth = None
+            if settings.github_token:
+                headers["Authorization"] = f"Bearer {settings.github_token}"
+            elif settings.github_client_id and settings.github_client_secret:
+                auth = (settings.github_client_id, settings.github_client_secret)
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=headers,
+                auth=auth,
+                timeout=settings.github_request_timeout,
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency,
+                ),
+            )
+        return self._client
+
+    async def _request(
+        self,
+        state: _Pass,
+        slots: asyncio.Semaphore,
+        path: str,
+        etag: Optional[str],
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Optional[httpx.Response]:
+        """Send a conditional GET, or None if it was deferred or failed."""
+        async with slots:
+            if self.limiter.exhausted():
+                state.result.deferred += 1
+                return None
+            self.limiter.begin()
+            try:
+                response = await self._get_client().get(
+                    path, params=params, headers={"If-None-Match": etag} if etag else None
+                )
+            except httpx.HTTPError as e:
+                self.limiter.finish()
+                logger.warning(f"GitHub request {path} failed: {e}")
+                state.result.errors += 1
+                GITHUB_REQUESTS.labels("error").inc()
+                return None
+            # Before the slot is released, so the next request sees the new budget
+            self.limiter.finish(response)
+
+        state.result.requests += 1
+        if response.status_code == 304:
+            state.result.not_modified += 1
+            GITHUB_REQUESTS.labels("not_modified").inc()
+        elif response.status_code == 200:
+            GITHUB_REQUESTS.labels("ok").inc()
+        else:
+            limited = response.status_code in (403, 429) and self.limiter.exhausted()
+            GITHUB_REQUESTS.labels("rate_limited" if limited else "error").inc()
+            logger.warning(f"GitHub request {path} returned {response.status_code}")
+            state.result.errors += 1
+            return None
+        return response
+
+    async def _fetch_issue(self, state: _Pass, slots: asyncio.Semaphore, repo: str, number: int):
+        row = state.issues.get((repo, number))
+        response = await self._request(
+            state, slots, f"/repos/{repo}/issues/{number}", row.etag if row else None
+        )
+        if response is None:
+            return
+        if response.status_code == 304:
+            row.checked_at = state.now
+        else:
+            state.record(repo, response.json(), response.headers.get("etag"))
+
+    async def _list_repo(
+        self, state: _Pass, slots: asyncio.Semaphore, repo: GithubRepo, numbers: Set[int]
+    ):
+        params = {
+            "state": "all",
+            "since": repo.since,
+            "sort": "updated",
+            "direction": "asc",
+            "per_page": PER_PAGE,
+        }
+        response = await self._request(
+            state, slots, f"/repos/{repo.repo}/issues", repo.etag, params
+        )
+        if response is None:
+            return
+        repo.checked_at = state.now
+        if response.status_code == 304:
+            return
+
+        items = response.json()
+        for item in items:
+            if item["number"] in numbers:
+                state.record(repo.repo, item)
+        if len(items) >= PER_PAGE:
+            # Move the mark so the next pass reads the following page
+            repo.since, repo.etag = items[-1]["updated_at"], None
+        else:
+            repo.etag = response.headers.get("etag")
+
+    async def sync_once(self, db: Optional[AsyncSession] = None) -> GithubSyncResult:
+        """
+        Run one sync pass over every linked issue.
+
+        Args:
+            db: Session to use (when omitted, every database holding user
+                data is synced: the main one and each user shard)
+
+        Returns:
+            GithubSyncResult: Requests made and changes applied
+        """
+        async with self._lock:
+            if db is not None:
+                result = await self._sync(db)
+            else:
+                result = GithubSyncResult()
+                async for factory in session_makers(self.session_factory):
+                    async with factory() as session:
+                        result.add(await self._sync(session))
+        self.last_result = result
+        logger.info(f"GitHub issue sync: {result.summary()}")
+        return result
+
+    async def _sync(self, db: AsyncSession) -> GithubSyncResult:
+        start = time.perf_counter()
+        tasks = (await db.execute(
+            select(
+                TASKS.c.id, TASKS.c.user_id, TASKS.c.github_issue_url, TASKS.c.status,
+                TASKS.c.priority, TASKS.c.estimated_pomodoros, TASKS.c.completed_pomodoros,
+            ).where(TASKS.c.github_issue_url.is_not(None))
+        )).all()
+        linked: Dict[str, Set[int]] = defaultdict(set)
+        for task in tasks:
+            key = parse_issue_url(task.github_issue_url)
+            if key is not None:
+                linked[key[0]].add(key[1])
+
+        repos = {
+            row.repo: row
+            for row in (await db.execute(
+                select(GithubRepo).where(GithubRepo.repo.in_(list(linked)))
+            )).scalars()
+        }
+        issues = {
+            (row.repo, row.number): row
+            for row in (await db.execute(
+                select(GithubIssue).where(GithubIssue.repo.in_(list(linked)))
+            )).scalars()
+        }
+        state = _Pass(db, issues)
+        slots = asyncio.Semaphore(self.concurrency)
+
+        # Least recently checked repos first
+        order = sorted(
+            linked,
+            key=lambda name: getattr(repos.get(name), "checked_at", None) or datetime.min,
+        )
+        jobs = []
+        for name in order:
+            numbers = linked[name]
+            repo = repos.get(name)
+            if repo is not None and repo.since and len(numbers) >= settings.github_sync_batch_min:
+                jobs.append(self._list_repo(state, slots, repo, numbers))
+                # The list only has issues updated since the mark
+                numbers = {number for number in numbers if (name, number) not in issues}
+            jobs += [self._fetch_issue(state, slots, name, number) for number in sorted(numbers)]
+        await asyncio.gather(*jobs)
+
+        for name, numbers in linked.items():
+            fetched = [issues[(name, number)] for number in numbers if (name, number) in issues]
+            if not fetched:
+                continue
+            repo = repos.get(name)
+            if repo is None:
+                repo = repos[name] = GithubRepo(repo=name)
+                db.add(repo)
+            # Later passes list the issues updated since the newest one seen
+            repo.since = repo.since or max(issue.updated_at for issue in fetched)
+            complete = len(fetched) == len(numbers) and all(
+                issue.checked_at == state.now for issue in fetched
+            )
+            if complete:
+                repo.checked_at = state.now
+
+        state.result.issues_changed = len(state.changes)
+        updated = await self._apply(db, tasks, state)
+        await db.commit()
+        for user_id in updated:
+            prompt_context.invalidate(user_id, "tasks")
+        state.result.tasks_updated = sum(updated.values())
+        state.result.duration = time.perf_counter() - start
+        return state.result
+
+    async def _apply(self, db: AsyncSession, tasks: List, state: _Pass) -> Dict[str, int]:
+        """Complete or reopen the tasks of issues whose state changed (counts by user)."""
+        updated: Dict[str, int] = defaultdict(int)
+        if not state.changes:
+            return updated
+        updates = []
+        for task in tasks:
+            issue_state = state.changes.get(parse_issue_url(task.github_issue_url))
+            if issue_state == "closed" and task.status in OPEN_STATUSES:
+                status, completed_at = TaskStatus.COMPLETED, state.now
+            elif issue_state == "open" and task.status == TaskStatus.COMPLETED:
+                status, completed_at = TaskStatus.TODO, None
+            else:
+                continue
+            updated[task.user_id] += 1
+            updates.append({
+                "task_id": task.id,
+                "new_status": status,
+                "new_completed_at": completed_at,
+                "new_queue_score": compute_queue_score(
+                    status, task.priority, task.estimated_pomodoros, task.completed_pomodoros
+                ),
+            })
+        if updates:
+            await db.execute(
+                update(TASKS)
+                .where(TASKS.c.id == bindparam("task_id"))
+                .values(
+                    status=bindparam("new_status", type_=TASKS.c.status.type),
+                    completed_at=bindparam("new_completed_at"),
+                    queue_score=bindparam("new_queue_score"),
+                    updated_at=state.now,
+                ),
+                updates,
+            )
+        return updated
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sync_once()
+            except Exception as e:
+                logger.error(f"GitHub issue sync failed: {e}", exc_info=True)
+            # Wait for the rate-limit window to reset if the budget ran out
+            await asyncio.sleep(max(settings.github_sync_interval, self.limiter.delay()))
+
+    def start(self):
+        """Start the sync loop (no-op unless ``GITHUB_SYNC_ENABLED``)."""
+        if self._task is None and settings.github_sync_enabled:
+            self._task = asyncio.create_task(self._run(), name="github-sync")
+            logger.info(f"GitHub issue sync started (every {settings.github_sync_interval}s)")
+
+    async def stop(self):
+        """Stop the sync loop and close the HTTP client."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Global sync worker, started by the application lifespan
+github_sync = GithubSync()
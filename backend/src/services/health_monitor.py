@@ -0,0 +1,216 @@
+"""Background dependency health monitoring."""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import async_session_maker, shard_router
+from src.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+async def check_database(db: AsyncSession) -> Dict[str, str]:
+    """Run a trivial query against the database."""
+    try:
+        await db.execute(text("SELECT 1"))
+        return {"status": "up", "message": "Database connection successful"}
+    except Exception as e:
+        return {"status": "down", "message": f"Database error: {str(e)}"}
+
+
+async def check_shards() -> Dict[str, str]:
+    """Check that user shards can be opened and created (if sharding is enabled)."""
+    if not settings.db_sharding_enabled:
+        return {"status": "disabled", "message": "Database sharding is disabled"}
+
+    def writable() -> bool:
+        os.makedirs(shard_router.shard_dir, exist_ok=True)
+        return os.access(shard_router.shard_dir, os.W_OK)
+
+    try:
+        if await asyncio.to_thread(writable):
+            return {
+                "status": "up",
+                "message": f"{len(shard_router.open_shards)} of "
+                           f"{len(shard_router.shard_users())} shards open",
+            }
+        return {"status": "down", "message": "Shard directory is not writable"}
+    except OSError as e:
+        return {"status": "down", "message": f"Shard directory error: {str(e)}"}
+
+
+async def check_redis() -> Dict[str, str]:
+    """Ping Redis through the shared pooled client."""
+    if not settings.redis_enabled:
+        return {"status": "disabled", "message": "Redis is disabled"}
+
+    client = get_redis()
+    if client is None:
+        return {"status": "down", "message": "Redis client not initialized"}
+
+    try:
+        await client.ping()
+        return {"status": "up", "message": "Redis connection successful"}
+    except Exception as e:
+        return {"status": "down", "message": f"Redis error: {str(e)}"}
+
+
+async def check_obsidian() -> Dict[str, str]:
+    """Check that the Obsidian vault is reachable (if configured)."""
+    if not (settings.obsidian_vault_path and settings.obsidian_sync_enabled):
+        return {"status": "disabled", "message": "Obsidian sync is disabled"}
+
+    # Stat in a thread so a hung mount cannot block the event loop
+    if await asyncio.to_thread(os.path.exists, settings.obsidian_vault_path):
+        return {"status": "up", "message": "Obsidian vault accessible"}
+    return {"status": "down", "message": "Obsidian vault not found"}
+
+
+async def timed_check(
+    name: str,
+    check: Callable[[], Awaitable[Dict[str, str]]],
+    timeout: float,
+) -> Dict[str, Any]:
+    """
+    Run a single dependency check under a timeout and record its latency.
+
+    Args:
+        name: Dependency name, used in the timeout message
+        check: Zero-argument coroutine function performing the check
+        timeout: Maximum time in seconds to wait for the check
+
+    Returns:
+        dict: Check result with ``latency_ms`` added
+    """
+    start = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(check(), timeout=timeout)
+    except asyncio.TimeoutError:
+        result = {"status": "down", "message": f"{name} check timed out after {timeout}s"}
+    result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+@dataclass
+class HealthSnapshot:
+    """Result of one round of dependency checks."""
+    checks: Dict[str, Dict[str, Any]]
+    checked_at: datetime
+    monotonic: float
+
+    @property
+    def status(self) -> str:
+        """Overall status: degraded if any dependency is down."""
+        if any(check["status"] == "down" for check in self.checks.values()):
+            return "degraded"
+        return "healthy"
+
+    @property
+    def ready(self) -> bool:
+        """Whether the service can take traffic (the database is up)."""
+        return self.checks.get("database", {}).get("status") == "up"
+
+    @property
+    def age(self) -> float:
+        """Seconds since the checks ran."""
+        return time.monotonic() - self.monotonic
+
+
+class HealthMonitor:
+    """
+    Periodically checks dependencies and keeps the latest result in memory.
+
+    Probes read the snapshot instead of touching the database themselves;
+    they only fall back to a live check when the snapshot is missing or
+    older than ``max_staleness``.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = async_session_maker,
+        interval: Optional[float] = None,
+        max_staleness: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval if interval is not None else settings.health_monitor_interval
+        self.max_staleness = (
+            max_staleness if max_staleness is not None else settings.health_max_staleness
+        )
+        self.snapshot: Optional[HealthSnapshot] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self, db: Optional[AsyncSession] = None) -> HealthSnapshot:
+        """
+        Run all dependency checks concurrently and store the result.
+
+        Args:
+            db: Session to check the database with; a short-lived session
+                from the monitor's factory is used when omitted
+
+        Returns:
+            HealthSnapshot: The new snapshot
+        """
+        async def database_check() -> Dict[str, str]:
+            if db is not None:
+                return await check_database(db)
+            async with self.session_factory() as session:
+                return await check_database(session)
+
+        checks = {
+            "database": (database_check, settings.health_check_database_timeout),
+            "shards": (check_shards, settings.health_check_database_timeout),
+            "redis": (check_redis, settings.health_check_redis_timeout),
+            "obsidian": (check_obsidian, settings.health_check_obsidian_timeout),
+        }
+        results = await asyncio.gather(*(
+            timed_check(name, check, timeout) for name, (check, timeout) in checks.items()
+        ))
+
+        self.snapshot = HealthSnapshot(
+            checks=dict(zip(checks, results)),
+            checked_at=datetime.utcnow(),
+            monotonic=time.monotonic(),
+        )
+        return self.snapshot
+
+    def latest(self) -> Optional[HealthSnapshot]:
+        """Return the current snapshot if it is within the staleness bound."""
+        if self.snapshot is None or self.snapshot.age > self.max_staleness:
+            return None
+        return self.snapshot
+
+    async def _run(self):
+        """Check dependencies forever at the configured interval."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Health monitor check failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start the background monitoring task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="health-monitor")
+            logger.info(f"Health monitor started (interval {self.interval}s)")
+
+    async def stop(self):
+        """Stop the background monitoring task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global monitor instance, started by the application lifespan
+health_monitor = HealthMonitor()
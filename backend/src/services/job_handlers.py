@@ -0,0 +1,45 @@
+"""Job kinds run by the background worker.
+
+Each handler wraps one of the existing background services, so the work a
+job does is the same whether it runs in the worker or in the API process
+(``WORKER_ENABLED=false``).
+"""
+from typing import Any, Dict
+
+from src.services.archive import archive_cutoff, session_archiver
+from src.services.backup import backup_service
+from src.services.daily_notes import daily_note_writer
+from src.services.github_sync import github_sync
+from src.services.jobs import job_kind
+from src.services.vault_index import vault_indexer
+
+
+@job_kind("backup", timeout=3600, max_attempts=2)
+async def run_backup_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    result = await backup_service.run()
+    return {"name": result.name, "files": len(result.files), "bytes": result.bytes}
+
+
+@job_kind("archive_sessions", timeout=3600)
+async def run_archive_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    cutoff = archive_cutoff(payload.get("older_than_days"))
+    if cutoff is None:
+        return {"archived": 0}
+    return {"archived": await session_archiver.run_once(cutoff)}
+
+
+@job_kind("vault_index", timeout=900)
+async def run_vault_index_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    changes = await vault_indexer.run(paths=payload.get("paths"))
+    return changes.summary()
+
+
+@job_kind("github_sync", timeout=900)
+async def run_github_sync_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    result = await github_sync.sync_once()
+    return result.summary()
+
+
+@job_kind("daily_notes", timeout=300, max_attempts=5)
+async def run_daily_notes_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {"notes_written": await daily_note_writer.flush()}
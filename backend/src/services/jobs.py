@@ -0,0 +1,271 @@
+"""Persistent background job queue.
+
+Jobs are rows of the ``jobs`` table in the application database, so they
+survive restarts and are shared by every process that opens it: the API
+enqueues, ``python -m src.worker`` runs them.
+
+- Priorities: the highest ``priority`` is claimed first, then the job that
+  has been visible longest.
+- Visibility timeouts: claiming a job leases it until ``visible_at``, and
+  the worker renews the lease while the handler runs. If the worker dies
+  the lease runs out and another worker claims the job again.
+- Retries: a failed attempt is requeued with exponential backoff until
+  ``max_attempts`` is reached, then the job is marked failed.
+- Concurrency limits: each kind has a limit across all workers, checked in
+  the statement that claims the job.
+
+A claim is a single ``UPDATE ... RETURNING`` statement, which SQLite runs
+under its write lock, so two workers never get the same job.
+"""
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from sqlalchemy import case, delete, func, select, text, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.models.job import Job, JobStatus
+
+JOBS = Job.__table__
+
+MAX_ERROR_LENGTH = 2000
+
+
+@dataclass
+class JobKind:
+    """A registered job handler and its limits."""
+    name: str
+    handler: Callable[[Dict[str, Any]], Awaitable[Any]]
+    # Jobs of this kind running at once, across all workers
+    concurrency: int = 1
+    # Seconds an attempt may run before it is cancelled and counted as failed
+    timeout: Optional[float] = None
+    max_attempts: int = 3
+
+
+# Registered kinds (see services.job_handlers)
+JOB_KINDS: Dict[str, JobKind] = {}
+
+
+def job_kind(
+    name: str, *, concurrency: int = 1, timeout: Optional[float] = None, max_attempts: int = 3
+):
+    """
+    Register an async handler for a job kind.
+
+    The handler receives the job's payload and may return a JSON-serializable
+    result, which is stored on the job.
+    """
+    def register(handler):
+        JOB_KINDS[name] = JobKind(name, handler, concurrency, timeout, max_attempts)
+        return handler
+    return register
+
+
+async def enqueue(
+    db: AsyncSession,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    *,
+    priority: int = 0,
+    delay: float = 0.0,
+    unique_key: Optional[str] = None,
+    max_attempts: Optional[int] = None,
+) -> int:
+    """
+    Add a job to the queue. Does not commit.
+
+    Args:
+        db: Database session
+        kind: Registered job kind
+        payload: Arguments for the handler
+        priority: Higher runs first
+        delay: Seconds before the job may start
+        unique_key: When a queued job with this key exists, no job is added
+        max_attempts: Attempts before the job fails (defaults to the kind's)
+
+    Returns:
+        int: ID of the new job, or of the queued job with the same key
+    """
+    if max_attempts is None:
+        max_attempts = JOB_KINDS[kind].max_attempts if kind in JOB_KINDS else 3
+    statement = insert(Job).values(
+        kind=kind,
+        payload=json.dumps(payload) if payload else None,
+        priority=priority,
+        max_attempts=max_attempts,
+        visible_at=datetime.utcnow() + timedelta(seconds=delay),
+        unique_key=unique_key,
+    )
+    if unique_key is not None:
+        statement = statement.on_conflict_do_nothing(
+            index_elements=["unique_key"],
+            index_where=text("status = 'QUEUED' AND unique_key IS NOT NULL"),
+        )
+    job_id = (await db.execute(statement.returning(JOBS.c.id))).scalar_one_or_none()
+    if job_id is None:
+        job_id = (await db.execute(
+            select(JOBS.c.id).where(
+                JOBS.c.unique_key == unique_key, JOBS.c.status == JobStatus.QUEUED
+            )
+        )).scalar_one()
+    return job_id
+
+
+async def claim_job(
+    db: AsyncSession,
+    worker_id: str,
+    lease: float,
+    kinds: Optional[Iterable[str]] = None,
+) -> Optional[Row]:
+    """
+    Lease the next runnable job and commit.
+
+    Runnable means queued and visible, or running with an expired lease, of
+    a kind that is below its concurrency limit.
+
+    Args:
+        db: Database session
+        worker_id: Identifies the lease holder
+        lease: Seconds until the job is visible to other workers again
+        kinds: Kinds this worker can run (defaults to every registered kind)
+
+    Returns:
+        Row: The claimed job (``attempts`` already counts this attempt), or None
+    """
+    kinds = list(JOB_KINDS if kinds is None else kinds)
+    if not kinds:
+        return None
+    now = datetime.utcnow()
+    candidate = JOBS.alias("candidate")
+    running = JOBS.alias("running")
+    in_flight = select(func.count()).where(
+        running.c.kind == candidate.c.kind,
+        running.c.status == JobStatus.RUNNING,
+        running.c.visible_at > now,
+    ).scalar_subquery()
+    limit = case(
+        {name: kind.concurrency for name, kind in JOB_KINDS.items()},
+        value=candidate.c.kind,
+        else_=1,
+    )
+    next_id = (
+        select(candidate.c.id)
+        .where(
+            candidate.c.status.in_((JobStatus.QUEUED, JobStatus.RUNNING)),
+            candidate.c.visible_at <= now,
+            candidate.c.kind.in_(kinds),
+            in_flight < limit,
+        )
+        .order_by(candidate.c.priority.desc(), candidate.c.visible_at, candidate.c.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    job = (await db.execute(
+        update(JOBS)
+        .where(JOBS.c.id == next_id)
+        .values(
+            status=JobStatus.RUNNING,
+            attempts=JOBS.c.attempts + 1,
+            visible_at=now + timedelta(seconds=lease),
+            locked_by=worker_id,
+            started_at=now,
+        )
+        .returning(*JOBS.c)
+    )).first()
+    await db.commit()
+    return job
+
+
+def _leased(job_id: int, worker_id: str):
+    return (JOBS.c.id == job_id, JOBS.c.locked_by == worker_id, JOBS.c.status == JobStatus.RUNNING)
+
+
+async def renew_lease(db: AsyncSession, job_id: int, worker_id: str, lease: float) -> bool:
+    """Extend a running job's lease and commit. False if the lease was lost."""
+    result = await db.execute(
+        update(JOBS)
+        .where(*_leased(job_id, worker_id))
+        .values(visible_at=datetime.utcnow() + timedelta(seconds=lease))
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def complete_job(db: AsyncSession, job_id: int, worker_id: str, result: Any = None) -> bool:
+    """Mark a leased job succeeded and commit. False if the lease was lost."""
+    outcome = await db.execute(
+        update(JOBS)
+        .where(*_leased(job_id, worker_id))
+        .values(
+            status=JobStatus.SUCCEEDED,
+            result=json.dumps(result, default=str) if result is not None else None,
+            locked_by=None,
+            finished_at=datetime.utcnow(),
+        )
+    )
+    await db.commit()
+    return outcome.rowcount == 1
+
+
+async def fail_job(
+    db: AsyncSession,
+    job: Row,
+    worker_id: str,
+    error: str,
+    retry: bool = True,
+) -> Optional[JobStatus]:
+    """
+    Record a failed attempt and commit.
+
+    The job is queued again after ``WORKER_RETRY_DELAY * 2 ** (attempts - 1)``
+    seconds while attempts remain, and fails otherwise.
+
+    Returns:
+        JobStatus: The job's new status, or None if the lease was lost
+    """
+    now = datetime.utcnow()
+    if retry and job.attempts < job.max_attempts:
+        delay = settings.worker_retry_delay * 2 ** (job.attempts - 1)
+        values = {"status": JobStatus.QUEUED, "visible_at": now + timedelta(seconds=delay)}
+    else:
+        values = {"status": JobStatus.FAILED, "finished_at": now}
+    outcome = await db.execute(
+        update(JOBS)
+        .where(*_leased(job.id, worker_id))
+        .values(**values, locked_by=None, last_error=error[:MAX_ERROR_LENGTH])
+    )
+    await db.commit()
+    return values["status"] if outcome.rowcount == 1 else None
+
+
+async def release_job(db: AsyncSession, job_id: int, worker_id: str):
+    """Put a leased job back without counting the attempt (worker shutdown) and commit."""
+    await db.execute(
+        update(JOBS)
+        .where(*_leased(job_id, worker_id))
+        .values(
+            status=JobStatus.QUEUED,
+            attempts=JOBS.c.attempts - 1,
+            visible_at=datetime.utcnow(),
+            locked_by=None,
+        )
+    )
+    await db.commit()
+
+
+async def purge_jobs(db: AsyncSession, days: Optional[int] = None) -> int:
+    """Delete jobs that finished more than ``days`` days ago and commit."""
+    days = settings.worker_job_retention_days if days is None else days
+    result = await db.execute(
+        delete(JOBS).where(
+            JOBS.c.status.in_((JobStatus.SUCCEEDED, JobStatus.FAILED)),
+            JOBS.c.finished_at < datetime.utcnow() - timedelta(days=days),
+        )
+    )
+    await db.commit()
+    return result.rowcount
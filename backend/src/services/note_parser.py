@@ -0,0 +1,156 @@
+"""Parsing of Obsidian markdown notes.
+
+Pure functions with no application imports, so worker processes of the
+parse pool (started with ``spawn``) import nothing but this module and
+``python-frontmatter``.
+"""
+import hashlib
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import frontmatter
+
+CHECKBOX = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+\[(?P<mark>[ xX])\]\s+(?P<text>.+?)\s*$")
+FENCE = re.compile(r"^\s*(```|~~~)")
+TAG = re.compile(r"(?<![\w/&#])#(?P<tag>[A-Za-z_][\w/-]*)")
+WIKILINK = re.compile(r"\[\[(?P<target>[^\]|#^]+)(?:[#^][^\]|]*)?(?:\|[^\]]*)?\]\]")
+MARKDOWN_LINK = re.compile(r"\[[^\]]*\]\((?P<target>[^)\s]+)\)")
+
+MAX_TITLE_LENGTH = 255
+
+
+@dataclass
+class ParsedTask:
+    """A checkbox item of a note."""
+    key: str
+    title: str
+    done: bool
+    tags: List[str] = field(default_factory=list)
+    links: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ParsedNote:
+    """Everything extracted from one note."""
+    path: str
+    title: str
+    tags: List[str] = field(default_factory=list)
+    links: List[str] = field(default_factory=list)
+    tasks: List[ParsedTask] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def _unique(items: List[str]) -> List[str]:
+    return list(dict.fromkeys(items))
+
+
+def _frontmatter_tags(metadata: Dict[str, Any]) -> List[str]:
+    raw = metadata.get("tags") or metadata.get("tag") or []
+    if isinstance(raw, str):
+        raw = re.split(r"[,\s]+", raw)
+    if not isinstance(raw, list):
+        return []
+    return [str(tag).lstrip("#").lower() for tag in raw if tag]
+
+
+def extract_links(text: str) -> List[str]:
+    """Wikilink targets and relative markdown links, in order of appearance."""
+    links = [match.group("target").strip() for match in WIKILINK.finditer(text)]
+    links += [
+        match.group("target")
+        for match in MARKDOWN_LINK.finditer(text)
+        if "://" not in match.group("target") and not match.group("target").startswith("#")
+    ]
+    return _unique(links)
+
+
+def extract_tags(text: str) -> List[str]:
+    """Inline ``#tags`` (lowercased)."""
+    return _unique(match.group("tag").lower() for match in TAG.finditer(text))
+
+
+def task_key(text: str, occurrence: int) -> str:
+    """
+    Stable identity of a checkbox item within its note.
+
+    Derived from the item's text (not its position or checked state), so
+    moving lines or ticking the box keeps the same task row.
+    """
+    digest = hashlib.sha1(" ".join(text.split()).lower().encode()).hexdigest()[:16]
+    return f"{digest}-{occurrence}" if occurrence else digest
+
+
+def parse_note(path: str, text: str) -> ParsedNote:
+    """
+    Extract frontmatter tags, links and checkbox tasks from a note.
+
+    Args:
+        path: Vault-relative path of the note
+        text: Full contents, including any frontmatter
+
+    Returns:
+        ParsedNote: Extracted data (fenced code blocks are ignored)
+    """
+    try:
+        post = frontmatter.loads(text)
+        metadata, body = post.metadata, post.content
+    except Exception:
+        # Malformed YAML: treat the whole file as body
+        metadata, body = {}, text
+
+    title = str(metadata.get("title") or os.path.splitext(os.path.basename(path))[0])
+    note_tags = _frontmatter_tags(metadata)
+
+    tasks: List[ParsedTask] = []
+    seen: Dict[str, int] = {}
+    prose: List[str] = []
+    in_fence = False
+    for line in body.splitlines():
+        if FENCE.match(line):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+        prose.append(line)
+        match = CHECKBOX.match(line)
+        if not match:
+            continue
+
+        item = match.group("text")
+        occurrence = seen.get(item, 0)
+        seen[item] = occurrence + 1
+        title_text = TAG.sub("", item).strip() or item
+        tasks.append(ParsedTask(
+            key=task_key(item, occurrence),
+            title=" ".join(title_text.split())[:MAX_TITLE_LENGTH],
+            done=match.group("mark") != " ",
+            tags=_unique(extract_tags(item) + note_tags),
+            links=extract_links(item),
+        ))
+
+    joined = "\n".join(prose)
+    return ParsedNote(
+        path=path,
+        title=title,
+        tags=_unique(note_tags + extract_tags(joined)),
+        links=extract_links(joined),
+        tasks=tasks,
+    )
+
+
+def parse_chunk(root: str, paths: List[str]) -> List[ParsedNote]:
+    """
+    Read and parse a batch of notes (runs in a worker process).
+
+    Unreadable notes come back with ``error`` set instead of failing the chunk.
+    """
+    notes = []
+    for path in paths:
+        try:
+            with open(os.path.join(root, path), encoding="utf-8", errors="replace") as handle:
+                notes.append(parse_note(path, handle.read()))
+        except OSError as e:
+            notes.append(ParsedNote(path=path, title=path, error=str(e)))
+    return notes
@@ -0,0 +1,328 @@
+"""Token-budgeted summary of a user's focus data for Claude prompts.
+
+The context has three sections, ordered from the one that changes least to
+the one that changes most: open tasks, streaks, recent sessions. Each
+section is rendered once and cached per user until a write invalidates it
+(task writes drop the task section, session writes the session and streak
+sections), so a prompt after a session write re-renders one or two
+sections instead of querying everything again. Unchanged sections are
+reused verbatim and sent as separate system blocks, each marked as a cache
+breakpoint, so the API's prompt cache serves every section up to the first
+one that changed.
+
+With ``WORKER_ENABLED`` the worker writes tasks too (vault import, GitHub
+sync), and its invalidations never reach the API process. Each cached
+section therefore records the data version it was rendered from, the
+largest sync ``row_version`` of the rows behind it, and a build first
+reads the current versions (three index lookups) and re-renders any
+section whose data moved.
+
+Token counts are estimated at four characters per token; each section gets
+a share of ``CLAUDE_CONTEXT_TOKEN_BUDGET`` and drops its lowest-ranked lines
+to fit.
+"""
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.metrics import PROMPT_CONTEXT_BUILD, PROMPT_CONTEXT_LOOKUPS
+from src.models.pomodoro import PomodoroDailyTotal, PomodoroSession, SessionType
+from src.models.sync import SyncTombstone
+from src.models.task import Task
+from src.services.daily_totals import local_day
+from src.services.timeseries import resolve_timezone
+
+# Session writes (several an hour) touch streaks and sessions; task edits are rarer
+SECTIONS = ("tasks", "streaks", "sessions")
+
+# Share of the token budget per section
+SHARES = {"tasks": 0.55, "streaks": 0.1, "sessions": 0.35}
+
+SESSION_LABELS = {
+    SessionType.WORK: "Focus",
+    SessionType.SHORT_BREAK: "Short break",
+    SessionType.LONG_BREAK: "Long break",
+}
+
+# Rows read per section (more than any budget can show)
+TASK_LIMIT = 200
+SESSION_LIMIT = 200
+STREAK_DAYS = 366
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a text (four characters per token)."""
+    return math.ceil(len(text) / 4)
+
+
+def fit_lines(title: str, lines: List[str], budget: int, total: Optional[int] = None) -> str:
+    """
+    Render a section, keeping as many leading lines as fit in ``budget`` tokens.
+
+    Args:
+        title: Section heading
+        lines: Lines in order of importance
+        budget: Token budget of the section
+        total: Number of items the lines were taken from, when more exist
+
+    Returns:
+        str: Heading, kept lines and a note about the ones left out
+    """
+    total = len(lines) if total is None else total
+    kept = [f"## {title}"]
+    used = estimate_tokens(kept[0]) + 1
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        # Leave room for the "... more" note
+        if used + cost > budget - 8:
+            break
+        kept.append(line)
+        used += cost
+    if not lines:
+        kept.append("(none)")
+    elif len(kept) - 1 < total:
+        kept.append(f"... and {total - (len(kept) - 1)} more")
+    return "\n".join(kept)
+
+
+async def build_streaks(db: AsyncSession, user_id: str, today: date, budget: int) -> str:
+    """Current and longest streak of days with focus time, from the daily totals."""
+    rows = (await db.execute(
+        select(PomodoroDailyTotal.day, PomodoroDailyTotal.work_seconds).where(
+            PomodoroDailyTotal.user_id == user_id,
+            PomodoroDailyTotal.day > today - timedelta(days=STREAK_DAYS),
+            PomodoroDailyTotal.work_seconds > 0,
+        )
+    )).all()
+    work = {row.day: row.work_seconds for row in rows}
+
+    current = 0
+    # Today's streak is not broken until the day is over
+    day = today if today in work else today - timedelta(days=1)
+    while day in work:
+        current += 1
+        day -= timedelta(days=1)
+
+    longest = run = 0
+    previous = None
+    for day in sorted(work):
+        run = run + 1 if previous == day - timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+
+    week = sum(seconds for day, seconds in work.items() if day > today - timedelta(days=7))
+    lines = [
+        f"- Current streak: {current} days",
+        f"- Longest streak (past year): {longest} days",
+        f"- Focus today: {round(work.get(today, 0) / 60)} min",
+        f"- Focus in the last 7 days: {round(week / 60)} min",
+    ]
+    return fit_lines("Streaks", lines, budget)
+
+
+async def build_tasks(db: AsyncSession, user_id: str, today: date, budget: int) -> str:
+    """Open tasks in queue order (the "what next" index)."""
+    rows = (await db.execute(
+        select(
+            Task.title, Task.priority, Task.status, Task.estimated_pomodoros,
+            Task.completed_pomodoros, Task.tags,
+        )
+        .where(Task.user_id == user_id, Task.queue_score.is_not(None))
+        .order_by(Task.queue_score.desc(), Task.created_at)
+        .limit(TASK_LIMIT)
+    )).all()
+    total = len(rows)
+    if total == TASK_LIMIT:
+        total = (await db.execute(
+            select(func.count()).where(Task.user_id == user_id, Task.queue_score.is_not(None))
+        )).scalar_one()
+
+    lines = []
+    for row in rows:
+        line = (
+            f"- [{row.priority.value}] {row.title} "
+            f"({row.completed_pomodoros}/{row.estimated_pomodoros} pomodoros, {row.status.value})"
+        )
+        if row.tags:
+            line += f" tags: {row.tags}"
+        lines.append(line)
+    return fit_lines("Open tasks", lines, budget, total)
+
+
+async def build_sessions(db: AsyncSession, user_id: str, today: date, budget: int) -> str:
+    """Sessions of the last ``CLAUDE_CONTEXT_SESSION_DAYS`` days, newest first."""
+    since = datetime.utcnow() - timedelta(days=settings.claude_context_session_days)
+    rows = (await db.execute(
+        select(
+            PomodoroSession.session_type, PomodoroSession.status, PomodoroSession.started_at,
+            PomodoroSession.actual_duration, PomodoroSession.interruptions, Task.title,
+        )
+        .outerjoin(Task, Task.id == PomodoroSession.task_id)
+        .where(PomodoroSession.user_id == user_id, PomodoroSession.started_at >= since)
+        .order_by(PomodoroSession.started_at.desc())
+        .limit(SESSION_LIMIT)
+    )).all()
+
+    tz = resolve_timezone(None)
+    lines = []
+    for row in rows:
+        start = row.started_at.replace(tzinfo=timezone.utc).astimezone(tz)
+        minutes = round((row.actual_duration or 0) / 60)
+        line = (
+            f"- {start:%Y-%m-%d %H:%M} {SESSION_LABELS[row.session_type]} "
+            f"{minutes} min ({row.status.value})"
+        )
+        if row.interruptions:
+            line += f", {row.interruptions} interruptions"
+        if row.title:
+            line += f": {row.title}"
+        lines.append(line)
+    return fit_lines("Recent sessions", lines, budget)
+
+
+BUILDERS: Dict[str, Callable[[AsyncSession, str, date, int], Awaitable[str]]] = {
+    "tasks": build_tasks,
+    "streaks": build_streaks,
+    "sessions": build_sessions,
+}
+
+
+async def data_versions(db: AsyncSession, user_id: str) -> Dict[str, int]:
+    """
+    Version of the rows behind each section, from the sync row versions.
+
+    Any write to a task or session, from any process, raises its section's
+    version (deleted tasks through their tombstones).
+    """
+    def latest(column, owner):
+        return select(func.coalesce(func.max(column), 0)).where(owner == user_id).scalar_subquery()
+
+    tasks, tombstones, sessions = (await db.execute(select(
+        latest(Task.row_version, Task.user_id),
+        latest(SyncTombstone.row_version, SyncTombstone.user_id),
+        latest(PomodoroSession.row_version, PomodoroSession.user_id),
+    ))).one()
+    return {"tasks": max(tasks, tombstones), "streaks": sessions, "sessions": sessions}
+
+
+@dataclass
+class Section:
+    """A rendered section of the context."""
+    name: str
+    text: str
+    tokens: int
+    cached: bool = False
+    # Data version rendered from (None when versions are not checked)
+    version: Optional[int] = None
+
+
+@dataclass
+class PromptContext:
+    """Context for one prompt, sections in prefix order."""
+    sections: List[Section]
+
+    @property
+    def text(self) -> str:
+        return "\n\n".join(section.text for section in self.sections)
+
+    @property
+    def tokens(self) -> int:
+        return sum(section.tokens for section in self.sections)
+
+    @property
+    def prefix_hash(self) -> str:
+        """Fingerprint of the rendered text (equal hashes share the API prompt cache)."""
+        return hashlib.sha256(self.text.encode()).hexdigest()[:16]
+
+
+class PromptContextBuilder:
+    """
+    Per-user cache of rendered context sections.
+
+    Entries are keyed by user and local day (streaks and the session window
+    move at midnight) and evicted least recently used once ``max_entries``
+    users are held. Invalidation bumps a per-user version so a build that
+    raced with a write does not store stale sections; with the worker
+    enabled, sections are also checked against ``data_versions``.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, budget: Optional[int] = None):
+        self.max_entries = max_entries or settings.claude_context_cache_entries
+        self.budget = budget or settings.claude_context_token_budget
+        self._entries: "OrderedDict[Tuple[str, date], Dict[str, Section]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, user_id: str) -> int:
+        return self._versions.get(user_id, 0)
+
+    async def build(self, db: AsyncSession, user_id: str) -> PromptContext:
+        """
+        Context for the user's next prompt, re-rendering only stale sections.
+
+        Args:
+            db: Database session
+            user_id: Owner of the data
+
+        Returns:
+            PromptContext: Sections in prefix order
+        """
+        today = local_day(datetime.utcnow(), resolve_timezone(None))
+        key = (user_id, today)
+        version = self.version(user_id)
+        cached = self._entries.get(key, {})
+        if cached:
+            self._entries.move_to_end(key)
+        # Writes by the worker are only seen through the data versions
+        current = await data_versions(db, user_id) if settings.worker_enabled else {}
+
+        sections = []
+        for name in SECTIONS:
+            section = cached.get(name)
+            if section is not None and section.version == current.get(name):
+                self.hits += 1
+                PROMPT_CONTEXT_LOOKUPS.labels(name, "hit").inc()
+                sections.append(Section(
+                    name, section.text, section.tokens, cached=True, version=section.version,
+                ))
+                continue
+
+            self.misses += 1
+            PROMPT_CONTEXT_LOOKUPS.labels(name, "miss").inc()
+            start = time.perf_counter()
+            text = await BUILDERS[name](db, user_id, today, int(self.budget * SHARES[name]))
+            PROMPT_CONTEXT_BUILD.labels(name).observe(time.perf_counter() - start)
+            sections.append(Section(name, text, estimate_tokens(text), version=current.get(name)))
+
+        if self.version(user_id) == version:
+            self._entries[key] = {section.name: section for section in sections}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return PromptContext(sections)
+
+    def invalidate(self, user_id: str, *sections: str):
+        """Drop the named sections (all when none are given) of a user's context."""
+        self._versions[user_id] = self.version(user_id) + 1
+        for (owner, _), entry in self._entries.items():
+            if owner != user_id:
+                continue
+            for name in sections or SECTIONS:
+                entry.pop(name, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._versions.clear()
+
+
+# Global builder instance
+prompt_context = PromptContextBuilder()
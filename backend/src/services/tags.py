@@ -0,0 +1,142 @@
+"""Keeps the normalized tag index in sync with ``Task.tags``.
+
+``Task.tags`` stays the source of truth and keeps its free-form string
+format (a JSON list, or comma separated names). The ``tags`` and
+``task_tags`` tables are derived from it so tag filters can use indexes
+instead of parsing every row.
+"""
+import json
+from typing import Dict, Iterable, List, Optional, Union
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.models.tag import Tag, task_tags
+
+MAX_TAG_LENGTH = 64
+
+
+def normalize_tag(name: str) -> str:
+    """Canonical form of a tag name: trimmed, lowercase, without '#'."""
+    return name.strip().lstrip("#").strip().lower()[:MAX_TAG_LENGTH]
+
+
+def parse_tags(raw: Optional[str]) -> List[str]:
+    """
+    Extract normalized, de-duplicated tag names from a ``Task.tags`` value.
+
+    Args:
+        raw: JSON list of strings, or a comma separated string
+
+    Returns:
+        list: Tag names in first-seen order
+    """
+    if not raw or not raw.strip():
+        return []
+
+    try:
+        parsed = json.loads(raw)
+    except ValueError:
+        parsed = None
+    if isinstance(parsed, list):
+        names: Iterable = (str(item) for item in parsed if item is not None)
+    elif isinstance(parsed, str):
+        names = parsed.split(",")
+    else:
+        names = raw.split(",")
+
+    seen = {}
+    for name in names:
+        tag = normalize_tag(name)
+        if tag:
+            seen.setdefault(tag, None)
+    return list(seen)
+
+
+def apply_task_tags(
+    conn: Union[Connection, Session],
+    user_id: str,
+    task_id: int,
+    names: List[str],
+):
+    """
+    Replace the tag links of a task (synchronous; see ``sync_task_tags``).
+
+    Args:
+        conn: Connection or ORM session inside a transaction
+        user_id: Owner of the task
+        task_id: Task to re-link
+        names: Normalized tag names
+    """
+    tag_ids: List[int] = []
+    if names:
+        conn.execute(
+            insert(Tag)
+            .values([{"user_id": user_id, "name": name} for name in names])
+            .on_conflict_do_nothing(index_elements=["user_id", "name"])
+        )
+        tag_ids = list(conn.execute(
+            select(Tag.id).where(Tag.user_id == user_id, Tag.name.in_(names))
+        ).scalars())
+
+    unlink = delete(task_tags).where(task_tags.c.task_id == task_id)
+    if tag_ids:
+        unlink = unlink.where(task_tags.c.tag_id.not_in(tag_ids))
+    conn.execute(unlink)
+
+    if tag_ids:
+        conn.execute(
+            insert(task_tags)
+            .values([{"task_id": task_id, "tag_id": tag_id} for tag_id in tag_ids])
+            .on_conflict_do_nothing()
+        )
+
+
+def apply_many_task_tags(
+    conn: Union[Connection, Session],
+    user_id: str,
+    names_by_task: Dict[int, List[str]],
+):
+    """
+    Replace the tag links of many tasks with a fixed number of statements.
+
+    Args:
+        conn: Connection or ORM session inside a transaction
+        user_id: Owner of the tasks
+        names_by_task: Normalized tag names per task id
+    """
+    if not names_by_task:
+        return
+    names = sorted({name for task_names in names_by_task.values() for name in task_names})
+    tag_ids: Dict[str, int] = {}
+    if names:
+        conn.execute(
+            insert(Tag)
+            .values([{"user_id": user_id, "name": name} for name in names])
+            .on_conflict_do_nothing(index_elements=["user_id", "name"])
+        )
+        tag_ids = dict(conn.execute(
+            select(Tag.name, Tag.id).where(Tag.user_id == user_id, Tag.name.in_(names))
+        ).all())
+
+    conn.execute(delete(task_tags).where(task_tags.c.task_id.in_(list(names_by_task))))
+    links = [
+        {"task_id": task_id, "tag_id": tag_ids[name]}
+        for task_id, task_names in names_by_task.items()
+        for name in task_names
+    ]
+    if links:
+        conn.execute(insert(task_tags).on_conflict_do_nothing(), links)
+
+
+async def sync_task_tags(db: AsyncSession, user_id: str, task_id: int, raw: Optional[str]):
+    """Re-derive a task's tag links from its ``tags`` string."""
+    names = parse_tags(raw)
+    await db.run_sync(lambda session: apply_task_tags(session, user_id, task_id, names))
+
+
+async def clear_task_tags(db: AsyncSession, task_id: int):
+    """Remove all tag links of a task (before deleting it)."""
+    await db.execute(delete(task_tags).where(task_tags.c.task_id == task_id))
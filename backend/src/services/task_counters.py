@@ -0,0 +1,142 @@
+"""Per-task focus counters maintained from linked Pomodoro sessions.
+
+``Task.total_focus_seconds``, ``Task.interrupted_sessions`` and
+``Task.last_worked_at`` are derived from the task's finished sessions,
+hot or archived. Session
+writes apply the change in that session's contribution inside the same
+transaction; ``recompute_task_counters`` rebuilds them from scratch.
+"""
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy import case, func, literal, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.pomodoro import (
+    ArchivedPomodoroSession,
+    PomodoroSession,
+    SessionStatus,
+    SessionType,
+)
+from src.models.task import Task
+
+FINISHED = (SessionStatus.COMPLETED, SessionStatus.INTERRUPTED)
+
+
+class Contribution(NamedTuple):
+    """What one session adds to its task's counters."""
+    focus_seconds: int = 0
+    interrupted: int = 0
+    worked_at: Optional[datetime] = None
+
+
+def contribution(session: PomodoroSession) -> Contribution:
+    """Contribution of a session in its current state (nothing until it finishes)."""
+    if session.task_id is None or session.status not in FINISHED:
+        return Contribution()
+    is_work = session.session_type == SessionType.WORK
+    return Contribution(
+        focus_seconds=(session.actual_duration or 0) if is_work else 0,
+        interrupted=int(session.status == SessionStatus.INTERRUPTED),
+        worked_at=session.ended_at,
+    )
+
+
+async def apply_session_change(
+    db: AsyncSession,
+    user_id: str,
+    session: PomodoroSession,
+    before: Contribution,
+):
+    """
+    Move a session's task counters from ``before`` to its current contribution.
+
+    Call it inside the write transaction, after changing the session.
+
+    Args:
+        db: Database session
+        user_id: Owner of the session and task
+        session: The changed session
+        before: ``contribution(session)`` taken before the change
+    """
+    after = contribution(session)
+    if after == before:
+        return
+
+    focus_delta = after.focus_seconds - before.focus_seconds
+    interrupted_delta = after.interrupted - before.interrupted
+    values = {
+        "total_focus_seconds": Task.total_focus_seconds + focus_delta,
+        "interrupted_sessions": Task.interrupted_sessions + interrupted_delta,
+        # Derived data; not a user edit
+        "updated_at": Task.updated_at,
+    }
+    if after.worked_at is not None:
+        worked_at = literal(after.worked_at, Task.last_worked_at.type)
+        values["last_worked_at"] = case(
+            (Task.last_worked_at.is_(None), worked_at),
+            (Task.last_worked_at < worked_at, worked_at),
+            else_=Task.last_worked_at,
+        )
+
+    await db.execute(
+        update(Task)
+        .where(Task.id == session.task_id, Task.user_id == user_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def recompute_task_counters(conn: Connection, user_id: Optional[str] = None) -> int:
+    """
+    Rebuild the counters of every task (or one user's tasks) from sessions.
+
+    Runs synchronously; call it through ``run_sync`` from async code.
+
+    Args:
+        conn: Connection or ORM session inside a transaction
+        user_id: Only repair this user's tasks
+
+    Returns:
+        int: Number of tasks whose counters changed
+    """
+    focus = interrupted = 0
+    worked_at = None
+    # Hot and archived sessions are summed separately so each uses its task_id index
+    for table in (PomodoroSession.__table__, ArchivedPomodoroSession.__table__):
+        linked = select(table.c.task_id).where(
+            table.c.task_id == Task.id, table.c.status.in_(FINISHED)
+        )
+        focus = focus + linked.with_only_columns(func.coalesce(func.sum(
+            case((table.c.session_type == SessionType.WORK,
+                  func.coalesce(table.c.actual_duration, 0)), else_=0)
+        ), 0)).scalar_subquery()
+        interrupted = interrupted + linked.with_only_columns(func.count()).where(
+            table.c.status == SessionStatus.INTERRUPTED
+        ).scalar_subquery()
+        latest = linked.with_only_columns(func.max(table.c.ended_at)).scalar_subquery()
+        # max() of several arguments is NULL if any is NULL
+        worked_at = latest if worked_at is None else func.max(
+            func.coalesce(worked_at, latest), func.coalesce(latest, worked_at)
+        )
+
+    stale = (
+        (Task.total_focus_seconds != focus)
+        | (Task.interrupted_sessions != interrupted)
+        | Task.last_worked_at.is_distinct_from(worked_at)
+    )
+    statement = (
+        update(Task)
+        .where(stale)
+        .values(
+            total_focus_seconds=focus,
+            interrupted_sessions=interrupted,
+            last_worked_at=worked_at,
+            updated_at=Task.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if user_id is not None:
+        statement = statement.where(Task.user_id == user_id)
+    return conn.execute(statement).rowcount
@@ -0,0 +1,351 @@
+"""Bucketed Pomodoro statistics over arbitrary time ranges.
+
+Buckets are aligned to calendar boundaries in the requested timezone. All
+missing buckets are computed by a single query. Day, week and month
+buckets in ``settings.stats_timezone`` read the ``pomodoro_daily_totals``
+rollup (one row per active day, archived sessions included), so a year of
+daily buckets costs a few hundred rows whatever the session count. Other
+buckets group sessions over the ``(user_id, started_at)`` index, plus the
+archive when the range reaches into it. Closed buckets (those that ended
+before now) are cached until a session write touches them.
+"""
+import bisect
+import math
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Literal, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import FromClause
+
+from src.core.config import settings
+from src.models.pomodoro import PomodoroDailyTotal, SessionStatus, SessionType
+from src.models.types import epoch_seconds
+from src.services.archive import session_source
+
+Bucket = Literal["hour", "day", "week", "month"]
+
+MAX_BUCKETS = 10_000
+
+# Buckets returned when the request gives no start
+DEFAULT_SPANS = {"hour": 24, "day": 30, "week": 12, "month": 12}
+
+FIELDS = (
+    "work_time",
+    "break_time",
+    "sessions",
+    "completed_sessions",
+    "interrupted_sessions",
+    "interruptions",
+)
+
+# Daily totals column holding each field
+DAILY_TOTAL_COLUMNS = (
+    "work_seconds",
+    "break_seconds",
+    "sessions",
+    "completed_sessions",
+    "interrupted_sessions",
+    "interruptions",
+)
+
+Values = Tuple[int, ...]
+
+
+def session_totals(source: FromClause) -> list:
+    """Aggregates of a sessions table or union, in ``FIELDS`` order."""
+    duration = func.coalesce(source.c.actual_duration, 0)
+    is_break = source.c.session_type.in_([SessionType.SHORT_BREAK, SessionType.LONG_BREAK])
+    return [
+        func.sum(case((source.c.session_type == SessionType.WORK, duration), else_=0)),
+        func.sum(case((is_break, duration), else_=0)),
+        func.count(),
+        func.sum(case((source.c.status == SessionStatus.COMPLETED, 1), else_=0)),
+        func.sum(case((source.c.status == SessionStatus.INTERRUPTED, 1), else_=0)),
+        func.sum(source.c.interruptions),
+    ]
+
+
+def resolve_timezone(name: Optional[str]) -> ZoneInfo:
+    """
+    Look up an IANA timezone, defaulting to ``settings.stats_timezone``.
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    try:
+        return ZoneInfo(name or settings.stats_timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {name}")
+
+
+def _to_utc(local: datetime, tz: ZoneInfo) -> datetime:
+    """Naive local wall time -> naive UTC (the storage format)."""
+    return local.replace(tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _to_local(utc: datetime, tz: ZoneInfo) -> datetime:
+    """Naive UTC -> naive local wall time."""
+    return utc.replace(tzinfo=timezone.utc).astimezone(tz).replace(tzinfo=None)
+
+
+def _floor_day(local: datetime, bucket: Bucket) -> date:
+    day = local.date()
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_day(day: date, bucket: Bucket) -> date:
+    if bucket == "week":
+        return day + timedelta(days=7)
+    if bucket == "month":
+        return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+    return day + timedelta(days=1)
+
+
+def bucket_start(instant: datetime, bucket: Bucket, tz: ZoneInfo) -> datetime:
+    """
+    Start (naive UTC) of the bucket containing a naive UTC instant.
+
+    Hour buckets follow the local clock; day, week (ISO, Monday first) and
+    month buckets start at local midnight.
+    """
+    local = _to_local(instant, tz)
+    if bucket == "hour":
+        return _to_utc(local.replace(minute=0, second=0, microsecond=0), tz)
+    return _to_utc(datetime.combine(_floor_day(local, bucket), datetime.min.time()), tz)
+
+
+def bucket_edges(start: datetime, end: datetime, bucket: Bucket, tz: ZoneInfo) -> List[datetime]:
+    """
+    Boundaries (naive UTC) of the buckets covering ``[start, end)``, ``start < end``.
+
+    Returns:
+        list: ``n + 1`` ascending edges for ``n`` buckets
+
+    Raises:
+        ValueError: If the range needs more than ``MAX_BUCKETS`` buckets
+    """
+    edges: List[datetime] = []
+    if bucket == "hour":
+        # Step in UTC so DST transitions neither skip nor repeat an hour
+        edge = bucket_start(start, bucket, tz)
+        while True:
+            edges.append(edge)
+            if edge >= end:
+                break
+            edge += timedelta(hours=1)
+            if len(edges) > MAX_BUCKETS:
+                raise ValueError(f"Range spans more than {MAX_BUCKETS} buckets")
+    else:
+        day = _floor_day(_to_local(start, tz), bucket)
+        while True:
+            edge = _to_utc(datetime.combine(day, datetime.min.time()), tz)
+            edges.append(edge)
+            if edge >= end:
+                break
+            day = _next_day(day, bucket)
+            if len(edges) > MAX_BUCKETS:
+                raise ValueError(f"Range spans more than {MAX_BUCKETS} buckets")
+    return edges
+
+
+def default_start(end: datetime, bucket: Bucket) -> datetime:
+    """Range start used when the request does not give one."""
+    span = DEFAULT_SPANS[bucket]
+    if bucket == "hour":
+        return end - timedelta(hours=span - 1)
+    if bucket == "day":
+        return end - timedelta(days=span - 1)
+    if bucket == "week":
+        return end - timedelta(weeks=span - 1)
+    return end - timedelta(days=31 * (span - 1))
+
+
+class TimeseriesCache:
+    """
+    Per-user cache of closed bucket values.
+
+    Series are keyed by ``(user_id, timezone, bucket)`` and evicted least
+    recently used once ``max_entries`` buckets are held. Writes invalidate
+    only the bucket containing the touched session in each series, and bump
+    a per-user version so a read that raced with the write does not store
+    stale values.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or settings.stats_cache_max_entries
+        self._series: "OrderedDict[Tuple[str, str, str], Dict[datetime, Values]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self.size = 0
+
+    def version(self, user_id: str) -> int:
+        return self._versions.get(user_id, 0)
+
+    def get(self, user_id: str, tz: ZoneInfo, bucket: Bucket) -> Dict[datetime, Values]:
+        """Cached closed buckets of a series, by bucket start."""
+        key = (user_id, tz.key, bucket)
+        series = self._series.get(key)
+        if series is None:
+            return {}
+        self._series.move_to_end(key)
+        return series
+
+    def put(
+        self,
+        user_id: str,
+        tz: ZoneInfo,
+        bucket: Bucket,
+        values: Dict[datetime, Values],
+        version: int,
+    ):
+        """Store closed buckets computed while the user was at ``version``."""
+        if not values or self.version(user_id) != version:
+            return
+        key = (user_id, tz.key, bucket)
+        series = self._series.setdefault(key, {})
+        self._series.move_to_end(key)
+        before = len(series)
+        series.update(values)
+        self.size += len(series) - before
+
+        while self.size > self.max_entries and len(self._series) > 1:
+            _, evicted = self._series.popitem(last=False)
+            self.size -= len(evicted)
+
+    def invalidate(self, user_id: str, *instants: datetime):
+        """Drop the cached buckets containing the given session start times."""
+        self._versions[user_id] = self.version(user_id) + 1
+        for (owner, tz_name, bucket), series in self._series.items():
+            if owner != user_id:
+                continue
+            tz = ZoneInfo(tz_name)
+            for instant in instants:
+                if series.pop(bucket_start(instant, bucket, tz), None) is not None:
+                    self.size -= 1
+
+    def clear(self):
+        self._series.clear()
+        self._versions.clear()
+        self.size = 0
+
+
+# Global cache instance
+timeseries_cache = TimeseriesCache()
+
+
+def _slot_seconds(edges: List[datetime]) -> int:
+    """Largest grouping slot that never straddles a bucket edge."""
+    epoch = datetime(1970, 1, 1)
+    slot = 0
+    for edge in edges:
+        slot = math.gcd(slot, int((edge - epoch).total_seconds()))
+    return slot or 3600
+
+
+def _runs(missing: List[int]) -> List[Tuple[int, int]]:
+    """Group bucket indexes into contiguous ``(first, last)`` runs."""
+    runs: List[Tuple[int, int]] = []
+    for index in missing:
+        if runs and runs[-1][1] == index - 1:
+            runs[-1] = (runs[-1][0], index)
+        else:
+            runs.append((index, index))
+    return runs
+
+
+async def session_timeseries(
+    db: AsyncSession,
+    user_id: str,
+    bucket: Bucket,
+    start: datetime,
+    end: datetime,
+    tz: ZoneInfo,
+    cache: Optional[TimeseriesCache] = None,
+) -> List[Tuple[datetime, datetime, Values]]:
+    """
+    Aggregate a user's sessions into calendar buckets.
+
+    Args:
+        db: Database session
+        user_id: Owner of the sessions
+        bucket: Bucket size
+        start: Range start (naive UTC, inclusive)
+        end: Range end (naive UTC, exclusive)
+        tz: Timezone the buckets are aligned to
+        cache: Closed-bucket cache (defaults to the global one)
+
+    Returns:
+        list: ``(bucket start, bucket end, values)`` for every bucket in the
+        range, zero-filled, with values ordered as ``FIELDS``
+    """
+    cache = cache or timeseries_cache
+    edges = bucket_edges(start, end, bucket, tz)
+    count = len(edges) - 1
+    now = datetime.utcnow()
+
+    version = cache.version(user_id)
+    cached = cache.get(user_id, tz, bucket)
+    values: List[Optional[Values]] = [
+        cached.get(edges[i]) if edges[i + 1] <= now else None for i in range(count)
+    ]
+    missing = [i for i in range(count) if values[i] is None]
+
+    if missing:
+        by_day = bucket != "hour" and tz.key == settings.stats_timezone
+        if by_day:
+            # Edges are local midnights, so buckets are whole rollup days
+            column = PomodoroDailyTotal.day
+            owner = PomodoroDailyTotal.user_id
+            limits = [_to_local(edge, tz).date() for edge in edges]
+            columns = [column, *(getattr(PomodoroDailyTotal, name) for name in DAILY_TOTAL_COLUMNS)]
+        else:
+            source = await session_source(db, user_id, edges[missing[0]])
+            slot = _slot_seconds(edges)
+            column = source.c.started_at
+            owner = source.c.user_id
+            limits = edges
+            columns = [
+                (epoch_seconds(source.c.started_at) // slot).label("slot"),
+                *session_totals(source),
+            ]
+        query = select(*columns).where(
+            owner == user_id,
+            # Outer bounds give the index range; the runs skip cached buckets
+            column >= limits[missing[0]],
+            column < limits[missing[-1] + 1],
+            or_(*(
+                and_(column >= limits[first], column < limits[last + 1])
+                for first, last in _runs(missing)
+            )),
+        )
+        if not by_day:
+            query = query.group_by("slot")
+        rows = (await db.execute(query)).all()
+
+        if by_day:
+            positions = limits
+        else:
+            epoch = datetime(1970, 1, 1)
+            positions = [int((edge - epoch).total_seconds()) for edge in edges]
+        totals: Dict[int, List[int]] = {i: [0] * len(FIELDS) for i in missing}
+        for key, *sums in rows:
+            index = bisect.bisect_right(positions, key if by_day else key * slot) - 1
+            acc = totals.get(index)
+            if acc is not None:
+                for field, value in enumerate(sums):
+                    acc[field] += value or 0
+
+        closed: Dict[datetime, Values] = {}
+        for index, acc in totals.items():
+            values[index] = tuple(acc)
+            if edges[index + 1] <= now:
+                closed[edges[index]] = values[index]
+        cache.put(user_id, tz, bucket, closed, version)
+
+    return [(edges[i], edges[i + 1], values[i]) for i in range(count)]
@@ -0,0 +1,388 @@
+"""Incremental index of the Obsidian vault.
+
+The ``vault_notes`` manifest records the path, mtime, size and content
+hash of every markdown note. A scan walks the vault with ``os.scandir``,
+which yields file metadata without opening files, and only reads and hashes
+notes whose mtime or size differ from the manifest. A new path whose hash
+matches a vanished one is recorded as a rename rather than a delete and an
+add, so the tasks imported from the note (see ``vault_ingest``) are kept.
+The indexer keeps the manifest in memory after the first load, so a
+no-change rescan costs one directory walk and no database reads.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from stat import S_ISDIR, S_ISREG
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import user_session
+from src.models.obsidian import VaultNote
+from src.services.prompt_context import prompt_context
+from src.services.vault_ingest import (
+    get_parse_pool,
+    move_note_tasks,
+    parse_notes,
+    remove_note_tasks,
+    upsert_note_tasks,
+)
+
+logger = logging.getLogger(__name__)
+
+NOTES = VaultNote.__table__
+NOTE_SUFFIX = ".md"
+
+
+class ManifestEntry(NamedTuple):
+    """What the manifest knows about one note."""
+    path: str
+    mtime_ns: int
+    size: int
+    content_hash: str
+
+
+@dataclass
+class VaultChanges:
+    """Differences between the vault on disk and the manifest."""
+    added: List[ManifestEntry] = field(default_factory=list)
+    modified: List[ManifestEntry] = field(default_factory=list)
+    # Same contents, new mtime (e.g. touched or rewritten unchanged)
+    touched: List[ManifestEntry] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    # (old path, entry at the new path)
+    renamed: List[Tuple[str, ManifestEntry]] = field(default_factory=list)
+    scanned: int = 0
+    hashed: int = 0
+    duration: float = 0.0
+    # Imported tasks created / updated / deleted
+    tasks: Dict[str, int] = field(
+        default_factory=lambda: {"created": 0, "updated": 0, "deleted": 0}
+    )
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.modified or self.touched or self.removed or self.renamed)
+
+    def summary(self) -> Dict[str, float]:
+        """Counts for logs and API responses."""
+        return {
+            "scanned": self.scanned,
+            "hashed": self.hashed,
+            "added": len(self.added),
+            "modified": len(self.modified),
+            "touched": len(self.touched),
+            "removed": len(self.removed),
+            "renamed": len(self.renamed),
+            "duration": round(self.duration, 4),
+            **{f"tasks_{name}": count for name, count in self.tasks.items()},
+        }
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def walk_notes(root: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Map every note under ``root`` to its ``(mtime_ns, size)``.
+
+    Hidden files and directories (``.obsidian``, ``.git``, ``.trash``) are
+    skipped.
+    """
+    found: Dict[str, Tuple[int, int]] = {}
+    stack = [""]
+    while stack:
+        relative = stack.pop()
+        try:
+            entries = os.scandir(os.path.join(root, relative))
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                path = f"{relative}/{entry.name}" if relative else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(path)
+                    elif entry.name.endswith(NOTE_SUFFIX) and entry.is_file():
+                        stat = entry.stat()
+                        found[path] = (stat.st_mtime_ns, stat.st_size)
+                except FileNotFoundError:
+                    # Deleted while walking
+                    continue
+    return found
+
+
+def is_hidden(path: str) -> bool:
+    """Whether a vault-relative path lies in a hidden file or directory."""
+    return any(part.startswith(".") for part in path.split("/"))
+
+
+def walk_paths(root: str, paths: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+    """
+    Like ``walk_notes``, limited to the given vault-relative paths.
+
+    Directories among the paths are walked; missing paths are left out.
+    """
+    found: Dict[str, Tuple[int, int]] = {}
+    for path in paths:
+        if is_hidden(path):
+            continue
+        full = os.path.join(root, path)
+        try:
+            stat = os.stat(full)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+        if S_ISDIR(stat.st_mode):
+            found.update({f"{path}/{name}": meta for name, meta in walk_notes(full).items()})
+        elif S_ISREG(stat.st_mode) and path.endswith(NOTE_SUFFIX):
+            found[path] = (stat.st_mtime_ns, stat.st_size)
+    return found
+
+
+def scan_vault(
+    root: str,
+    manifest: Dict[str, ManifestEntry],
+    paths: Optional[Iterable[str]] = None,
+) -> VaultChanges:
+    """
+    Compare the vault on disk with the manifest (synchronous).
+
+    Args:
+        root: Vault directory
+        manifest: Current manifest entries by path
+        paths: Only look at these vault-relative paths (and, for
+            directories, everything below them) instead of the whole vault
+
+    Returns:
+        VaultChanges: What changed since the manifest was written
+    """
+    start = time.perf_counter()
+    changes = VaultChanges()
+    if paths is None:
+        on_disk = walk_notes(root)
+    else:
+        paths = set(paths)
+        on_disk = walk_paths(root, paths)
+        prefixes = tuple(f"{path}/" for path in paths)
+        manifest = {
+            path: entry for path, entry in manifest.items()
+            if path in paths or path.startswith(prefixes)
+        }
+    changes.scanned = len(on_disk)
+
+    candidates: List[ManifestEntry] = []
+    for path, (mtime_ns, size) in on_disk.items():
+        known = manifest.get(path)
+        if known is not None and known.mtime_ns == mtime_ns and known.size == size:
+            continue
+        try:
+            content_hash = hash_file(os.path.join(root, path))
+        except FileNotFoundError:
+            continue
+        changes.hashed += 1
+        entry = ManifestEntry(path, mtime_ns, size, content_hash)
+        if known is None:
+            candidates.append(entry)
+        elif known.content_hash == content_hash:
+            changes.touched.append(entry)
+        else:
+            changes.modified.append(entry)
+
+    vanished = {path: entry for path, entry in manifest.items() if path not in on_disk}
+    by_hash: Dict[str, List[str]] = {}
+    for path, entry in sorted(vanished.items()):
+        by_hash.setdefault(entry.content_hash, []).append(path)
+
+    for entry in candidates:
+        sources = by_hash.get(entry.content_hash)
+        if sources:
+            old_path = sources.pop(0)
+            del vanished[old_path]
+            changes.renamed.append((old_path, entry))
+        else:
+            changes.added.append(entry)
+    changes.removed = sorted(vanished)
+
+    changes.duration = time.perf_counter() - start
+    return changes
+
+
+async def load_manifest(db: AsyncSession) -> Dict[str, ManifestEntry]:
+    """Read the whole manifest into memory."""
+    rows = await db.execute(
+        select(NOTES.c.path, NOTES.c.mtime_ns, NOTES.c.size, NOTES.c.content_hash)
+    )
+    return {row.path: ManifestEntry(*row) for row in rows}
+
+
+async def apply_changes(db: AsyncSession, changes: VaultChanges):
+    """
+    Write scan results to the manifest with a few batched statements.
+
+    Does not commit.
+    """
+    now = datetime.utcnow()
+    if changes.removed:
+        await db.execute(delete(NOTES).where(NOTES.c.path.in_(changes.removed)))
+
+    updates = [
+        {"old_path": old_path, **entry._asdict()}
+        for old_path, entry in changes.renamed
+    ] + [
+        {"old_path": entry.path, **entry._asdict()}
+        for entry in changes.modified + changes.touched
+    ]
+    if updates:
+        await db.execute(
+            update(NOTES)
+            .where(NOTES.c.path == bindparam("old_path"))
+            .values(
+                path=bindparam("path"),
+                mtime_ns=bindparam("mtime_ns"),
+                size=bindparam("size"),
+                content_hash=bindparam("content_hash"),
+                indexed_at=now,
+            ),
+            updates,
+        )
+
+    if changes.added:
+        await db.execute(
+            insert(NOTES),
+            [{**entry._asdict(), "indexed_at": now} for entry in changes.added],
+        )
+
+
+class VaultIndexer:
+    """Runs incremental vault scans, one at a time."""
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        session_factory: Optional[async_sessionmaker] = None,
+    ):
+        self.root = root or settings.obsidian_vault_path
+        self.session_factory = session_factory
+        self.last_changes: Optional[VaultChanges] = None
+        self._lock = asyncio.Lock()
+        # In-memory copy of the manifest (this indexer is its only writer),
+        # tagged with the vault and engine it was loaded for
+        self._manifest: Optional[Dict[str, ManifestEntry]] = None
+        self._manifest_source: Optional[tuple] = None
+
+    async def run(
+        self,
+        db: Optional[AsyncSession] = None,
+        paths: Optional[Iterable[str]] = None,
+    ) -> VaultChanges:
+        """
+        Scan the vault and bring the manifest up to date.
+
+        Args:
+            db: Session to use (a new one is opened when omitted)
+            paths: Only rescan these vault-relative paths (see ``scan_vault``)
+
+        Raises:
+            FileNotFoundError: If the vault directory does not exist
+        """
+        if not self.root or not os.path.isdir(self.root):
+            raise FileNotFoundError(f"Obsidian vault not found: {self.root}")
+
+        async with self._lock:
+            if db is None:
+                # Tasks are imported for the default user (their shard, if sharded)
+                async with user_session(settings.default_user_id, self.session_factory) as session:
+                    return await self._run(session, paths)
+            return await self._run(db, paths)
+
+    async def _run(self, db: AsyncSession, paths: Optional[Iterable[str]] = None) -> VaultChanges:
+        source = (self.root, db.bind)
+        if self._manifest is None or self._manifest_source != source:
+            self._manifest = await load_manifest(db)
+            self._manifest_source = source
+
+        changes = await asyncio.to_thread(scan_vault, self.root, self._manifest, paths)
+        start = time.perf_counter()
+        if changes.changed:
+            try:
+                await self._apply(db, changes)
+            except Exception:
+                await db.rollback()
+                self._manifest = None
+                raise
+            finally:
+                # Chunks are committed as they go, even when a later one fails
+                if any(changes.tasks.values()):
+                    prompt_context.invalidate(settings.default_user_id, "tasks")
+        changes.duration += time.perf_counter() - start
+        self.last_changes = changes
+        logger.info(f"Indexed vault {self.root}: {changes.summary()}")
+        return changes
+
+    async def _apply(self, db: AsyncSession, changes: VaultChanges):
+        """
+        Record the changes and import the tasks of new and edited notes.
+
+        Deletes, renames and touches are committed first. Notes that need
+        parsing are then committed chunk by chunk together with their
+        manifest entries, so the manifest never claims a note whose tasks
+        were not imported.
+        """
+        user_id = settings.default_user_id
+        moved = VaultChanges(
+            touched=changes.touched, removed=changes.removed, renamed=changes.renamed
+        )
+        if moved.changed:
+            await apply_changes(db, moved)
+            changes.tasks["deleted"] += await remove_note_tasks(db, user_id, changes.removed)
+            renames = [(old, entry.path) for old, entry in changes.renamed]
+            await move_note_tasks(db, user_id, renames)
+            await db.commit()
+            self._update_manifest(moved)
+
+        entries = {entry.path: entry for entry in changes.added + changes.modified}
+        added = {entry.path for entry in changes.added}
+        async for notes in parse_notes(self.root, sorted(entries), get_parse_pool()):
+            batch = VaultChanges()
+            for note in notes:
+                entry = entries[note.path]
+                (batch.added if note.path in added else batch.modified).append(entry)
+            await apply_changes(db, batch)
+            counts = await upsert_note_tasks(db, user_id, notes)
+            await db.commit()
+            self._update_manifest(batch)
+            for name, count in counts.items():
+                changes.tasks[name] += count
+
+    def indexed_under(self, directory: str) -> bool:
+        """Whether the last scan indexed notes under a vault-relative directory."""
+        prefix = f"{directory}/"
+        return any(path.startswith(prefix) for path in self._manifest or ())
+
+    def _update_manifest(self, changes: VaultChanges):
+        manifest = self._manifest
+        for path in changes.removed:
+            manifest.pop(path, None)
+        for old_path, entry in changes.renamed:
+            manifest.pop(old_path, None)
+            manifest[entry.path] = entry
+        for entry in changes.added + changes.modified + changes.touched:
+            manifest[entry.path] = entry
+
+
+# Global indexer for the configured vault
+vault_indexer = VaultIndexer()
@@ -0,0 +1,266 @@
+"""Import of Obsidian checkbox items as tasks.
+
+Notes are parsed in a process pool, in chunks, so thousands of notes never
+run markdown or YAML parsing on the event loop; each chunk's results come
+back as an awaitable future. Every checkbox item becomes a ``Task`` row
+keyed by ``(user_id, source_path, source_key)`` and is written with one
+batched upsert per chunk. Rows are only rewritten when the item's title,
+state, tags or links changed. The last checkbox state read is kept in
+``source_done``, so only observed ticks and unticks change a task's status.
+"""
+import asyncio
+import json
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, delete, select, tuple_, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.models.tag import task_tags
+from src.models.task import PRIORITY_RANKS, Task, TaskPriority, TaskStatus, compute_queue_score
+from src.services.note_parser import ParsedNote, parse_chunk
+from src.services.tags import apply_many_task_tags, normalize_tag
+
+TASKS = Task.__table__
+
+# Columns the vault owns; everything else (priority, estimates, counters)
+# is left as the user set it in the app
+VAULT_COLUMNS = (
+    "title", "description", "status", "completed_at", "tags", "source_done",
+    "priority_rank", "queue_score", "updated_at",
+)
+
+# Keeps IN lists well below SQLite's bound-parameter limit
+IN_CLAUSE_SIZE = 500
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """The shared parse pool, or None when ``OBSIDIAN_PARSE_WORKERS`` is 0."""
+    global _pool
+    if settings.obsidian_parse_workers <= 0:
+        return None
+    if _pool is None:
+        # spawn: forking a process that runs an event loop and DB threads is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.obsidian_parse_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_parse_pool():
+    """Stop the parse pool's worker processes."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def parse_notes(
+    root: str,
+    paths: List[str],
+    pool: Optional[Executor] = None,
+    chunk_size: Optional[int] = None,
+) -> AsyncIterator[List[ParsedNote]]:
+    """
+    Parse notes in chunks, yielding each chunk's results as it completes.
+
+    At most two chunks per worker are queued at a time, so results never
+    pile up faster than the caller consumes them. Without a pool (or with a
+    single chunk) chunks are parsed in a thread instead.
+
+    Args:
+        root: Vault directory
+        paths: Vault-relative paths to parse
+        pool: Process pool to parse in
+        chunk_size: Notes per chunk
+    """
+    chunk_size = chunk_size or settings.obsidian_parse_chunk_size
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    if pool is None or len(chunks) <= 1:
+        for chunk in chunks:
+            yield await asyncio.to_thread(parse_chunk, root, chunk)
+        return
+
+    loop = asyncio.get_running_loop()
+    max_pending = 2 * getattr(pool, "_max_workers", 1)
+    remaining = iter(chunks)
+    pending: Set[asyncio.Future] = set()
+    try:
+        while True:
+            for chunk in remaining:
+                pending.add(loop.run_in_executor(pool, parse_chunk, root, chunk))
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _in_batches(items: List, size: int = IN_CLAUSE_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+async def _delete_tasks(db: AsyncSession, ids: List[int]):
+    for batch in _in_batches(ids):
+        await db.execute(delete(task_tags).where(task_tags.c.task_id.in_(batch)))
+        await db.execute(delete(TASKS).where(TASKS.c.id.in_(batch)))
+
+
+async def remove_note_tasks(db: AsyncSession, user_id: str, paths: List[str]) -> int:
+    """Delete the tasks imported from notes that no longer exist."""
+    ids: List[int] = []
+    for batch in _in_batches(paths):
+        ids += (await db.execute(
+            select(TASKS.c.id).where(TASKS.c.user_id == user_id, TASKS.c.source_path.in_(batch))
+        )).scalars().all()
+    await _delete_tasks(db, ids)
+    return len(ids)
+
+
+async def move_note_tasks(db: AsyncSession, user_id: str, renames: List[Tuple[str, str]]):
+    """Point the tasks of renamed notes at their new paths."""
+    if not renames:
+        return
+    await db.execute(
+        update(TASKS)
+        .where(TASKS.c.user_id == user_id, TASKS.c.source_path == bindparam("old_path"))
+        .values(source_path=bindparam("new_path"), updated_at=TASKS.c.updated_at),
+        [{"old_path": old, "new_path": new} for old, new in renames],
+    )
+
+
+async def upsert_note_tasks(
+    db: AsyncSession, user_id: str, notes: List[ParsedNote]
+) -> Dict[str, int]:
+    """
+    Bring the tasks imported from the given notes in line with their checkboxes.
+
+    Ticking a box completes the task; unticking it reopens the task if it is
+    completed. Status changes made in the app stand until the box itself
+    changes, so edits to other lines never undo them. Items that
+    disappeared from a note are deleted. Notes that could not be read keep
+    their tasks. Does not commit.
+
+    Returns:
+        dict: Numbers of tasks ``created``, ``updated`` and ``deleted``
+    """
+    notes = [note for note in notes if note.error is None]
+    counts = {"created": 0, "updated": 0, "deleted": 0}
+    if not notes:
+        return counts
+
+    paths = [note.path for note in notes]
+    existing = {}
+    for batch in _in_batches(paths):
+        rows = await db.execute(select(
+            TASKS.c.id, TASKS.c.source_path, TASKS.c.source_key, TASKS.c.title,
+            TASKS.c.description, TASKS.c.status, TASKS.c.completed_at, TASKS.c.tags,
+            TASKS.c.source_done, TASKS.c.priority, TASKS.c.estimated_pomodoros,
+            TASKS.c.completed_pomodoros,
+        ).where(TASKS.c.user_id == user_id, TASKS.c.source_path.in_(batch)))
+        existing.update({(row.source_path, row.source_key): row for row in rows})
+
+    now = datetime.utcnow()
+    upserts = []
+    tags_by_key: Dict[Tuple[str, str], List[str]] = {}
+    current: Set[Tuple[str, str]] = set()
+    for note in notes:
+        for item in note.tasks:
+            key = (note.path, item.key)
+            current.add(key)
+            row = existing.get(key)
+
+            if row is None:
+                status = TaskStatus.COMPLETED if item.done else TaskStatus.TODO
+            elif row.source_done is None or row.source_done == item.done:
+                # No observed change of the box
+                status = row.status
+            elif item.done:
+                status = TaskStatus.COMPLETED
+            elif row.status == TaskStatus.COMPLETED:
+                status = TaskStatus.TODO
+            else:
+                status = row.status
+            tags = list(dict.fromkeys(filter(None, map(normalize_tag, item.tags))))
+            values = {
+                "title": item.title,
+                "description": f"Links: {', '.join(item.links)}" if item.links else None,
+                "status": status,
+                "tags": json.dumps(tags) if tags else None,
+                "source_done": item.done,
+            }
+            unchanged = row is not None and all(
+                getattr(row, name) == value for name, value in values.items()
+            )
+            if unchanged:
+                continue
+
+            priority = row.priority if row is not None else TaskPriority.MEDIUM
+            estimated = row.estimated_pomodoros if row is not None else 1
+            completed = row.completed_pomodoros if row is not None else 0
+            if status != TaskStatus.COMPLETED:
+                completed_at = None
+            elif row is not None and row.status == TaskStatus.COMPLETED:
+                completed_at = row.completed_at
+            else:
+                completed_at = now
+            upserts.append({
+                **values,
+                "user_id": user_id,
+                "source_path": note.path,
+                "source_key": item.key,
+                "completed_at": completed_at,
+                "priority": priority,
+                "priority_rank": PRIORITY_RANKS[priority],
+                "queue_score": compute_queue_score(status, priority, estimated, completed),
+                "estimated_pomodoros": estimated,
+                "completed_pomodoros": completed,
+                "total_focus_seconds": 0,
+                "interrupted_sessions": 0,
+                "created_at": now,
+                "updated_at": now,
+            })
+            tags_by_key[key] = tags
+            counts["created" if row is None else "updated"] += 1
+
+    if upserts:
+        statement = insert(Task)
+        await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["user_id", "source_path", "source_key"],
+                set_={name: getattr(statement.excluded, name) for name in VAULT_COLUMNS},
+            ),
+            upserts,
+        )
+
+    stale = [row.id for key, row in existing.items() if key not in current]
+    await _delete_tasks(db, stale)
+    counts["deleted"] = len(stale)
+
+    if tags_by_key:
+        ids: Dict[Tuple[str, str], int] = {}
+        for batch in _in_batches(list(tags_by_key)):
+            rows = await db.execute(
+                select(TASKS.c.source_path, TASKS.c.source_key, TASKS.c.id).where(
+                    TASKS.c.user_id == user_id,
+                    tuple_(TASKS.c.source_path, TASKS.c.source_key).in_(batch),
+                )
+            )
+            ids.update({(path, key): task_id for path, key, task_id in rows})
+        names_by_task = {ids[key]: names for key, names in tags_by_key.items()}
+        await db.run_sync(lambda session: apply_many_task_tags(session, user_id, names_by_task))
+
+    return counts
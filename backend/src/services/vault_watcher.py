@@ -0,0 +1,160 @@
+"""Filesystem watcher that keeps the vault index current.
+
+Instead of rescanning the vault on a timer, the watcher subscribes to
+change events (inotify on Linux, via ``watchfiles``) and hands the changed
+paths to the ``VaultIndexer``. Event storms are coalesced twice: watchfiles
+groups raw events until the vault has been quiet for a short step, and
+batches that arrive while the indexer is busy are merged into one pending
+set, so every path is scanned once however many events it produced.
+
+Only the changed paths are rescanned. A full manifest rescan happens only
+when events may have been lost or are not worth tracking individually:
+at startup, after the watcher had to restart, and when a pending batch
+overflows ``OBSIDIAN_WATCH_MAX_BATCH`` paths (e.g. a ``git pull`` touching
+thousands of notes).
+"""
+import asyncio
+import logging
+import os
+from typing import List, Optional, Set
+
+from watchfiles import Change, awatch
+
+from src.core.config import settings
+from src.services.vault_index import NOTE_SUFFIX, VaultIndexer, is_hidden, vault_indexer
+
+logger = logging.getLogger(__name__)
+
+
+class VaultWatcher:
+    """Feeds filesystem events under the vault to the indexer."""
+
+    def __init__(
+        self,
+        indexer: VaultIndexer = vault_indexer,
+        debounce_ms: Optional[int] = None,
+        step_ms: Optional[int] = None,
+        max_batch: Optional[int] = None,
+    ):
+        self.indexer = indexer
+        self.debounce_ms = debounce_ms or settings.obsidian_watch_debounce_ms
+        self.step_ms = step_ms or settings.obsidian_watch_step_ms
+        self.max_batch = max_batch or settings.obsidian_watch_max_batch
+        self.batches = 0
+        self.full_rescans = 0
+        self._pending: Set[str] = set()
+        self._overflow = True  # Nothing is known about the vault before the first scan
+        self._ready = asyncio.Event()
+        self._ready.set()
+        self._tasks: List[asyncio.Task] = []
+        self._stop = asyncio.Event()
+
+    @property
+    def root(self) -> str:
+        return self.indexer.root
+
+    def _relative(self, path: str) -> Optional[str]:
+        """Vault-relative path of an event, or None if it can be ignored."""
+        relative = os.path.relpath(path, self.root).replace(os.sep, "/")
+        if relative.startswith("..") or relative == "." or is_hidden(relative):
+            return None
+        # Keep notes and directories (being moved or deleted, so also the
+        # ones that only held notes at the last scan); attachments and other
+        # files are not indexed
+        name = relative.rsplit("/", 1)[-1]
+        if name.endswith(NOTE_SUFFIX) or "." not in name:
+            return relative
+        if os.path.isdir(path) or self.indexer.indexed_under(relative):
+            return relative
+        return None
+
+    def _filter(self, change: Change, path: str) -> bool:
+        return self._relative(path) is not None
+
+    def add_paths(self, paths):
+        """
+        Queue changed absolute paths for the next index run.
+
+        Paths are deduplicated against everything still pending; once more
+        than ``max_batch`` are pending they are dropped in favour of one
+        full rescan.
+        """
+        if not self._overflow:
+            self._pending.update(filter(None, map(self._relative, paths)))
+            if len(self._pending) > self.max_batch:
+                logger.info(
+                    f"Vault watcher overflow ({len(self._pending)} paths), rescanning vault"
+                )
+                self._overflow = True
+                self._pending.clear()
+        self._ready.set()
+
+    async def _watch(self):
+        """Collect event batches, restarting (with a full rescan) on errors."""
+        while not self._stop.is_set():
+            try:
+                async for changes in awatch(
+                    self.root,
+                    watch_filter=self._filter,
+                    debounce=self.debounce_ms,
+                    step=self.step_ms,
+                    stop_event=self._stop,
+                ):
+                    self.add_paths(path for _, path in changes)
+            except Exception as e:
+                logger.error(f"Vault watcher failed: {e}", exc_info=True)
+                await asyncio.sleep(settings.obsidian_watch_retry)
+                # Events may have been missed while the watcher was down
+                self._overflow = True
+                self._ready.set()
+
+    async def _index(self):
+        """Run the indexer for whatever is pending, one batch at a time."""
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            if not self._overflow and not self._pending:
+                continue
+            full, paths = self._overflow, self._pending
+            self._overflow, self._pending = False, set()
+            try:
+                await self.indexer.run(paths=None if full else paths)
+                self.batches += 1
+                self.full_rescans += full
+            except Exception as e:
+                logger.error(f"Vault indexing failed: {e}", exc_info=True)
+                self._overflow = True
+                await asyncio.sleep(settings.obsidian_watch_retry)
+                self._ready.set()
+
+    def start(self):
+        """Start watching (no-op unless sync and watching are enabled and the vault exists)."""
+        if self._tasks or not (settings.obsidian_sync_enabled and settings.obsidian_watch_enabled):
+            return
+        if not self.root or not os.path.isdir(self.root):
+            logger.warning(f"Obsidian vault not found, not watching: {self.root}")
+            return
+        self._stop.clear()
+        self._tasks = [
+            asyncio.create_task(self._watch(), name="vault-watcher"),
+            asyncio.create_task(self._index(), name="vault-watcher-index"),
+        ]
+        logger.info(f"Watching Obsidian vault {self.root}")
+
+    async def stop(self):
+        """Stop watching; pending paths are picked up by the next start's full rescan."""
+        self._stop.set()
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._overflow = True
+        self._pending.clear()
+
+
+# Global watcher for the configured vault, started by the application lifespan
+vault_watcher = VaultWatcher()
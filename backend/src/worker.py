@@ -0,0 +1,280 @@
+"""Focus Agent background worker.
+
+Runs the jobs the API enqueues (see ``services.jobs``) and the scheduled
+maintenance that used to run inside the API process: backups, session
+archival, GitHub issue sync, daily note write-back and the vault watcher.
+Start it next to the API with ``WORKER_ENABLED=true``::
+
+    python -m src.worker
+
+Several workers may share the database; leases and per-kind concurrency
+limits are enforced in the queue, not in the process.
+"""
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import async_session_maker, close_db, init_db
+from src.core.metrics import JOB_DURATION, JOBS_PROCESSED
+from src.core.redis_client import close_redis, init_redis
+from src.models.job import JobStatus
+from src.services import job_handlers  # noqa: F401  (registers the job kinds)
+from src.services.claude import claude_client
+from src.services.github_sync import github_sync
+from src.services.jobs import (
+    JOB_KINDS,
+    claim_job,
+    complete_job,
+    enqueue,
+    fail_job,
+    purge_jobs,
+    release_job,
+    renew_lease,
+)
+from src.services.vault_ingest import shutdown_parse_pool
+from src.services.vault_watcher import vault_watcher
+
+logger = logging.getLogger(__name__)
+
+# Seconds between purges of finished jobs
+PURGE_INTERVAL = 3600.0
+
+
+def scheduled_jobs() -> List[Tuple[str, float]]:
+    """Periodic job kinds enabled by the configuration, with their intervals."""
+    jobs = []
+    if settings.backup_enabled:
+        jobs.append(("backup", settings.backup_interval))
+    if settings.session_archive_after_days > 0:
+        jobs.append(("archive_sessions", settings.session_archive_interval))
+    if settings.github_sync_enabled:
+        jobs.append(("github_sync", settings.github_sync_interval))
+    if settings.obsidian_sync_enabled:
+        # Drains lines left in the outbox by a crash or a failed write
+        jobs.append(("daily_notes", settings.obsidian_writeback_retry))
+    return jobs
+
+
+class Worker:
+    """Claims jobs from the queue and runs them, a few at a time."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = async_session_maker,
+        concurrency: Optional[int] = None,
+        lease: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        worker_id: Optional[str] = None,
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency or settings.worker_concurrency
+        self.lease = lease or settings.worker_lease_seconds
+        self.poll_interval = poll_interval or settings.worker_poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self._running: Set[asyncio.Task] = set()
+        self._wake = asyncio.Event()
+        self.processed: Dict[str, int] = {"succeeded": 0, "retried": 0, "failed": 0}
+
+    async def claim(self) -> Optional[Row]:
+        """Lease the next runnable job, if any."""
+        async with self.session_factory() as session:
+            return await claim_job(session, self.worker_id, self.lease)
+
+    async def _heartbeat(self, job_id: int):
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            async with self.session_factory() as session:
+                if not await renew_lease(session, job_id, self.worker_id, self.lease):
+                    logger.warning(f"Lost the lease of job {job_id}")
+                    return
+
+    async def execute(self, job: Row):
+        """
+        Run a claimed job and record the outcome.
+
+        Failures are retried with backoff until the job's attempts run out.
+        A job whose lease expired on its last attempt (the worker running it
+        died) fails without running again.
+        """
+        kind = JOB_KINDS.get(job.kind)
+        if kind is None:
+            await self._finish(job, error=f"Unknown job kind: {job.kind}", retry=False)
+            return
+        if job.attempts > job.max_attempts:
+            await self._finish(job, error="Lease expired on the last attempt", retry=False)
+            return
+
+        start = time.perf_counter()
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        try:
+            payload = json.loads(job.payload) if job.payload else {}
+            result = await asyncio.wait_for(kind.handler(payload), timeout=kind.timeout)
+        except asyncio.CancelledError:
+            # Worker shutdown: hand the job back without spending an attempt
+            async with self.session_factory() as session:
+                await release_job(session, job.id, self.worker_id)
+            raise
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                error = f"Timed out after {kind.timeout}s"
+            else:
+                error = repr(e)
+            logger.error(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed: {error}")
+            await self._finish(job, error=error)
+        else:
+            await self._finish(job, result=result)
+        finally:
+            heartbeat.cancel()
+            JOB_DURATION.labels(job.kind).observe(time.perf_counter() - start)
+
+    async def _finish(self, job: Row, result=None, error: Optional[str] = None, retry: bool = True):
+        async with self.session_factory() as session:
+            if error is None:
+                completed = await complete_job(session, job.id, self.worker_id, result)
+                status = JobStatus.SUCCEEDED if completed else None
+            else:
+                status = await fail_job(session, job, self.worker_id, error, retry=retry)
+        if status is None:
+            outcome = "lease_lost"
+            logger.warning(f"Job {job.id} ({job.kind}) finished after its lease was lost")
+        else:
+            outcome = {
+                JobStatus.SUCCEEDED: "succeeded",
+                JobStatus.QUEUED: "retried",
+                JobStatus.FAILED: "failed",
+            }[status]
+            self.processed[outcome] += 1
+        JOBS_PROCESSED.labels(job.kind, outcome).inc()
+
+    async def run_pending(self) -> int:
+        """
+        Run jobs until none can be claimed, up to ``concurrency`` at a time.
+
+        Returns:
+            int: Number of jobs claimed
+        """
+        claimed = 0
+        while True:
+            claimed += await self._fill()
+            if not self._running:
+                return claimed
+            await asyncio.wait(self._running, return_when=asyncio.FIRST_COMPLETED)
+
+    async def _fill(self) -> int:
+        """Claim jobs into free slots; returns how many were started."""
+        started = 0
+        while len(self._running) < self.concurrency:
+            job = await self.claim()
+            if job is None:
+                break
+            task = asyncio.create_task(self.execute(job), name=f"job-{job.id}")
+            task.add_done_callback(self._done)
+            self._running.add(task)
+            started += 1
+        return started
+
+    def _done(self, task: asyncio.Task):
+        self._running.discard(task)
+        # A finished job frees a slot and may unblock its kind's limit
+        self._wake.set()
+
+    async def run(self, stop: asyncio.Event):
+        """Claim and run jobs until ``stop`` is set, then wait for running jobs."""
+        logger.info(f"Worker {self.worker_id} started (concurrency {self.concurrency})")
+        while not stop.is_set():
+            try:
+                await self._fill()
+            except Exception as e:
+                logger.error(f"Claiming jobs failed: {e}", exc_info=True)
+            self._wake.clear()
+            waiter = asyncio.create_task(self._wake.wait())
+            stopper = asyncio.create_task(stop.wait())
+            await asyncio.wait(
+                {waiter, stopper}, timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED
+            )
+            waiter.cancel()
+            stopper.cancel()
+        await self.drain()
+
+    async def drain(self, timeout: Optional[float] = None):
+        """Wait for running jobs; jobs still running after ``timeout`` are handed back."""
+        if not self._running:
+            return
+        _, pending = await asyncio.wait(set(self._running), timeout=timeout or self.lease)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def schedule(session_factory: async_sessionmaker, kind: str, interval: float):
+    """Enqueue a periodic job every ``interval`` seconds (at most one queued at a time)."""
+    while True:
+        try:
+            async with session_factory() as session:
+                await enqueue(session, kind, unique_key=kind)
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Scheduling {kind} failed: {e}", exc_info=True)
+        await asyncio.sleep(interval)
+
+
+async def purge(session_factory: async_sessionmaker):
+    """Delete old finished jobs every hour."""
+    while True:
+        try:
+            async with session_factory() as session:
+                purged = await purge_jobs(session)
+            if purged:
+                logger.info(f"Purged {purged} finished jobs")
+        except Exception as e:
+            logger.error(f"Purging jobs failed: {e}", exc_info=True)
+        await asyncio.sleep(PURGE_INTERVAL)
+
+
+async def main():
+    """Run the worker until SIGTERM or SIGINT."""
+    await init_db()
+    await init_redis()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+
+    worker = Worker()
+    tasks = [
+        asyncio.create_task(schedule(async_session_maker, kind, interval), name=f"schedule-{kind}")
+        for kind, interval in scheduled_jobs()
+    ]
+    tasks.append(asyncio.create_task(purge(async_session_maker), name="purge-jobs"))
+    vault_watcher.start()
+    try:
+        await worker.run(stop)
+    finally:
+        logger.info("Shutting down worker...")
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await vault_watcher.stop()
+        await github_sync.stop()
+        await claude_client.close()
+        shutdown_parse_pool()
+        await close_redis()
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.DEBUG if settings.debug else logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    asyncio.run(main())
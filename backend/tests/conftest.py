@@ -9,6 +9,8 @@ from sqlalchemy.pool import StaticPool
 from src.main import app
 from src.core.database import Base, get_db
 from src.models import Task, PomodoroSession
+from src.services.prompt_context import prompt_context
+from src.services.timeseries import timeseries_cache
 
 
 # Use in-memory SQLite for tests
@@ -23,6 +25,16 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def reset_caches():
+    """Keep process-wide caches from leaking between test databases."""
+    timeseries_cache.clear()
+    prompt_context.clear()
+    yield
+    timeseries_cache.clear()
+    prompt_context.clear()
+
+
 @pytest.fixture(scope="function")
 async def test_db() -> AsyncGenerator[AsyncSession, None]:
     """Create test database session."""
@@ -0,0 +1,42 @@
+"""Tests for administrative maintenance endpoints."""
+from datetime import datetime
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+
+from src.models.pomodoro import PomodoroSession, SessionStatus, SessionType
+from src.models.task import Task
+
+
+@pytest.mark.asyncio
+async def test_repair_task_counters(client: AsyncClient, test_db):
+    """Test the repair job recomputes drifted task counters from sessions."""
+    task = (await client.post("/api/tasks", json={"title": "Drifted"})).json()
+    untouched = (await client.post("/api/tasks", json={"title": "Idle"})).json()
+    for status, duration in ((SessionStatus.COMPLETED, 1500), (SessionStatus.INTERRUPTED, 300)):
+        test_db.add(PomodoroSession(
+            session_type=SessionType.WORK,
+            status=status,
+            planned_duration=1500,
+            actual_duration=duration,
+            started_at=datetime(2026, 1, 1, 9, 0),
+            ended_at=datetime(2026, 1, 1, 9, 30),
+            task_id=task["id"],
+        ))
+    await test_db.execute(
+        update(Task).where(Task.id == task["id"]).values(total_focus_seconds=42)
+    )
+    await test_db.commit()
+
+    response = await client.post("/api/admin/repair/task-counters")
+    assert response.status_code == 200
+    assert response.json() == {"repaired": 1}
+
+    data = (await client.get(f"/api/tasks/{task['id']}")).json()
+    assert data["total_focus_seconds"] == 1800
+    assert data["interrupted_sessions"] == 1
+    assert data["last_worked_at"] == "2026-01-01T09:30:00"
+    assert (await client.get(f"/api/tasks/{untouched['id']}")).json()["total_focus_seconds"] == 0
+
+    response = await client.post("/api/admin/repair/task-counters")
+    assert response.json() == {"repaired": 0}
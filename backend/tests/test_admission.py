@@ -0,0 +1,102 @@
+"""Tests for API admission control."""
+import asyncio
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from src.core.admission import (
+    AdmissionControlMiddleware,
+    AdmissionController,
+    AdmissionGate,
+    Overloaded,
+)
+
+
+@pytest.mark.asyncio
+async def test_gate_admits_waiters_in_order():
+    """Test released slots go to queued requests first-come first-served."""
+    gate = AdmissionGate("test", limit=1, max_queue=2, timeout=1.0)
+    await gate.acquire()
+
+    order = []
+
+    async def waiter(name):
+        await gate.acquire()
+        order.append(name)
+
+    tasks = [asyncio.create_task(waiter(name)) for name in ("first", "second")]
+    await asyncio.sleep(0)
+    assert gate.queue_depth == 2
+
+    gate.release()
+    await asyncio.sleep(0)
+    gate.release()
+    await asyncio.gather(*tasks)
+    assert order == ["first", "second"]
+    assert gate.in_flight == 1
+    gate.release()
+    assert gate.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_gate_rejects_when_queue_full_or_timed_out():
+    """Test overload is reported instead of waiting indefinitely."""
+    gate = AdmissionGate("test", limit=1, max_queue=1, timeout=0.05)
+    await gate.acquire()
+
+    queued = asyncio.create_task(gate.acquire())
+    await asyncio.sleep(0)
+    with pytest.raises(Overloaded) as full:
+        await gate.acquire()
+    assert full.value.reason == "queue_full"
+
+    with pytest.raises(Overloaded) as timed_out:
+        await queued
+    assert timed_out.value.reason == "timeout"
+    assert gate.queue_depth == 0
+    assert gate.rejected == 2
+    assert gate.in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_middleware_returns_503_with_retry_after():
+    """Test a write beyond the limit and queue gets a fast 503 while reads pass."""
+    release = asyncio.Event()
+
+    async def slow_write(request):
+        await release.wait()
+        return JSONResponse({"ok": True})
+
+    async def read(request):
+        return JSONResponse({"ok": True})
+
+    controller = AdmissionController(
+        read=AdmissionGate("read", limit=4, max_queue=4, timeout=1.0),
+        write=AdmissionGate("write", limit=1, max_queue=0, timeout=1.0),
+    )
+    app = Starlette(routes=[
+        Route("/api/write", slow_write, methods=["POST"]),
+        Route("/api/read", read),
+    ])
+    app.add_middleware(AdmissionControlMiddleware, controller=controller)
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        first = asyncio.create_task(client.post("/api/write"))
+        while controller.write.in_flight == 0:
+            await asyncio.sleep(0)
+
+        rejected = await client.post("/api/write")
+        assert rejected.status_code == 503
+        assert rejected.headers["retry-after"] == "1"
+        assert rejected.json()["reason"] == "queue_full"
+
+        assert (await client.get("/api/read")).status_code == 200
+
+        release.set()
+        assert (await first).status_code == 200
+
+    assert controller.snapshot()["write"] == {
+        "limit": 1, "in_flight": 0, "queued": 0, "max_queue": 0, "rejected": 1,
+    }
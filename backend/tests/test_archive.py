@@ -0,0 +1,93 @@
+"""Tests for hot/cold session archival."""
+from datetime import datetime, timedelta
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from src.models.pomodoro import (
+    ArchivedPomodoroSession,
+    PomodoroSession,
+    SessionStatus,
+    SessionType,
+)
+from src.services.archive import archive_user_sessions
+from src.services.timeseries import timeseries_cache
+
+
+async def seed(test_db, task_id: int):
+    """Old finished sessions, one stale active session and recent sessions."""
+    now = datetime.utcnow()
+    rows = [
+        (now - timedelta(days=100), SessionType.WORK, SessionStatus.COMPLETED, 1500, 0),
+        (now - timedelta(days=90), SessionType.SHORT_BREAK, SessionStatus.COMPLETED, 300, 0),
+        (now - timedelta(days=80), SessionType.WORK, SessionStatus.INTERRUPTED, 700, 2),
+        (now - timedelta(days=70), SessionType.WORK, SessionStatus.ACTIVE, None, 0),
+        (now - timedelta(days=2), SessionType.WORK, SessionStatus.COMPLETED, 1500, 1),
+        (now - timedelta(hours=1), SessionType.LONG_BREAK, SessionStatus.COMPLETED, 900, 0),
+    ]
+    for started_at, session_type, status, duration, interruptions in rows:
+        test_db.add(PomodoroSession(
+            session_type=session_type,
+            status=status,
+            planned_duration=1500,
+            actual_duration=duration,
+            started_at=started_at,
+            ended_at=started_at + timedelta(seconds=duration or 0),
+            interruptions=interruptions,
+            task_id=task_id,
+        ))
+    await test_db.commit()
+
+
+async def count(test_db, model) -> int:
+    return (await test_db.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_archive_moves_old_sessions_in_batches(client: AsyncClient, test_db):
+    """Test finished sessions past the cutoff move in batches; active ones stay."""
+    await seed(test_db, None)
+
+    archived = await archive_user_sessions(
+        test_db, "default", datetime.utcnow() - timedelta(days=30), batch_size=2, pause=0
+    )
+
+    assert archived == 3
+    assert await count(test_db, ArchivedPomodoroSession) == 3
+    assert await count(test_db, PomodoroSession) == 3
+
+
+@pytest.mark.asyncio
+async def test_reads_are_unchanged_by_archival(client: AsyncClient, test_db):
+    """Test stats, listings, lookups, timeseries and counters see archived data."""
+    task = (await client.post("/api/tasks", json={"title": "Long running"})).json()
+    await seed(test_db, task["id"])
+    await client.post("/api/admin/repair/task-counters")
+
+    since = (datetime.utcnow() - timedelta(days=120)).date().isoformat()
+    urls = [
+        "/api/pomodoro/stats",
+        "/api/pomodoro/sessions",
+        "/api/pomodoro/sessions?limit=2",
+        "/api/pomodoro/sessions?status=completed",
+        "/api/pomodoro/sessions?status=interrupted",
+        f"/api/pomodoro/sessions?task_id={task['id']}&skip=2&limit=3",
+        f"/api/pomodoro/stats/timeseries?bucket=month&from={since}",
+        f"/api/tasks/{task['id']}",
+    ]
+    before = [(await client.get(url)).json() for url in urls]
+    oldest_id = before[1]["sessions"][-1]["id"]
+
+    response = await client.post("/api/admin/archive/sessions?older_than_days=30")
+    assert response.json()["archived"] == 3
+    timeseries_cache.clear()
+
+    after = [(await client.get(url)).json() for url in urls]
+    assert after == before
+
+    response = await client.get(f"/api/pomodoro/sessions/{oldest_id}")
+    assert response.status_code == 200
+    assert response.json()["actual_duration"] == 1500
+
+    response = await client.post("/api/admin/repair/task-counters")
+    assert response.json() == {"repaired": 0}
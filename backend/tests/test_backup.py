@@ -0,0 +1,108 @@
+"""Tests for online database backups."""
+import gzip
+import os
+import sqlite3
+import threading
+import pytest
+from httpx import AsyncClient
+
+from src.core.config import settings
+from src.services.backup import BackupService, backup_file, list_backups
+
+
+@pytest.fixture
+def live_db(tmp_path, monkeypatch):
+    """A file database with some rows, configured as the app database."""
+    path = tmp_path / "focus.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)")
+    conn.executemany("INSERT INTO notes (body) VALUES (?)", [("x" * 500,)] * 2000)
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(settings, "database_url", f"sqlite+aiosqlite:///{path}")
+    monkeypatch.setattr(settings, "backup_dir", str(tmp_path / "backups"))
+    monkeypatch.setattr(settings, "backup_retention", 2)
+    monkeypatch.setattr(settings, "backup_pages_per_step", 8)
+    monkeypatch.setattr(settings, "backup_step_sleep", 0)
+    return path
+
+
+def restore(path: str, tmp_path) -> sqlite3.Connection:
+    """Decompress a backup file and open it."""
+    restored = tmp_path / "restored.db"
+    with gzip.open(path, "rb") as compressed, open(restored, "wb") as raw:
+        raw.write(compressed.read())
+    return sqlite3.connect(restored)
+
+
+@pytest.mark.asyncio
+async def test_backup_copies_and_compresses(live_db, tmp_path):
+    """Test a backup run produces a checked, restorable gzip copy."""
+    result = await BackupService().run()
+
+    assert result.files == ["focus.db.gz"]
+    backup_path = os.path.join(result.path, "focus.db.gz")
+    assert result.bytes == os.path.getsize(backup_path)
+    assert result.bytes < os.path.getsize(live_db)
+
+    conn = restore(backup_path, tmp_path)
+    assert conn.execute("SELECT count(*) FROM notes").fetchone()[0] == 2000
+    assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    conn.close()
+
+
+def test_backup_finishes_under_concurrent_writes(live_db, tmp_path):
+    """Test writes that keep restarting a stepped backup do not stop it finishing."""
+    writer = sqlite3.connect(live_db, check_same_thread=False)
+    writer.execute("PRAGMA journal_mode=WAL")
+    stop = threading.Event()
+
+    def write():
+        while not stop.is_set():
+            writer.execute("INSERT INTO notes (body) VALUES ('y')")
+            writer.commit()
+            stop.wait(0.002)
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    try:
+        target = str(tmp_path / "focus.db.gz")
+        backup_file(str(live_db), target, pages_per_step=8, step_sleep=0.005, max_restarts=2)
+    finally:
+        stop.set()
+        thread.join()
+        writer.close()
+
+    conn = restore(target, tmp_path)
+    assert conn.execute("SELECT count(*) FROM notes").fetchone()[0] >= 2000
+    assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    conn.close()
+
+
+@pytest.mark.asyncio
+async def test_backups_are_rotated(live_db):
+    """Test only the newest runs within the retention are kept."""
+    service = BackupService()
+    results = [await service.run() for _ in range(3)]
+
+    assert list_backups() == [result.path for result in results[1:]]
+    assert not any(name.endswith(".partial") for name in os.listdir(settings.backup_dir))
+
+
+@pytest.mark.asyncio
+async def test_backup_endpoints_and_metrics(client: AsyncClient, live_db):
+    """Test backups can be triggered and listed, and report metrics."""
+    response = await client.post("/api/admin/backups")
+    assert response.status_code == 201
+    data = response.json()
+    assert data["files"] == ["focus.db.gz"]
+    assert data["bytes"] > 0
+
+    response = await client.get("/api/admin/backups")
+    assert response.json()["backups"][0]["name"] == data["name"]
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert 'focus_agent_backups_total{result="success"}' in response.text
+    assert "focus_agent_backup_last_size_bytes" in response.text
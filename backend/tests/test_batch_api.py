@@ -0,0 +1,100 @@
+"""Tests for the request batch endpoint."""
+import pytest
+from httpx import AsyncClient
+
+from src.api import batch
+from src.core.coalescing import request_coalescer
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_requests_in_order_with_references(client: AsyncClient):
+    """Test sub-requests run in order and can use earlier results."""
+    response = await client.post("/api/batch", json={"requests": [
+        {"method": "POST", "path": "/api/tasks", "body": {"title": "Write report"}},
+        {"method": "POST", "path": "/api/pomodoro/sessions",
+         "body": {"session_type": "work", "planned_duration": 1500, "task_id": "${0.id}"}},
+        {"method": "POST", "path": "/api/pomodoro/sessions/${1.id}/complete"},
+        {"method": "PATCH", "path": "/api/tasks/${0.id}", "body": {"title": "Report for ${0.id}"}},
+        {"method": "GET", "path": "/api/pomodoro/stats"},
+    ]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["committed"] is True
+    assert [r["status"] for r in data["responses"]] == [201, 201, 200, 200, 200]
+
+    task_id = data["responses"][0]["body"]["id"]
+    assert data["responses"][1]["body"]["task_id"] == task_id
+    assert data["responses"][2]["body"]["status"] == "completed"
+    assert data["responses"][3]["body"]["title"] == f"Report for {task_id}"
+    assert data["responses"][4]["body"]["completed_sessions"] == 1
+
+    task = (await client.get(f"/api/tasks/{task_id}")).json()
+    assert task["title"] == f"Report for {task_id}"
+
+
+@pytest.mark.asyncio
+async def test_atomic_batch_rolls_back_on_failure(client: AsyncClient):
+    """Test a failing sub-request undoes the whole atomic batch."""
+    response = await client.post("/api/batch", json={"atomic": True, "requests": [
+        {"method": "POST", "path": "/api/tasks", "body": {"title": "Never saved"}},
+        {"method": "PATCH", "path": "/api/tasks/99999", "body": {"title": "Missing"}},
+        {"method": "GET", "path": "/api/tasks"},
+    ]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["committed"] is False
+    assert [r["status"] for r in data["responses"]] == [201, 404, 424]
+
+    assert (await client.get("/api/tasks")).json()["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_non_atomic_batch_keeps_earlier_writes(client: AsyncClient):
+    """Test later failures do not undo committed sub-requests."""
+    response = await client.post("/api/batch", json={"requests": [
+        {"method": "POST", "path": "/api/tasks", "body": {"title": "Saved"}},
+        {"method": "POST", "path": "/api/tasks", "body": {"title": ""}},
+        {"method": "PATCH", "path": "/api/tasks/${1.id}", "body": {"title": "Depends on failure"}},
+        {"method": "GET", "path": "/api/tasks", "query": {"status": "todo"}},
+    ]})
+    data = response.json()
+    assert data["committed"] is True
+    assert [r["status"] for r in data["responses"]] == [201, 422, 424, 200]
+    assert data["responses"][3]["body"]["total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_other_routes(client: AsyncClient):
+    """Test only task and Pomodoro routes can be batched."""
+    response = await client.post("/api/batch", json={"requests": [
+        {"method": "POST", "path": "/api/admin/repair/task-counters"},
+    ]})
+    assert response.status_code == 422
+
+    response = await client.post("/api/batch", json={"requests": []})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_batched_write_starts_a_new_coalesced_flight(client: AsyncClient, monkeypatch):
+    """Test a read arriving after a batched write does not join an older flight."""
+    key = ("default", "/api/pomodoro/stats", "")
+    dispatch = batch._dispatch
+    joined = []
+
+    async def observe(request, user_id, method, path, query, body):
+        # A coalesced stats read arriving before each sub-request runs
+        joined.append(request_coalescer.join(key, user_id))
+        return await dispatch(request, user_id, method, path, query, body)
+
+    monkeypatch.setattr(batch, "_dispatch", observe)
+    response = await client.post("/api/batch", json={"requests": [
+        {"method": "POST", "path": "/api/tasks", "body": {"title": "Write report"}},
+        {"method": "GET", "path": "/api/tasks"},
+    ]})
+    assert response.json()["committed"] is True
+
+    (before, _), (after, leader) = joined
+    assert leader and after is not before
+    for flight, _ in joined:
+        request_coalescer.finish(key, flight)
@@ -0,0 +1,112 @@
+"""Tests for coalescing identical concurrent GET requests."""
+import asyncio
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from src.core.coalescing import CoalescingMiddleware, RequestCoalescer
+
+
+def make_app(max_age: float = 5.0):
+    """App whose /api/stats blocks until released and counts computations."""
+    state = {"calls": 0, "value": 0, "release": asyncio.Event()}
+
+    async def stats(request):
+        state["calls"] += 1
+        value = state["value"]
+        await state["release"].wait()
+        return JSONResponse({"value": value, "query": dict(request.query_params)})
+
+    async def write(request):
+        state["value"] += 1
+        return JSONResponse({"value": state["value"]})
+
+    app = Starlette(routes=[
+        Route("/api/stats", stats),
+        Route("/api/write", write, methods=["POST"]),
+    ])
+    coalescer = RequestCoalescer(["/api/stats"], max_age=max_age)
+    app.add_middleware(CoalescingMiddleware, coalescer=coalescer)
+    return app, state
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_share_one_computation():
+    """Test concurrent identical GETs run the handler once."""
+    app, state = make_app()
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        requests = [
+            asyncio.create_task(client.get("/api/stats?a=1&b=2")),
+            asyncio.create_task(client.get("/api/stats?b=2&a=1")),
+            asyncio.create_task(client.get("/api/stats?a=1&b=2")),
+            asyncio.create_task(client.get("/api/stats?a=1&b=2", headers={"X-User-ID": "other"})),
+        ]
+        await _settle()
+        state["release"].set()
+        responses = await asyncio.gather(*requests)
+
+    assert [r.status_code for r in responses] == [200] * 4
+    assert responses[0].json() == responses[1].json() == {"value": 0, "query": {"a": "1", "b": "2"}}
+    # One flight for the default user, one for the other user
+    assert state["calls"] == 2
+
+
+@pytest.mark.asyncio
+async def test_write_starts_a_new_flight():
+    """Test a read arriving after a write does not get an older response."""
+    app, state = make_app()
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        before = asyncio.create_task(client.get("/api/stats"))
+        await _settle()
+        assert (await client.post("/api/write")).json() == {"value": 1}
+
+        after = asyncio.create_task(client.get("/api/stats"))
+        await _settle()
+        state["release"].set()
+
+        assert (await before).json()["value"] == 0
+        assert (await after).json()["value"] == 1
+    assert state["calls"] == 2
+
+
+@pytest.mark.asyncio
+async def test_old_flights_are_not_joined():
+    """Test requests stop joining a flight after the coalescing window."""
+    app, state = make_app(max_age=0.0)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        first = asyncio.create_task(client.get("/api/stats"))
+        await _settle()
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(client.get("/api/stats"))
+        await _settle()
+        state["release"].set()
+        await asyncio.gather(first, second)
+    assert state["calls"] == 2
+
+
+@pytest.mark.asyncio
+async def test_outer_middleware_edits_each_response_separately():
+    """Test CORS headers added to shared responses do not pile up."""
+    app, state = make_app()
+    app.add_middleware(CORSMiddleware, allow_origins=["http://a.test", "http://b.test"])
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        requests = [
+            asyncio.create_task(client.get("/api/stats", headers={"Origin": origin}))
+            for origin in ("http://a.test", "http://b.test", "http://a.test")
+        ]
+        await _settle()
+        state["release"].set()
+        responses = await asyncio.gather(*requests)
+
+    assert state["calls"] == 1
+    for response, origin in zip(responses, ("http://a.test", "http://b.test", "http://a.test")):
+        assert response.headers.get_list("vary") == ["Origin"]
+        assert response.headers["access-control-allow-origin"] == origin
@@ -0,0 +1,125 @@
+"""Tests for writing completed sessions back to Obsidian daily notes."""
+import asyncio
+from contextlib import asynccontextmanager
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.models.obsidian import ObsidianOutbox
+from src.services.daily_notes import DailyNoteWriter, merge_lines
+
+
+def test_merge_lines_appends_under_heading_once():
+    """Test lines go into the heading's section and are never duplicated."""
+    note = (
+        "# Monday\n\n## Focus sessions\n- 09:00-09:25 Focus (25 min) ^focus-1\n"
+        "\n## Journal\nText\n"
+    )
+    merged = merge_lines(note, [
+        "- 09:00-09:25 Focus (25 min) ^focus-1",
+        "- 10:00-10:25 Focus (25 min) ^focus-2",
+    ], "## Focus sessions")
+    assert merged == (
+        "# Monday\n\n## Focus sessions\n- 09:00-09:25 Focus (25 min) ^focus-1\n"
+        "- 10:00-10:25 Focus (25 min) ^focus-2\n\n## Journal\nText\n"
+    )
+    again = merge_lines(merged, ["- 10:00-10:25 Focus (25 min) ^focus-2"], "## Focus sessions")
+    assert again == merged
+
+    assert merge_lines("", ["- a ^focus-3"], "## Focus sessions") == (
+        "## Focus sessions\n- a ^focus-3\n"
+    )
+    assert merge_lines("Intro", ["- a ^focus-3"], "## Focus sessions") == (
+        "Intro\n\n## Focus sessions\n- a ^focus-3\n"
+    )
+
+
+def test_merge_lines_matches_exact_block_ids():
+    """Test a block id that prefixes one already in the note is still added."""
+    note = "## Focus sessions\n- 09:00-09:25 Focus (25 min) ^focus-12\n"
+    assert merge_lines(note, ["- 10:00-10:25 Focus (25 min) ^focus-1"], "## Focus sessions") == (
+        "## Focus sessions\n- 09:00-09:25 Focus (25 min) ^focus-12\n"
+        "- 10:00-10:25 Focus (25 min) ^focus-1\n"
+    )
+
+
+@pytest.mark.asyncio
+async def test_writer_is_notified_after_commit(
+    client: AsyncClient, test_db: AsyncSession, monkeypatch
+):
+    """Test the writer only wakes for completions whose transaction committed."""
+    monkeypatch.setattr(settings, "obsidian_sync_enabled", True)
+    notified = []
+    monkeypatch.setattr(
+        "src.services.daily_notes.daily_note_writer.notify",
+        lambda: notified.append(test_db.in_transaction()),
+    )
+
+    session = (await client.post("/api/pomodoro/sessions", json={
+        "session_type": "work", "planned_duration": 1500,
+    })).json()
+    await client.post(f"/api/pomodoro/sessions/{session['id']}/complete")
+    assert notified == [False]
+
+    # A completion rolled back with its batch never notifies
+    session = (await client.post("/api/pomodoro/sessions", json={
+        "session_type": "work", "planned_duration": 1500,
+    })).json()
+    response = await client.post("/api/batch", json={"atomic": True, "requests": [
+        {"method": "POST", "path": f"/api/pomodoro/sessions/{session['id']}/complete"},
+        {"method": "GET", "path": "/api/tasks/999999"},
+    ]})
+    assert response.json()["committed"] is False
+    assert notified == [False]
+
+
+@pytest.mark.asyncio
+async def test_completed_sessions_are_written_back(
+    client: AsyncClient, test_db: AsyncSession, tmp_path, monkeypatch
+):
+    """Test completions are queued in the outbox and written in one debounced pass."""
+    monkeypatch.setattr(settings, "obsidian_sync_enabled", True)
+    monkeypatch.setattr(settings, "obsidian_daily_notes_folder", "Daily")
+
+    @asynccontextmanager
+    async def factory():
+        yield test_db
+
+    writer = DailyNoteWriter(factory, root=str(tmp_path), debounce=0.05)
+    monkeypatch.setattr("src.services.daily_notes.daily_note_writer", writer)
+
+    task = (await client.post("/api/tasks", json={"title": "Write report"})).json()
+    ids = []
+    for _ in range(3):
+        session = (await client.post("/api/pomodoro/sessions", json={
+            "session_type": "work", "planned_duration": 1500, "task_id": task["id"],
+        })).json()
+        await client.post(f"/api/pomodoro/sessions/{session['id']}/complete")
+        ids.append(session["id"])
+
+    queued = (await test_db.execute(select(ObsidianOutbox))).scalars().all()
+    assert [row.session_id for row in queued] == ids
+    assert not (tmp_path / "Daily").exists()
+
+    monkeypatch.setattr(settings, "obsidian_writeback_retry", 0.05)
+    writer.start()
+    try:
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if writer.notes_written:
+                break
+    finally:
+        await writer.stop()
+
+    assert writer.notes_written == 1
+    [note] = list((tmp_path / "Daily").iterdir())
+    content = note.read_text()
+    assert content.startswith("## Focus sessions\n")
+    assert [f"^focus-{i}" in content for i in ids] == [True] * 3
+    assert "Write report" in content
+    assert (await test_db.execute(select(ObsidianOutbox))).scalars().all() == []
+
+    # Replaying the same lines does not change the note
+    assert await writer.flush(test_db) == 0
@@ -0,0 +1,302 @@
+"""Tests for database routing and schema migrations."""
+import asyncio
+import os
+import sqlite3
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core import database
+from src.core.config import settings
+from src.core.database import Base, ShardRouter
+from src.core.migrations import LATEST_VERSION, prepare_schema
+from src.models.pomodoro import ArchivedPomodoroSession, PomodoroSession, SessionStatus, SessionType
+from src.models.task import Task, TaskStatus
+from src.services.archive import SessionArchiver
+
+
+@pytest.mark.asyncio
+async def test_shard_router_uses_one_file_per_user(tmp_path):
+    """Test each user's data lands in their own shard file."""
+    router = ShardRouter(str(tmp_path), max_open=4)
+
+    for user_id in ("alice", "bob"):
+        shard = await router.acquire(user_id)
+        async with shard.session_maker() as session:
+            session.add(Task(title=f"{user_id} task", user_id=user_id))
+            await session.commit()
+        router.release(shard)
+
+    assert os.path.exists(router.shard_path("alice"))
+    assert os.path.exists(router.shard_path("bob"))
+
+    shard = await router.acquire("alice")
+    async with shard.session_maker() as session:
+        titles = (await session.execute(select(Task.title))).scalars().all()
+    router.release(shard)
+    assert titles == ["alice task"]
+
+    await router.close()
+
+
+@pytest.mark.asyncio
+async def test_shard_router_evicts_least_recently_used(tmp_path):
+    """Test the engine LRU is trimmed, skipping shards still in use."""
+    router = ShardRouter(str(tmp_path), max_open=2)
+
+    busy = await router.acquire("a")
+    for user_id in ("b", "c"):
+        router.release(await router.acquire(user_id))
+
+    # "a" is the LRU entry but still in use, so "b" is evicted instead
+    assert router.open_shards == ["a", "c"]
+
+    router.release(busy)
+    router.release(await router.acquire("d"))
+    assert router.open_shards == ["c", "d"]
+
+    await router.close()
+
+
+@pytest.mark.asyncio
+async def test_shard_router_evicts_idle_engines(tmp_path):
+    """Test engines idle past the timeout are disposed."""
+    router = ShardRouter(str(tmp_path), idle_timeout=0)
+    router.release(await router.acquire("alice"))
+
+    await router.evict_idle()
+    assert router.open_shards == []
+
+
+@pytest.mark.asyncio
+async def test_opening_a_shard_only_blocks_its_user(tmp_path, monkeypatch):
+    """Test a slow shard open delays neither other users nor opens twice."""
+    router = ShardRouter(str(tmp_path))
+    gate = asyncio.Event()
+    opened = []
+    open_shard = router._open
+
+    async def slow_open(user_id):
+        opened.append(user_id)
+        if user_id == "slow":
+            await gate.wait()
+        return await open_shard(user_id)
+
+    monkeypatch.setattr(router, "_open", slow_open)
+    waiting = [asyncio.create_task(router.acquire("slow")) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    router.release(await asyncio.wait_for(router.acquire("fast"), timeout=5))
+    assert not any(task.done() for task in waiting)
+
+    gate.set()
+    first, second = await asyncio.gather(*waiting)
+    assert first is second and first.active == 2
+    assert opened == ["slow", "fast"]
+    await router.close()
+
+
+@pytest.mark.asyncio
+async def test_background_services_cover_every_shard(tmp_path, monkeypatch):
+    """Test the archiver reaches sessions in the main database and in each user shard."""
+    main_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'main.db'}")
+    async with main_engine.begin() as conn:
+        await conn.run_sync(prepare_schema)
+    router = ShardRouter(str(tmp_path / "shards"))
+    monkeypatch.setattr(settings, "db_sharding_enabled", True)
+    monkeypatch.setattr(database, "shard_router", router)
+    monkeypatch.setattr(
+        database, "async_session_maker", async_sessionmaker(main_engine, class_=AsyncSession)
+    )
+
+    old = datetime.utcnow() - timedelta(days=90)
+    for user_id in ("default", "alice", "bob"):
+        async with database.user_session(user_id) as session:
+            session.add(PomodoroSession(
+                user_id=user_id, session_type=SessionType.WORK, status=SessionStatus.COMPLETED,
+                planned_duration=1500, actual_duration=1500, started_at=old,
+            ))
+            await session.commit()
+
+    assert await SessionArchiver().run_once(datetime.utcnow() - timedelta(days=30)) == 3
+    for user_id in ("alice", "bob"):
+        async with database.user_session(user_id) as session:
+            archived = (await session.execute(
+                select(func.count()).select_from(ArchivedPomodoroSession)
+            )).scalar_one()
+        assert archived == 1
+    await router.close()
+    await main_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_migrations_upgrade_existing_database(tmp_path):
+    """Test a database from before partitioning gains the owner column."""
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE tasks (id INTEGER PRIMARY KEY, title VARCHAR(255) NOT NULL, "
+        "description VARCHAR, status VARCHAR(11) NOT NULL, priority VARCHAR(6) NOT NULL, "
+        "estimated_pomodoros INTEGER NOT NULL, completed_pomodoros INTEGER NOT NULL, "
+        "created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL, completed_at DATETIME, "
+        "github_issue_url VARCHAR, tags VARCHAR)"
+    )
+    conn.execute(
+        "INSERT INTO tasks VALUES (1, 'Legacy', NULL, 'TODO', 'MEDIUM', 1, 0, "
+        "'2026-01-01 00:00:00', '2026-01-01 00:00:00', NULL, NULL, '[\"Work\", \"home\"]')"
+    )
+    conn.commit()
+    conn.close()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(prepare_schema)
+    await engine.dispose()
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT user_id FROM tasks").fetchall() == [("default",)]
+    assert conn.execute(
+        "SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'legacy'"
+    ).fetchall() == [(1,)]
+    assert conn.execute(
+        "SELECT tags.name FROM task_tags JOIN tags ON tags.id = task_tags.tag_id "
+        "WHERE task_tags.task_id = 1 ORDER BY tags.name"
+    ).fetchall() == [("home",), ("work",)]
+    assert conn.execute(
+        "SELECT priority_rank, queue_score FROM tasks"
+    ).fetchall() == [(2, 298)]
+    assert conn.execute("SELECT row_version FROM tasks").fetchall() == [(1,)]
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == LATEST_VERSION
+    conn.close()
+
+
+@pytest.mark.asyncio
+async def test_migration_stores_timestamps_and_enums_as_integers(tmp_path):
+    """Test text timestamps and enum names are rebuilt into integer columns."""
+    path = tmp_path / "text.db"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE tasks (id INTEGER PRIMARY KEY, title VARCHAR(255) NOT NULL, "
+        "description VARCHAR, status VARCHAR(11) NOT NULL, priority VARCHAR(6) NOT NULL, "
+        "estimated_pomodoros INTEGER NOT NULL, completed_pomodoros INTEGER NOT NULL, "
+        "created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL, completed_at DATETIME, "
+        "github_issue_url VARCHAR, tags VARCHAR)"
+    )
+    conn.execute(
+        "CREATE TABLE pomodoro_sessions (id INTEGER PRIMARY KEY, "
+        "session_type VARCHAR(11) NOT NULL, "
+        "status VARCHAR(11) NOT NULL, planned_duration INTEGER NOT NULL, actual_duration INTEGER, "
+        "started_at DATETIME NOT NULL, ended_at DATETIME, task_id INTEGER REFERENCES tasks (id), "
+        "session_number INTEGER NOT NULL, notes VARCHAR, interruptions INTEGER NOT NULL, "
+        "row_version INTEGER NOT NULL DEFAULT 0)"
+    )
+    conn.execute(
+        "CREATE TABLE pomodoro_daily_totals (user_id VARCHAR(64) NOT NULL, day DATE NOT NULL, "
+        "work_seconds INTEGER NOT NULL, sessions INTEGER NOT NULL, PRIMARY KEY (user_id, day))"
+    )
+    conn.execute("INSERT INTO pomodoro_daily_totals VALUES ('default', '2026-01-01', 60, 1)")
+    conn.execute(
+        "INSERT INTO tasks VALUES (1, 'Legacy', NULL, 'IN_PROGRESS', 'HIGH', 2, 1, "
+        "'2026-01-01 00:00:00', '2026-01-01 08:30:00.250000', NULL, NULL, NULL)"
+    )
+    conn.execute(
+        "INSERT INTO pomodoro_sessions VALUES (1, 'WORK', 'COMPLETED', 1500, 1500, "
+        "'2026-01-02 09:00:00', '2026-01-02 09:25:00', 1, 1, NULL, 0, 0)"
+    )
+    conn.commit()
+    conn.close()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(prepare_schema)
+
+    conn = sqlite3.connect(path)
+    assert conn.execute(
+        "SELECT typeof(status), status, priority, created_at, updated_at FROM tasks"
+    ).fetchall() == [("integer", 1, 2, 1767225600000000, 1767256200250000)]
+    assert conn.execute(
+        "SELECT session_type, status, started_at, day FROM pomodoro_sessions"
+    ).fetchall() == [(0, 1, 1767344400000000, 20455)]
+    # Derived data was recomputed from the converted rows
+    assert conn.execute(
+        "SELECT typeof(day), day, work_seconds FROM pomodoro_daily_totals"
+    ).fetchall() == [("integer", 20455, 1500)]
+    assert conn.execute("SELECT total_focus_seconds, last_worked_at FROM tasks").fetchall() == [
+        (1500, 1767345900000000)
+    ]
+    conn.close()
+
+    # The ORM reads the same values as before, and the recreated triggers fire
+    async with engine.begin() as conn:
+        task = (await conn.execute(select(Task))).one()
+        assert task.created_at == datetime(2026, 1, 1)
+        assert task.updated_at == datetime(2026, 1, 1, 8, 30, 0, 250000)
+        assert task.status == TaskStatus.IN_PROGRESS
+        await conn.execute(Task.__table__.update().values(title="Renamed"))
+        assert (await conn.execute(
+            select(Task.row_version).where(Task.status == TaskStatus.IN_PROGRESS)
+        )).scalar_one() > task.row_version
+        assert (await conn.execute(
+            text("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'renamed'")
+        )).all() == [(1,)]
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_migration_adds_indexed_session_day(tmp_path, monkeypatch):
+    """Test sessions gain their local day in the stats timezone, with its index."""
+    monkeypatch.setattr(settings, "stats_timezone", "America/New_York")
+    path = tmp_path / "v10.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for table in ("pomodoro_sessions", "pomodoro_sessions_archive"):
+            await conn.execute(text(f"DROP INDEX ix_{table}_user_day"))
+            await conn.execute(text(f"ALTER TABLE {table} DROP COLUMN day"))
+        # 2026-01-02 03:00 UTC is still January 1 in New York
+        await conn.execute(text(
+            "INSERT INTO pomodoro_sessions (id, user_id, session_type, status, planned_duration, "
+            "started_at, session_number, interruptions) "
+            "VALUES (1, 'default', 0, 1, 1500, 1767322800000000, 1, 0)"
+        ))
+        await conn.execute(text("PRAGMA user_version = 10"))
+
+    async with engine.begin() as conn:
+        await conn.run_sync(prepare_schema)
+        assert (await conn.execute(text("SELECT day FROM pomodoro_sessions"))).all() == [(20454,)]
+        plan = (await conn.execute(text(
+            "EXPLAIN QUERY PLAN SELECT count(DISTINCT day) FROM pomodoro_sessions "
+            "WHERE user_id = 'default' AND day >= 20450"
+        ))).all()
+        assert "ix_pomodoro_sessions_user_day" in plan[0][-1]
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_migration_fills_daily_timeseries_totals(tmp_path):
+    """Test daily totals gain the break and outcome fields, derived from the sessions."""
+    path = tmp_path / "v12.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for column in (
+            "break_seconds", "completed_sessions", "interrupted_sessions", "interruptions",
+        ):
+            await conn.execute(text(f"ALTER TABLE pomodoro_daily_totals DROP COLUMN {column}"))
+        # A short break and an interrupted work session on 2026-01-02 (day 20455)
+        await conn.execute(text(
+            "INSERT INTO pomodoro_sessions (user_id, session_type, status, planned_duration, "
+            "actual_duration, started_at, day, session_number, interruptions) VALUES "
+            "('default', 1, 1, 300, 300, 1767344400000000, 20455, 1, 0), "
+            "('default', 0, 2, 1500, 600, 1767348000000000, 20455, 2, 3)"
+        ))
+        await conn.execute(text("PRAGMA user_version = 12"))
+
+    async with engine.begin() as conn:
+        await conn.run_sync(prepare_schema)
+        assert (await conn.execute(text(
+            "SELECT work_seconds, break_seconds, sessions, completed_sessions, "
+            "interrupted_sessions, interruptions FROM pomodoro_daily_totals"
+        ))).all() == [(600, 300, 2, 1, 1, 3)]
+    await engine.dispose()
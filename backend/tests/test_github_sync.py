@@ -0,0 +1,221 @@
+"""Tests for the GitHub issue sync, against a local stub of the GitHub API."""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.services.github_sync import GithubSync, parse_issue_url
+
+
+class StubGithub:
+    """Threaded HTTP server answering issue requests like the GitHub API."""
+
+    def __init__(self, remaining=5000, delay=0.0):
+        self.issues = {}
+        self.requests = []
+        self.remaining = remaining
+        self.reset_at = int(time.time()) + 3600
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def set_issue(self, repo, number, state, updated_at):
+        self.issues[(repo, number)] = {
+            "number": number, "title": f"Issue {number}", "state": state, "updated_at": updated_at,
+        }
+
+    def handle(self, request):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        try:
+            url = urlparse(request.path)
+            parts = url.path.strip("/").split("/")
+            repo = f"{parts[1]}/{parts[2]}"
+            if len(parts) == 5:
+                body = self.issues.get((repo, int(parts[4])))
+            else:
+                since = parse_qs(url.query)["since"][0]
+                body = sorted(
+                    (issue for (name, _), issue in self.issues.items()
+                     if name == repo and issue["updated_at"] >= since),
+                    key=lambda issue: issue["updated_at"],
+                )
+            payload = json.dumps(body).encode()
+            etag = f'"{hashlib.md5(payload).hexdigest()}"'
+            if body is None:
+                status = 404
+            elif request.headers.get("If-None-Match") == etag:
+                status = 304
+            else:
+                status = 200
+            with self.lock:
+                self.requests.append((request.path, status))
+                if status != 304:
+                    self.remaining -= 1
+                remaining = self.remaining
+
+            request.send_response(status)
+            request.send_header("ETag", etag)
+            request.send_header("X-RateLimit-Remaining", str(remaining))
+            request.send_header("X-RateLimit-Reset", str(self.reset_at))
+            request.send_header("Content-Type", "application/json")
+            request.send_header("Content-Length", "0" if status == 304 else str(len(payload)))
+            request.end_headers()
+            if status != 304:
+                request.wfile.write(payload)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def take_requests(self):
+        with self.lock:
+            requests, self.requests = self.requests, []
+        return requests
+
+
+@pytest.fixture
+def stub():
+    server = StubGithub()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def test_parse_issue_url():
+    """Test issue and pull request URLs map to a lowercased repo and number."""
+    assert parse_issue_url("https://github.com/Octo/Repo/issues/12") == ("octo/repo", 12)
+    assert parse_issue_url("https://github.com/octo/repo/pull/3#discussion") == ("octo/repo", 3)
+    assert parse_issue_url("https://gitlab.com/octo/repo/issues/1") is None
+
+
+@pytest.mark.asyncio
+async def test_sync_uses_conditional_and_batched_requests(
+    client: AsyncClient, test_db: AsyncSession, stub: StubGithub
+):
+    """Test issues are polled per repo, unchanged ones cost nothing and closing completes tasks."""
+    stub.set_issue("octo/app", 1, "open", "2024-01-01T00:00:00Z")
+    stub.set_issue("octo/app", 2, "closed", "2024-01-02T00:00:00Z")
+    stub.set_issue("octo/lib", 7, "open", "2024-01-03T00:00:00Z")
+    ids = {}
+    for repo, number in [("octo/app", 1), ("octo/app", 2), ("octo/lib", 7)]:
+        response = await client.post("/api/tasks", json={
+            "title": f"{repo}#{number}",
+            "github_issue_url": f"https://github.com/{repo}/issues/{number}",
+        })
+        ids[number] = response.json()["id"]
+    sync = GithubSync(base_url=stub.url)
+
+    async def status(number):
+        return (await client.get(f"/api/tasks/{ids[number]}")).json()["status"]
+
+    try:
+        # First pass: every issue once; the closed one completes its task
+        result = await sync.sync_once(test_db)
+        assert sorted(path for path, _ in stub.take_requests()) == [
+            "/repos/octo/app/issues/1", "/repos/octo/app/issues/2", "/repos/octo/lib/issues/7",
+        ]
+        assert result.tasks_updated == 1
+        assert [await status(n) for n in (1, 2, 7)] == ["todo", "completed", "todo"]
+
+        # Then one list request for octo/app, a conditional one for octo/lib
+        await sync.sync_once(test_db)
+        requests = stub.take_requests()
+        assert [path.split("?")[0] for path, _ in requests] == [
+            "/repos/octo/app/issues", "/repos/octo/lib/issues/7",
+        ]
+        assert "since=2024-01-02T00%3A00%3A00Z" in requests[0][0]
+        assert requests[1][1] == 304
+
+        # Nothing changed: every request is answered 304 and spends no budget
+        remaining = stub.remaining
+        result = await sync.sync_once(test_db)
+        assert [status for _, status in stub.take_requests()] == [304, 304]
+        assert result.not_modified == 2 and stub.remaining == remaining
+
+        # Closing an issue shows up in the repo's list
+        stub.set_issue("octo/app", 1, "closed", "2024-02-01T00:00:00Z")
+        result = await sync.sync_once(test_db)
+        assert result.issues_changed == 1 and result.tasks_updated == 1
+        assert await status(1) == "completed"
+
+        # Reopening reopens the task
+        stub.set_issue("octo/app", 1, "open", "2024-02-02T00:00:00Z")
+        await sync.sync_once(test_db)
+        assert await status(1) == "todo"
+    finally:
+        await sync.stop()
+
+
+@pytest.mark.asyncio
+async def test_sync_bounds_concurrency_and_respects_rate_limit(
+    client: AsyncClient, test_db: AsyncSession, stub: StubGithub, monkeypatch
+):
+    """Test requests stay within the concurrency limit and stop at the reserve."""
+    monkeypatch.setattr(settings, "github_rate_limit_reserve", 100)
+    stub.delay = 0.05
+    stub.remaining = 106
+    for number in range(1, 13):
+        repo = f"octo/repo{number}"
+        stub.set_issue(repo, number, "open", "2024-01-01T00:00:00Z")
+        await client.post("/api/tasks", json={
+            "title": repo, "github_issue_url": f"https://github.com/{repo}/issues/{number}",
+        })
+    sync = GithubSync(base_url=stub.url, concurrency=3)
+
+    try:
+        result = await sync.sync_once(test_db)
+        assert stub.max_in_flight <= 3
+        # Requests still in flight count against the budget: 6 fit above the reserve
+        assert result.requests == 6
+        assert result.deferred == 6
+        assert sync.limiter.exhausted()
+        assert 3500 < sync.limiter.delay() <= 3600
+
+        # Once the window resets, the deferred repos go first
+        sync.limiter.reset_at = time.time() - 1
+        stub.remaining = 5000
+        stub.take_requests()
+        result = await sync.sync_once(test_db)
+        assert result.deferred == 0
+        first = {path for path, _ in stub.take_requests()[:6]}
+        assert first == {f"/repos/octo/repo{n}/issues/{n}" for n in range(7, 13)}
+    finally:
+        await sync.stop()
+
+
+@pytest.mark.asyncio
+async def test_github_sync_endpoint(client: AsyncClient, stub: StubGithub, monkeypatch):
+    """Test the admin endpoint runs a pass and returns its counts."""
+    stub.set_issue("octo/app", 5, "closed", "2024-01-01T00:00:00Z")
+    await client.post("/api/tasks", json={
+        "title": "Fix it", "github_issue_url": "https://github.com/octo/app/issues/5",
+    })
+    sync = GithubSync(base_url=stub.url)
+    monkeypatch.setattr("src.api.admin.github_sync", sync)
+    try:
+        response = await client.post("/api/admin/github/sync")
+    finally:
+        await sync.stop()
+    assert response.status_code == 200
+    assert response.json()["tasks_updated"] == 1
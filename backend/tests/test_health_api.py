@@ -0,0 +1,132 @@
+"""Tests for health check endpoints."""
+import asyncio
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import get_db
+from src.main import app
+from src.services import health_monitor as monitor_module
+from src.services.health_monitor import health_monitor
+
+
+class FakeRedis:
+    """Minimal stand-in for the pooled Redis client."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.pings = 0
+
+    async def ping(self):
+        self.pings += 1
+        await asyncio.sleep(self.delay)
+        return True
+
+
+@pytest.fixture(autouse=True)
+def reset_health_snapshot(test_db: AsyncSession, monkeypatch):
+    """Start every test without a cached health snapshot, checking the test database."""
+    monkeypatch.setattr(health_monitor, "session_factory", async_sessionmaker(test_db.bind))
+    health_monitor.snapshot = None
+    yield
+    health_monitor.snapshot = None
+
+
+@pytest.mark.asyncio
+async def test_detailed_health_reports_latency(client: AsyncClient, monkeypatch):
+    """Test every dependency check reports its status and latency."""
+    fake = FakeRedis()
+    monkeypatch.setattr(monitor_module, "get_redis", lambda: fake)
+
+    response = await client.get("/health/detailed")
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["status"] == "healthy"
+    assert data["source"] == "live"
+    assert data["checks"]["database"]["status"] == "up"
+    assert data["checks"]["redis"]["status"] == "up"
+    for check in data["checks"].values():
+        assert check["latency_ms"] >= 0
+    assert fake.pings == 1
+
+
+@pytest.mark.asyncio
+async def test_detailed_health_times_out_slow_dependency(client: AsyncClient, monkeypatch):
+    """Test a hanging dependency is reported down without stalling the probe."""
+    monkeypatch.setattr(monitor_module, "get_redis", lambda: FakeRedis(delay=5))
+    monkeypatch.setattr(settings, "health_check_redis_timeout", 0.05)
+
+    response = await client.get("/health/detailed")
+    data = response.json()
+
+    assert data["status"] == "degraded"
+    assert data["checks"]["redis"]["status"] == "down"
+    assert "timed out" in data["checks"]["redis"]["message"]
+    assert data["checks"]["redis"]["latency_ms"] < 1000
+    assert data["checks"]["database"]["status"] == "up"
+
+
+@pytest.mark.asyncio
+async def test_detailed_health_without_redis_client(client: AsyncClient, monkeypatch):
+    """Test a missing shared Redis client marks the service degraded."""
+    monkeypatch.setattr(monitor_module, "get_redis", lambda: None)
+
+    response = await client.get("/health/detailed")
+    data = response.json()
+
+    assert data["status"] == "degraded"
+    assert data["checks"]["redis"]["status"] == "down"
+
+
+@pytest.mark.asyncio
+async def test_probes_answer_from_snapshot(client: AsyncClient, monkeypatch):
+    """Test fresh snapshots are served without re-running the checks."""
+    fake = FakeRedis()
+    monkeypatch.setattr(monitor_module, "get_redis", lambda: fake)
+
+    response = await client.get("/ready")
+    assert response.json() == {"status": "ready"}
+    assert fake.pings == 1
+
+    response = await client.get("/ready")
+    assert response.json() == {"status": "ready"}
+    response = await client.get("/health/detailed")
+    assert response.json()["source"] == "cached"
+    assert fake.pings == 1
+
+    # Forcing a live check bypasses the snapshot
+    response = await client.get("/health/detailed?live=true")
+    assert response.json()["source"] == "live"
+    assert fake.pings == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_snapshot_triggers_live_check(client: AsyncClient, monkeypatch):
+    """Test snapshots older than the staleness bound are not served."""
+    fake = FakeRedis()
+    monkeypatch.setattr(monitor_module, "get_redis", lambda: fake)
+
+    await client.get("/ready")
+    health_monitor.snapshot.monotonic -= health_monitor.max_staleness + 1
+
+    response = await client.get("/health/detailed")
+    assert response.json()["source"] == "live"
+    assert fake.pings == 2
+
+
+@pytest.mark.asyncio
+async def test_probes_do_not_use_request_sessions(client: AsyncClient, monkeypatch):
+    """Test probes never resolve the per-user database dependency."""
+    monkeypatch.setattr(monitor_module, "get_redis", lambda: FakeRedis())
+
+    async def no_db():
+        raise AssertionError("probe requested a database session")
+        yield
+
+    app.dependency_overrides[get_db] = no_db
+
+    assert (await client.get("/ready?live=true")).json() == {"status": "ready"}
+    response = await client.get("/health/detailed?live=true")
+    assert response.json()["checks"]["database"]["status"] == "up"
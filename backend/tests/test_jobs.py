@@ -0,0 +1,230 @@
+"""Tests for the persistent job queue and the background worker."""
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core.config import settings
+from src.core.database import Base
+from src.models.job import Job, JobStatus
+from src.services.jobs import JOB_KINDS, JobKind, claim_job, complete_job, enqueue
+from src.worker import Worker, scheduled_jobs
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    """File-backed database shared by several workers."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Register test job kinds recording the payloads they ran with."""
+    calls = []
+
+    async def record(payload):
+        calls.append(payload.get("n"))
+        return {"n": payload.get("n")}
+
+    async def flaky(payload):
+        calls.append("flaky")
+        raise RuntimeError("boom")
+
+    async def slow(payload):
+        calls.append(("start", payload["n"]))
+        await asyncio.sleep(0.05)
+        calls.append(("end", payload["n"]))
+
+    monkeypatch.setitem(JOB_KINDS, "record", JobKind("record", record, concurrency=4))
+    monkeypatch.setitem(JOB_KINDS, "flaky", JobKind("flaky", flaky, max_attempts=3))
+    monkeypatch.setitem(JOB_KINDS, "slow", JobKind("slow", slow, concurrency=1))
+    return calls
+
+
+async def get_job(session_factory, job_id: int) -> Job:
+    async with session_factory() as session:
+        return await session.get(Job, job_id)
+
+
+async def add_jobs(session_factory, *jobs):
+    ids = []
+    async with session_factory() as session:
+        for kind, options in jobs:
+            ids.append(await enqueue(session, kind, **options))
+        await session.commit()
+    return ids
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_in_priority_order(session_factory, calls):
+    """Test higher priorities run first and delayed jobs wait."""
+    await add_jobs(
+        session_factory,
+        ("record", {"payload": {"n": 1}}),
+        ("record", {"payload": {"n": 2}, "priority": 10}),
+        ("record", {"payload": {"n": 3}, "priority": 5}),
+        ("record", {"payload": {"n": 4}, "priority": 99, "delay": 60}),
+    )
+    worker = Worker(session_factory, concurrency=1)
+    assert await worker.run_pending() == 3
+    assert calls == [2, 3, 1]
+
+    job = await get_job(session_factory, 2)
+    assert job.status == JobStatus.SUCCEEDED and job.result == '{"n": 2}'
+    assert (await get_job(session_factory, 4)).status == JobStatus.QUEUED
+
+
+@pytest.mark.asyncio
+async def test_failed_jobs_retry_with_backoff(session_factory, calls, monkeypatch):
+    """Test failures are requeued with doubling delays, then fail for good."""
+    monkeypatch.setattr(settings, "worker_retry_delay", 10.0)
+    [job_id] = await add_jobs(session_factory, ("flaky", {}))
+    worker = Worker(session_factory)
+
+    delays = []
+    for attempt in range(1, 4):
+        before = datetime.utcnow()
+        await worker.run_pending()
+        job = await get_job(session_factory, job_id)
+        assert job.attempts == attempt and "boom" in job.last_error
+        if job.status == JobStatus.QUEUED:
+            delays.append(round((job.visible_at - before).total_seconds()))
+            # Skip the backoff
+            async with session_factory() as session:
+                await session.execute(
+                    update(Job).where(Job.id == job_id).values(visible_at=datetime.utcnow())
+                )
+                await session.commit()
+
+    assert delays == [10, 20]
+    assert job.status == JobStatus.FAILED and job.finished_at is not None
+    assert calls == ["flaky"] * 3
+    assert worker.processed == {"succeeded": 0, "retried": 2, "failed": 1}
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_reclaimed(session_factory, calls):
+    """Test a job whose lease expired is run by another worker; the stale finish is ignored."""
+    [job_id] = await add_jobs(session_factory, ("record", {"payload": {"n": 7}}))
+    async with session_factory() as session:
+        stale = await claim_job(session, "dead-worker", lease=60)
+    assert stale.id == job_id
+
+    # Still leased: nobody else gets it
+    worker = Worker(session_factory)
+    assert await worker.run_pending() == 0
+
+    async with session_factory() as session:
+        await session.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(visible_at=datetime.utcnow() - timedelta(seconds=1))
+        )
+        await session.commit()
+    assert await worker.run_pending() == 1
+    assert calls == [7]
+
+    job = await get_job(session_factory, job_id)
+    assert job.status == JobStatus.SUCCEEDED and job.attempts == 2
+    async with session_factory() as session:
+        assert not await complete_job(session, job_id, "dead-worker", {"n": 0})
+    assert (await get_job(session_factory, job_id)).result == '{"n": 7}'
+
+
+@pytest.mark.asyncio
+async def test_kind_concurrency_limit_spans_workers(session_factory, calls):
+    """Test two workers never run more jobs of a kind than its limit."""
+    await add_jobs(session_factory, *[("slow", {"payload": {"n": n}}) for n in range(3)])
+    await add_jobs(session_factory, *[("record", {"payload": {"n": n}}) for n in range(10, 14)])
+    workers = [Worker(session_factory, concurrency=3, worker_id=f"w{i}") for i in range(2)]
+
+    claimed = await asyncio.gather(*(worker.run_pending() for worker in workers))
+    assert sum(claimed) == 7
+
+    # At most one slow job running at any point
+    running = peak = 0
+    for call in calls:
+        if isinstance(call, tuple):
+            running += 1 if call[0] == "start" else -1
+            peak = max(peak, running)
+    assert peak == 1
+    assert len([call for call in calls if isinstance(call, tuple)]) == 6
+    assert sorted(call for call in calls if isinstance(call, int)) == [10, 11, 12, 13]
+
+
+@pytest.mark.asyncio
+async def test_unique_key_keeps_one_queued_job(session_factory, calls):
+    """Test enqueueing a queued key again returns the existing job."""
+    first, second = await add_jobs(
+        session_factory,
+        ("record", {"payload": {"n": 1}, "unique_key": "nightly"}),
+        ("record", {"payload": {"n": 2}, "unique_key": "nightly"}),
+    )
+    assert first == second
+    await Worker(session_factory).run_pending()
+
+    # Once it has run, the key is free again
+    [third] = await add_jobs(
+        session_factory, ("record", {"payload": {"n": 3}, "unique_key": "nightly"})
+    )
+    assert third != first
+    assert calls == [1]
+
+
+@pytest.mark.asyncio
+async def test_worker_run_stops_gracefully(session_factory, calls):
+    """Test the worker loop picks up new jobs and finishes running ones on stop."""
+    worker = Worker(session_factory, poll_interval=0.01)
+    stop = asyncio.Event()
+    runner = asyncio.create_task(worker.run(stop))
+
+    await add_jobs(session_factory, ("slow", {"payload": {"n": 1}}))
+    for _ in range(200):
+        if ("start", 1) in calls:
+            break
+        await asyncio.sleep(0.01)
+    stop.set()
+    await asyncio.wait_for(runner, timeout=5)
+    assert calls == [("start", 1), ("end", 1)]
+    assert (await get_job(session_factory, 1)).status == JobStatus.SUCCEEDED
+
+
+@pytest.mark.asyncio
+async def test_admin_enqueues_when_worker_enabled(
+    client: AsyncClient, test_db: AsyncSession, monkeypatch
+):
+    """Test maintenance endpoints only queue jobs, which can then be polled."""
+    monkeypatch.setattr(settings, "worker_enabled", True)
+
+    response = await client.post("/api/admin/backups")
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.json()["status"] == "queued"
+
+    response = await client.get(f"/api/admin/jobs/{job_id}")
+    assert response.status_code == 200
+    assert response.json()["kind"] == "backup"
+    assert response.json()["attempts"] == 0
+
+    response = await client.post("/api/admin/jobs", json={"kind": "vault_index", "priority": 5})
+    assert response.status_code == 202
+    job = (await client.get(f"/api/admin/jobs/{response.json()['job_id']}")).json()
+    assert job["priority"] == 5
+
+    assert (await client.post("/api/admin/jobs", json={"kind": "nope"})).status_code == 400
+    assert (await client.get("/api/admin/jobs/999")).status_code == 404
+
+
+def test_github_sync_scheduled_without_token(monkeypatch):
+    """Test the worker schedules GitHub sync whenever it is enabled, as the API does."""
+    monkeypatch.setattr(settings, "github_sync_enabled", True)
+    monkeypatch.setattr(settings, "github_token", None)
+    assert "github_sync" in dict(scheduled_jobs())
+    monkeypatch.setattr(settings, "github_sync_enabled", False)
+    assert "github_sync" not in dict(scheduled_jobs())
@@ -1,7 +1,13 @@
 """Tests for Pomodoro API endpoints."""
+import base64
+import struct
 import pytest
 from httpx import AsyncClient
-from src.models.pomodoro import SessionType, SessionStatus
+from datetime import date, datetime, timedelta
+from sqlalchemy import select
+from src.core.config import settings
+from src.models.pomodoro import PomodoroSession, SessionType, SessionStatus
+from src.services.daily_totals import rebuild_daily_totals, rebuild_session_days
 
 
 @pytest.mark.asyncio
@@ -313,3 +319,241 @@ async def test_session_pagination(client: AsyncClient):
     response = await client.get("/api/pomodoro/sessions?skip=5&limit=5")
     data = response.json()
     assert len(data["sessions"]) == 5
+
+
+def add_session(test_db, started_at, session_type=SessionType.WORK, duration=1500,
+                status=SessionStatus.COMPLETED, interruptions=0):
+    """Insert a session at a fixed time, bypassing the API."""
+    session = PomodoroSession(
+        session_type=session_type,
+        status=status,
+        planned_duration=1500,
+        actual_duration=duration,
+        started_at=started_at,
+        interruptions=interruptions,
+    )
+    test_db.add(session)
+    return session
+
+
+@pytest.mark.asyncio
+async def test_stats_timeseries_zero_filled(client: AsyncClient, test_db):
+    """Test daily buckets cover the whole range, including empty days."""
+    add_session(test_db, datetime(2026, 3, 1, 9, 0))
+    add_session(test_db, datetime(2026, 3, 1, 10, 0), SessionType.SHORT_BREAK, 300)
+    add_session(test_db, datetime(2026, 3, 3, 9, 0), duration=600,
+                status=SessionStatus.INTERRUPTED, interruptions=2)
+    add_session(test_db, datetime(2026, 3, 5, 9, 0))  # outside the range
+    await test_db.commit()
+    await test_db.run_sync(lambda session: rebuild_daily_totals(session.connection()))
+    await test_db.commit()
+
+    response = await client.get(
+        "/api/pomodoro/stats/timeseries?bucket=day&from=2026-03-01&to=2026-03-04&tz=UTC"
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["timezone"] == "UTC"
+    buckets = data["buckets"]
+    assert [b["start"][:10] for b in buckets] == ["2026-03-01", "2026-03-02", "2026-03-03"]
+    assert [b["work_time"] for b in buckets] == [1500, 0, 600]
+    assert [b["break_time"] for b in buckets] == [300, 0, 0]
+    assert [b["sessions"] for b in buckets] == [2, 0, 1]
+    assert [b["completed_sessions"] for b in buckets] == [2, 0, 0]
+    assert [b["interrupted_sessions"] for b in buckets] == [0, 0, 1]
+    assert [b["interruptions"] for b in buckets] == [0, 0, 2]
+
+
+@pytest.mark.asyncio
+async def test_stats_timeseries_timezone_and_buckets(client: AsyncClient, test_db):
+    """Test buckets follow the requested timezone and calendar units."""
+    # 23:30 UTC on March 2 is already March 3 in Berlin
+    add_session(test_db, datetime(2026, 3, 2, 23, 30))
+    await test_db.commit()
+    await test_db.run_sync(lambda session: rebuild_daily_totals(session.connection()))
+    await test_db.commit()
+
+    response = await client.get(
+        "/api/pomodoro/stats/timeseries?bucket=day&from=2026-03-02&to=2026-03-04"
+        "&tz=Europe/Berlin"
+    )
+    buckets = response.json()["buckets"]
+    assert buckets[0]["start"] == "2026-03-02T00:00:00+01:00"
+    assert [b["sessions"] for b in buckets] == [0, 1]
+
+    response = await client.get(
+        "/api/pomodoro/stats/timeseries?bucket=month&from=2026-01-15&to=2026-04-01&tz=UTC"
+    )
+    buckets = response.json()["buckets"]
+    assert [b["start"][:7] for b in buckets] == ["2026-01", "2026-02", "2026-03"]
+    assert [b["sessions"] for b in buckets] == [0, 0, 1]
+
+
+@pytest.mark.asyncio
+async def test_stats_timeseries_cache_invalidated_by_writes(client: AsyncClient, test_db):
+    """Test closed buckets are cached until a session write touches them."""
+    two_days_ago = datetime.utcnow() - timedelta(days=2)
+    session = add_session(test_db, two_days_ago, duration=None, status=SessionStatus.ACTIVE)
+    await test_db.commit()
+    await test_db.run_sync(lambda session: rebuild_daily_totals(session.connection()))
+    await test_db.commit()
+    url = "/api/pomodoro/stats/timeseries?bucket=day&tz=UTC"
+
+    response = await client.get(url)
+    assert sum(b["sessions"] for b in response.json()["buckets"]) == 1
+    assert sum(b["completed_sessions"] for b in response.json()["buckets"]) == 0
+
+    # Rows written behind the API's back are not seen: the bucket is cached
+    add_session(test_db, two_days_ago)
+    await test_db.commit()
+    response = await client.get(url)
+    assert sum(b["sessions"] for b in response.json()["buckets"]) == 1
+
+    # An API write recomputes the touched bucket
+    await client.post(f"/api/pomodoro/sessions/{session.id}/complete")
+    response = await client.get(url)
+    assert sum(b["sessions"] for b in response.json()["buckets"]) == 2
+    assert sum(b["completed_sessions"] for b in response.json()["buckets"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_stats_timeseries_validation(client: AsyncClient):
+    """Test invalid timezones and ranges are rejected."""
+    response = await client.get("/api/pomodoro/stats/timeseries?tz=Mars/Olympus")
+    assert response.status_code == 400
+
+    response = await client.get(
+        "/api/pomodoro/stats/timeseries?from=2026-03-04&to=2026-03-01"
+    )
+    assert response.status_code == 400
+
+    response = await client.get("/api/pomodoro/stats/timeseries?bucket=year")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_session_day_follows_stats_timezone(client: AsyncClient, test_db, monkeypatch):
+    """Test sessions are bucketed by their stored local day, rebuilt on timezone changes."""
+    monkeypatch.setattr(settings, "stats_timezone", "Europe/Berlin")
+    # 23:30 UTC on March 2 is already March 3 in Berlin
+    session = add_session(test_db, datetime(2026, 3, 2, 23, 30))
+    add_session(test_db, datetime(2026, 3, 2, 12, 0), SessionType.SHORT_BREAK, 300)
+    await test_db.commit()
+    await test_db.run_sync(lambda session: rebuild_daily_totals(session.connection()))
+    await test_db.commit()
+    assert session.day == date(2026, 3, 3)
+
+    for bucket, expected in (("day", [1, 1]), ("week", [2])):
+        response = await client.get(
+            f"/api/pomodoro/stats/timeseries?bucket={bucket}&from=2026-03-02&to=2026-03-04"
+            "&tz=Europe/Berlin"
+        )
+        assert [b["sessions"] for b in response.json()["buckets"]] == expected
+    assert response.json()["buckets"][0]["work_time"] == 1500
+
+    # Today and the streak count local days
+    add_session(test_db, datetime.utcnow())
+    add_session(test_db, datetime.utcnow() - timedelta(days=2))
+    await test_db.commit()
+    data = (await client.get("/api/pomodoro/stats")).json()
+    assert data["today_sessions"] == 1
+    assert data["today_work_time"] == 1500
+    assert data["current_streak"] == 2
+
+    monkeypatch.setattr(settings, "stats_timezone", "UTC")
+    assert await test_db.run_sync(lambda db: rebuild_session_days(db.connection())) == 1
+    await test_db.commit()
+    days = (await test_db.execute(
+        select(PomodoroSession.day).where(PomodoroSession.started_at < datetime(2026, 3, 4))
+    )).scalars().all()
+    assert days == [date(2026, 3, 2)] * 2
+
+
+def decode_minutes(data) -> list:
+    raw = base64.b64decode(data["minutes"])
+    return list(struct.unpack(f"<{data['days']}H", raw))
+
+
+@pytest.mark.asyncio
+async def test_heatmap_from_daily_totals(client: AsyncClient, test_db):
+    """Test the heatmap reads precomputed totals for a calendar year."""
+    add_session(test_db, datetime(2025, 1, 1, 9, 0), duration=1500)
+    add_session(test_db, datetime(2025, 1, 1, 10, 0), duration=1200)
+    add_session(test_db, datetime(2025, 1, 1, 11, 0), SessionType.SHORT_BREAK, 300)
+    add_session(test_db, datetime(2025, 3, 10, 9, 0), duration=600)
+    add_session(test_db, datetime(2025, 12, 31, 9, 0), duration=3000)
+    await test_db.commit()
+    await test_db.run_sync(lambda session: rebuild_daily_totals(session.connection()))
+    await test_db.commit()
+
+    response = await client.get("/api/pomodoro/heatmap?year=2025")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["start"] == "2025-01-01"
+    assert data["days"] == 365
+    assert data["encoding"] == "uint16le-base64"
+
+    minutes = decode_minutes(data)
+    assert minutes[0] == 45
+    assert minutes[31 + 28 + 9] == 10
+    assert minutes[-1] == 50
+    assert data["total_minutes"] == 105
+    assert data["active_days"] == 3
+    assert data["quantiles"] == [27, 45, 47]
+
+
+@pytest.mark.asyncio
+async def test_heatmap_updated_by_session_writes(client: AsyncClient, test_db):
+    """Test a session write refreshes the total of the day it touched."""
+    started = datetime.utcnow() - timedelta(days=2, minutes=30)
+    session = add_session(test_db, started, duration=None, status=SessionStatus.ACTIVE)
+    await test_db.commit()
+
+    response = await client.get("/api/pomodoro/heatmap")
+    assert response.json()["days"] == 365
+    assert response.json()["total_minutes"] == 0
+
+    await client.post(f"/api/pomodoro/sessions/{session.id}/complete")
+
+    response = await client.get("/api/pomodoro/heatmap")
+    data = response.json()
+    minutes = decode_minutes(data)
+    index = (started.date() - date.fromisoformat(data["start"])).days
+    assert minutes[index] == 2 * 24 * 60 + 30
+    assert sum(minutes) == minutes[index]
+
+
+@pytest.mark.asyncio
+async def test_task_counters_follow_session_writes(client: AsyncClient, test_db):
+    """Test finishing linked sessions updates the task's focus counters."""
+    task = (await client.post("/api/tasks", json={"title": "Tracked"})).json()
+    session = add_session(test_db, datetime.utcnow() - timedelta(minutes=10),
+                          duration=None, status=SessionStatus.ACTIVE)
+    session.task_id = task["id"]
+    await test_db.commit()
+
+    await client.post(f"/api/pomodoro/sessions/{session.id}/complete")
+    data = (await client.get(f"/api/tasks/{task['id']}")).json()
+    assert 595 <= data["total_focus_seconds"] <= 605
+    assert data["interrupted_sessions"] == 0
+    assert data["last_worked_at"] is not None
+    focus = data["total_focus_seconds"]
+
+    # Completing again must not double count
+    await client.post(f"/api/pomodoro/sessions/{session.id}/complete")
+    data = (await client.get(f"/api/tasks/{task['id']}")).json()
+    assert abs(data["total_focus_seconds"] - focus) <= 5
+
+    # A session auto-interrupted by a new start counts as interrupted
+    await client.post("/api/pomodoro/sessions", json={
+        "session_type": "work", "planned_duration": 1500, "task_id": task["id"],
+    })
+    await client.post("/api/pomodoro/sessions", json={
+        "session_type": "short_break", "planned_duration": 300,
+    })
+    data = (await client.get(f"/api/tasks/{task['id']}")).json()
+    assert data["interrupted_sessions"] == 1
+
+    # Counters come with the list payload
+    response = await client.get("/api/tasks")
+    assert response.json()["tasks"][0]["interrupted_sessions"] == 1
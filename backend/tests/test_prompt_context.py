@@ -0,0 +1,200 @@
+"""Tests for the cached Claude prompt context and the ask endpoint."""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.models import Task
+from src.services.claude import ClaudeClient
+from src.services.prompt_context import (
+    PromptContextBuilder,
+    estimate_tokens,
+    fit_lines,
+    prompt_context,
+)
+
+
+class StubClaude:
+    """Threaded HTTP server answering like the Messages API, recording request bodies."""
+
+    def __init__(self):
+        self.bodies = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                seen = any(previous["system"] == body["system"] for previous in stub.bodies)
+                stub.bodies.append(body)
+                question = body["messages"][0]["content"]
+                payload = json.dumps({
+                    "content": [{"type": "text", "text": f"Answer to: {question}"}],
+                    "usage": {
+                        "input_tokens": 12,
+                        "output_tokens": 5,
+                        "cache_read_input_tokens": 300 if seen else 0,
+                    },
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def stub():
+    server = StubClaude()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def test_fit_lines_respects_budget():
+    """Test sections keep their leading lines within the budget and count the rest."""
+    lines = [f"- task number {i} with a reasonably long title" for i in range(100)]
+    text = fit_lines("Open tasks", lines, budget=200)
+    assert estimate_tokens(text) <= 200
+    assert text.startswith("## Open tasks\n- task number 0 ")
+    kept = text.count("\n- task")
+    assert text.endswith(f"... and {100 - kept} more")
+    assert fit_lines("Open tasks", [], budget=50) == "## Open tasks\n(none)"
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_only_their_sections(client: AsyncClient, test_db: AsyncSession):
+    """Test repeated builds hit the cache and writes re-render only what they touch."""
+    task = (await client.post(
+        "/api/tasks", json={"title": "Draft proposal", "priority": "high"}
+    )).json()
+    builder = prompt_context
+
+    first = await builder.build(test_db, settings.default_user_id)
+    assert "[high] Draft proposal (0/1 pomodoros, todo)" in first.text
+    assert [s.cached for s in first.sections] == [False, False, False]
+
+    second = await builder.build(test_db, settings.default_user_id)
+    assert [s.cached for s in second.sections] == [True, True, True]
+    assert second.prefix_hash == first.prefix_hash
+
+    # A task write re-renders only the task section
+    await client.post("/api/tasks", json={"title": "Review budget"})
+    third = await builder.build(test_db, settings.default_user_id)
+    assert {s.name: s.cached for s in third.sections} == {
+        "tasks": False, "streaks": True, "sessions": True,
+    }
+    assert "Review budget" in third.text
+    # The task section leads the prompt; the others are reused verbatim
+    assert [s.text for s in third.sections[1:]] == [s.text for s in first.sections[1:]]
+
+    # A session write re-renders sessions, streaks and the linked task
+    session = (await client.post("/api/pomodoro/sessions", json={
+        "session_type": "work", "planned_duration": 1500, "task_id": task["id"],
+    })).json()
+    await client.post(f"/api/pomodoro/sessions/{session['id']}/complete")
+    fourth = await builder.build(test_db, settings.default_user_id)
+    assert [s.cached for s in fourth.sections] == [False, False, False]
+    assert "Focus 0 min (completed): Draft proposal" in fourth.text
+
+    assert builder.hits == 5 and builder.misses == 7
+
+
+@pytest.mark.asyncio
+async def test_context_stays_within_budget(test_db: AsyncSession):
+    """Test a large task list is cut down to the token budget."""
+    test_db.add_all(
+        Task(title=f"Task {i:03d} " + "x" * 40, user_id=settings.default_user_id)
+        for i in range(300)
+    )
+    await test_db.commit()
+
+    builder = PromptContextBuilder(budget=600)
+    context = await builder.build(test_db, settings.default_user_id)
+    assert context.tokens <= 600
+    assert "... and " in context.sections[0].text
+    assert "Task 000" in context.text
+
+
+@pytest.mark.asyncio
+async def test_ask_reuses_prefix(client: AsyncClient, stub: StubClaude, monkeypatch):
+    """Test questions share a byte-identical cached system prefix until the data changes."""
+    await client.post("/api/tasks", json={"title": "Ship release"})
+    claude = ClaudeClient(base_url=stub.url, api_key="test-key")
+    monkeypatch.setattr("src.api.claude.claude_client", claude)
+
+    try:
+        async def ask(question: str) -> dict:
+            return (await client.post("/api/claude/ask", json={"question": question})).json()
+
+        first = await ask("What next?")
+        second = await ask("How was my week?")
+        await client.post("/api/tasks", json={"title": "Write changelog"})
+        third = await ask("What next?")
+    finally:
+        await claude.close()
+
+    assert first["answer"] == "Answer to: What next?"
+    assert first["prefix_hash"] == second["prefix_hash"] != third["prefix_hash"]
+    assert second["usage"]["cache_read_input_tokens"] == 300
+    assert third["usage"]["cache_read_input_tokens"] == 0
+
+    # Instructions, then one cache breakpoint per section
+    system = stub.bodies[0]["system"]
+    assert len(system) == 4 and "cache_control" not in system[0]
+    assert all(block["cache_control"] == {"type": "ephemeral"} for block in system[1:])
+    assert "Ship release" in system[1]["text"]
+    assert stub.bodies[1]["system"] == system
+    # A task write changes the task block only
+    assert "Write changelog" in stub.bodies[2]["system"][1]["text"]
+    assert stub.bodies[2]["system"][2:] == system[2:]
+
+
+@pytest.mark.asyncio
+async def test_context_endpoint_and_unconfigured_ask(client: AsyncClient):
+    """Test the context can be inspected and asking without a key returns 503."""
+    response = await client.get("/api/claude/context")
+    assert response.status_code == 200
+    data = response.json()
+    assert [s["name"] for s in data["sections"]] == ["tasks", "streaks", "sessions"]
+    assert data["tokens"] == sum(s["tokens"] for s in data["sections"])
+
+    response = await client.post("/api/claude/ask", json={"question": "Hi"})
+    assert response.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_worker_writes_are_seen_without_invalidation(
+    client: AsyncClient, test_db: AsyncSession, monkeypatch
+):
+    """Test sections re-render when another process changed their rows."""
+    monkeypatch.setattr(settings, "worker_enabled", True)
+    await client.post("/api/tasks", json={"title": "Imported from the vault"})
+    builder = PromptContextBuilder()
+    await builder.build(test_db, settings.default_user_id)
+
+    # Written as the worker would: no invalidate() in this process
+    task = (await test_db.execute(select(Task))).scalar_one()
+    task.title = "Renamed in the vault"
+    await test_db.commit()
+
+    context = await builder.build(test_db, settings.default_user_id)
+    assert {s.name: s.cached for s in context.sections} == {
+        "tasks": False, "streaks": True, "sessions": True,
+    }
+    assert "Renamed in the vault" in context.text
+
+    await test_db.delete(task)
+    await test_db.commit()
+    context = await builder.build(test_db, settings.default_user_id)
+    assert "Renamed in the vault" not in context.text
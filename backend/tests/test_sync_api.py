@@ -0,0 +1,78 @@
+"""Tests for the incremental sync endpoint."""
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_sync_returns_changes_since_version(client: AsyncClient):
+    """Test only rows written after the client's version are returned."""
+    first = (await client.post("/api/tasks", json={"title": "First"})).json()
+    session = (await client.post("/api/pomodoro/sessions", json={
+        "session_type": "work", "planned_duration": 1500,
+    })).json()
+    assert first["row_version"] > 0
+    assert session["row_version"] > first["row_version"]
+
+    response = await client.get("/api/sync")
+    assert response.status_code == 200
+    data = response.json()
+    assert [t["id"] for t in data["tasks"]] == [first["id"]]
+    assert [s["id"] for s in data["sessions"]] == [session["id"]]
+    assert data["deleted"] == []
+    assert data["has_more"] is False
+    assert data["version"] == session["row_version"]
+
+    updated = (await client.patch(f"/api/tasks/{first['id']}", json={"title": "Renamed"})).json()
+    assert updated["row_version"] > data["version"]
+
+    data = (await client.get("/api/sync", params={"since": data["version"]})).json()
+    assert [t["title"] for t in data["tasks"]] == ["Renamed"]
+    assert data["sessions"] == []
+    assert data["version"] == updated["row_version"]
+
+    data = (await client.get("/api/sync", params={"since": data["version"]})).json()
+    assert data["tasks"] == [] and data["sessions"] == [] and data["deleted"] == []
+    assert data["version"] == updated["row_version"]
+
+
+@pytest.mark.asyncio
+async def test_sync_reports_deleted_tasks(client: AsyncClient):
+    """Test deleting a task leaves a tombstone for syncing clients."""
+    task = (await client.post("/api/tasks", json={"title": "Doomed"})).json()
+    since = (await client.get("/api/sync")).json()["version"]
+
+    assert (await client.delete(f"/api/tasks/{task['id']}")).status_code == 204
+
+    data = (await client.get("/api/sync", params={"since": since})).json()
+    assert data["tasks"] == []
+    assert len(data["deleted"]) == 1
+    assert data["deleted"][0]["entity"] == "task"
+    assert data["deleted"][0]["id"] == task["id"]
+    assert data["deleted"][0]["row_version"] == data["version"]
+
+
+@pytest.mark.asyncio
+async def test_sync_pages_in_version_order(client: AsyncClient):
+    """Test changes are paged by version across entities."""
+    ids = [
+        (await client.post("/api/tasks", json={"title": f"Task {i}"})).json()["id"]
+        for i in range(5)
+    ]
+
+    seen, since = [], 0
+    while True:
+        data = (await client.get("/api/sync", params={"since": since, "limit": 2})).json()
+        assert len(data["tasks"]) <= 2
+        seen += [t["id"] for t in data["tasks"]]
+        since = data["version"]
+        if not data["has_more"]:
+            break
+    assert seen == ids
+
+
+@pytest.mark.asyncio
+async def test_sync_is_scoped_to_user(client: AsyncClient):
+    """Test one user's changes are not visible to another."""
+    await client.post("/api/tasks", json={"title": "Mine"}, headers={"X-User-ID": "alice"})
+    data = (await client.get("/api/sync", headers={"X-User-ID": "bob"})).json()
+    assert data["tasks"] == []
@@ -257,3 +257,190 @@ async def test_pagination(client: AsyncClient):
     data = response.json()
     assert len(data["tasks"]) == 5
     assert data["total"] == 10
+
+
+@pytest.mark.asyncio
+async def test_tasks_are_partitioned_by_user(client: AsyncClient):
+    """Test users only see their own tasks."""
+    alice = {"X-User-ID": "alice"}
+    bob = {"X-User-ID": "bob"}
+
+    create_response = await client.post(
+        "/api/tasks",
+        json={"title": "Alice Task", "priority": TaskPriority.MEDIUM.value},
+        headers=alice,
+    )
+    task_id = create_response.json()["id"]
+    await client.post(
+        "/api/tasks",
+        json={"title": "Bob Task", "priority": TaskPriority.MEDIUM.value},
+        headers=bob,
+    )
+
+    response = await client.get("/api/tasks", headers=alice)
+    data = response.json()
+    assert data["total"] == 1
+    assert data["tasks"][0]["title"] == "Alice Task"
+
+    # Other users cannot read or modify the task
+    response = await client.get(f"/api/tasks/{task_id}", headers=bob)
+    assert response.status_code == 404
+    response = await client.delete(f"/api/tasks/{task_id}", headers=bob)
+    assert response.status_code == 404
+
+    # Requests without a header belong to the default user
+    response = await client.get("/api/tasks")
+    assert response.json()["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_invalid_user_header(client: AsyncClient):
+    """Test malformed user identifiers are rejected."""
+    response = await client.get("/api/tasks", headers={"X-User-ID": "../etc"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_search_tasks(client: AsyncClient):
+    """Test full-text search with prefix matching and snippets."""
+    await client.post("/api/tasks", json={"title": "Write quarterly report", "tags": '["work"]'})
+    await client.post("/api/tasks", json={"title": "Groceries", "description": "Buy report paper"})
+    await client.post("/api/tasks", json={"title": "Call plumber"})
+
+    response = await client.get("/api/tasks/search?q=repo")
+    assert response.status_code == 200
+
+    data = response.json()
+    titles = [hit["task"]["title"] for hit in data["results"]]
+    # Title matches outrank description matches
+    assert titles == ["Write quarterly report", "Groceries"]
+    assert "<mark>report</mark>" in data["results"][0]["snippet"]
+    assert data["next_cursor"] is None
+
+    response = await client.get("/api/tasks/search?q=work")
+    titles = [hit["task"]["title"] for hit in response.json()["results"]]
+    assert titles == ["Write quarterly report"]
+
+
+@pytest.mark.asyncio
+async def test_search_tracks_updates_and_status(client: AsyncClient):
+    """Test the index follows updates/deletes and honours status filters."""
+    create_response = await client.post("/api/tasks", json={"title": "Draft proposal"})
+    task_id = create_response.json()["id"]
+    other_response = await client.post("/api/tasks", json={"title": "Proposal review"})
+    other_id = other_response.json()["id"]
+
+    await client.patch(f"/api/tasks/{task_id}", json={"title": "Draft budget"})
+    await client.post(f"/api/tasks/{other_id}/complete")
+
+    response = await client.get("/api/tasks/search?q=proposal")
+    assert [hit["task"]["id"] for hit in response.json()["results"]] == [other_id]
+
+    response = await client.get(f"/api/tasks/search?q=proposal&status={TaskStatus.TODO.value}")
+    assert response.json()["results"] == []
+
+    await client.delete(f"/api/tasks/{other_id}")
+    response = await client.get("/api/tasks/search?q=proposal")
+    assert response.json()["results"] == []
+
+
+@pytest.mark.asyncio
+async def test_search_keyset_paging(client: AsyncClient):
+    """Test paging through search results with cursors."""
+    for i in range(5):
+        await client.post("/api/tasks", json={"title": f"Meeting notes {i}"})
+
+    seen = []
+    cursor = None
+    while True:
+        url = "/api/tasks/search?q=meeting&limit=2"
+        if cursor:
+            url += f"&cursor={cursor}"
+        data = (await client.get(url)).json()
+        seen.extend(hit["task"]["id"] for hit in data["results"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+
+@pytest.mark.asyncio
+async def test_filter_tasks_by_tag(client: AsyncClient):
+    """Test tag filters with any/all semantics."""
+    await client.post("/api/tasks", json={"title": "Both", "tags": '["work", "urgent"]'})
+    await client.post("/api/tasks", json={"title": "Work only", "tags": "Work"})
+    await client.post("/api/tasks", json={"title": "Untagged"})
+
+    response = await client.get("/api/tasks?tag=work&tag=urgent")
+    data = response.json()
+    assert data["total"] == 2
+    assert {task["title"] for task in data["tasks"]} == {"Both", "Work only"}
+
+    response = await client.get("/api/tasks?tag=work&tag=urgent&tag_mode=all")
+    data = response.json()
+    assert data["total"] == 1
+    assert data["tasks"][0]["title"] == "Both"
+    # The original tags string is returned unchanged
+    assert data["tasks"][0]["tags"] == '["work", "urgent"]'
+
+
+@pytest.mark.asyncio
+async def test_tag_index_follows_updates(client: AsyncClient):
+    """Test tag links and cardinalities track updates and deletes."""
+    first = await client.post("/api/tasks", json={"title": "First", "tags": '["a", "b"]'})
+    second = await client.post("/api/tasks", json={"title": "Second", "tags": '["a"]'})
+
+    response = await client.get("/api/tasks/tags")
+    assert response.json()["tags"] == [{"name": "a", "count": 2}, {"name": "b", "count": 1}]
+
+    await client.patch(f"/api/tasks/{first.json()['id']}", json={"tags": '["c"]'})
+    await client.delete(f"/api/tasks/{second.json()['id']}")
+
+    response = await client.get("/api/tasks/tags")
+    assert response.json()["tags"] == [{"name": "c", "count": 1}]
+
+    response = await client.get("/api/tasks?tag=a")
+    assert response.json()["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_sorted_by_priority(client: AsyncClient):
+    """Test priority sorting uses urgency, not alphabetical order."""
+    for priority in ["low", "urgent", "medium", "high"]:
+        await client.post("/api/tasks", json={"title": priority, "priority": priority})
+
+    response = await client.get("/api/tasks?sort=priority")
+    titles = [task["title"] for task in response.json()["tasks"]]
+    assert titles == ["urgent", "high", "medium", "low"]
+
+
+@pytest.mark.asyncio
+async def test_next_tasks_queue(client: AsyncClient):
+    """Test the next-task queue orders open tasks by priority and remaining work."""
+    low = await client.post("/api/tasks", json={"title": "Low", "priority": "low"})
+    long = await client.post(
+        "/api/tasks", json={"title": "Long", "priority": "high", "estimated_pomodoros": 8}
+    )
+    short = await client.post(
+        "/api/tasks", json={"title": "Short", "priority": "high", "estimated_pomodoros": 2}
+    )
+    done = await client.post("/api/tasks", json={"title": "Done", "priority": "urgent"})
+    await client.post(f"/api/tasks/{done.json()['id']}/complete")
+
+    response = await client.get("/api/tasks/next?n=3")
+    assert response.status_code == 200
+    assert [task["title"] for task in response.json()] == ["Short", "Long", "Low"]
+
+    # Progress and priority changes re-rank the queue
+    for _ in range(7):
+        await client.post(f"/api/tasks/{long.json()['id']}/increment-pomodoro")
+    await client.patch(f"/api/tasks/{low.json()['id']}", json={"priority": "urgent"})
+
+    response = await client.get("/api/tasks/next?n=2")
+    assert [task["title"] for task in response.json()] == ["Low", "Long"]
+
+    await client.patch(f"/api/tasks/{short.json()['id']}", json={"status": "archived"})
+    response = await client.get("/api/tasks/next")
+    assert [task["title"] for task in response.json()] == ["Low", "Long"]
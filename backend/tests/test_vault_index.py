@@ -0,0 +1,71 @@
+"""Tests for the incremental Obsidian vault indexer."""
+import os
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.services.vault_index import VaultIndexer, load_manifest, scan_vault, vault_indexer
+
+
+def write(root, path, text):
+    full = root / path
+    full.parent.mkdir(parents=True, exist_ok=True)
+    full.write_text(text)
+    return full
+
+
+@pytest.mark.asyncio
+async def test_rescan_only_reads_changed_notes(tmp_path, test_db: AsyncSession):
+    """Test unchanged notes are not re-read and edits, renames and deletes are detected."""
+    write(tmp_path, "Inbox.md", "# Inbox")
+    write(tmp_path, "Projects/Alpha.md", "- [ ] alpha task")
+    write(tmp_path, "Projects/Beta.md", "- [ ] beta task")
+    write(tmp_path, ".obsidian/workspace.md", "ignored")
+    write(tmp_path, "image.png", "ignored")
+    indexer = VaultIndexer(str(tmp_path))
+
+    changes = await indexer.run(test_db)
+    notes = ["Inbox.md", "Projects/Alpha.md", "Projects/Beta.md"]
+    assert sorted(e.path for e in changes.added) == notes
+    assert set(await load_manifest(test_db)) == set(notes)
+
+    changes = await indexer.run(test_db)
+    assert not changes.changed
+    assert changes.scanned == 3 and changes.hashed == 0
+
+    write(tmp_path, "Inbox.md", "# Inbox\n- [ ] new")
+    os.rename(tmp_path / "Projects/Alpha.md", tmp_path / "Archive.md")
+    os.remove(tmp_path / "Projects/Beta.md")
+    changes = await indexer.run(test_db)
+    assert [e.path for e in changes.modified] == ["Inbox.md"]
+    assert [(old, e.path) for old, e in changes.renamed] == [("Projects/Alpha.md", "Archive.md")]
+    assert changes.removed == ["Projects/Beta.md"]
+    assert changes.added == []
+    assert set(await load_manifest(test_db)) == {"Inbox.md", "Archive.md"}
+
+
+def test_touched_note_is_not_modified(tmp_path):
+    """Test a new mtime with identical contents is recorded without a content change."""
+    note = write(tmp_path, "Daily.md", "same")
+    first = scan_vault(str(tmp_path), {})
+    manifest = {e.path: e for e in first.added}
+
+    stat = note.stat()
+    os.utime(note, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    changes = scan_vault(str(tmp_path), manifest)
+    assert [e.path for e in changes.touched] == ["Daily.md"]
+    assert changes.modified == []
+
+
+@pytest.mark.asyncio
+async def test_index_vault_endpoint(client: AsyncClient, tmp_path, monkeypatch):
+    """Test the admin endpoint reports scan counts and a missing vault."""
+    write(tmp_path, "Note.md", "hello")
+    monkeypatch.setattr(vault_indexer, "root", str(tmp_path))
+
+    response = await client.post("/api/admin/vault/index")
+    assert response.status_code == 200
+    assert response.json()["added"] == 1
+
+    monkeypatch.setattr(vault_indexer, "root", str(tmp_path / "missing"))
+    assert (await client.post("/api/admin/vault/index")).status_code == 404
@@ -0,0 +1,138 @@
+"""Tests for importing Obsidian checkbox items as tasks."""
+import os
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.services.note_parser import parse_note
+from src.services.vault_index import VaultIndexer
+from src.services.vault_ingest import parse_notes
+
+NOTE = """---
+title: Project Alpha
+tags: [work, Alpha]
+---
+Kick-off notes, see [[Roadmap|the roadmap]] and [spec](docs/spec.md). #planning
+
+- [ ] Draft the proposal #writing [[Roadmap]]
+- [x] Book the room
+* [ ] Draft the proposal #writing [[Roadmap]]
+
+```
+- [ ] not a task
+```
+"""
+
+
+def test_parse_note_extracts_tasks_tags_and_links():
+    """Test checkbox items, frontmatter/inline tags and links are extracted."""
+    note = parse_note("Projects/Alpha.md", NOTE)
+    assert note.title == "Project Alpha"
+    assert note.tags == ["work", "alpha", "planning", "writing"]
+    assert note.links == ["Roadmap", "docs/spec.md"]
+
+    assert [(t.title, t.done) for t in note.tasks] == [
+        ("Draft the proposal [[Roadmap]]", False),
+        ("Book the room", True),
+        ("Draft the proposal [[Roadmap]]", False),
+    ]
+    assert note.tasks[0].tags == ["writing", "work", "alpha"]
+    assert note.tasks[0].links == ["Roadmap"]
+    # Duplicate items get distinct, stable keys
+    assert note.tasks[0].key != note.tasks[2].key
+    unticked = parse_note("Projects/Alpha.md", NOTE.replace("[x]", "[ ]"))
+    assert unticked.tasks[1].key == note.tasks[1].key
+
+
+@pytest.mark.asyncio
+async def test_parse_notes_in_process_pool(tmp_path):
+    """Test chunked parsing in worker processes returns every note."""
+    paths = []
+    for i in range(7):
+        (tmp_path / f"n{i}.md").write_text(f"- [ ] task {i}\n")
+        paths.append(f"n{i}.md")
+
+    pool = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        chunks = [chunk async for chunk in parse_notes(str(tmp_path), paths, pool, chunk_size=2)]
+    finally:
+        pool.shutdown()
+    assert sorted(len(chunk) for chunk in chunks) == [1, 2, 2, 2]
+    titles = sorted(note.tasks[0].title for chunk in chunks for note in chunk)
+    assert titles == [f"task {i}" for i in range(7)]
+
+
+@pytest.mark.asyncio
+async def test_indexer_imports_checkbox_tasks(client: AsyncClient, test_db: AsyncSession, tmp_path):
+    """Test vault tasks follow note edits, renames and deletes."""
+    note = tmp_path / "Alpha.md"
+    note.write_text(NOTE)
+    (tmp_path / "Other.md").write_text("- [ ] Other task\n")
+    indexer = VaultIndexer(str(tmp_path))
+
+    changes = await indexer.run(test_db)
+    assert changes.tasks == {"created": 4, "updated": 0, "deleted": 0}
+
+    tasks = {t["title"]: t for t in (await client.get("/api/tasks")).json()["tasks"]}
+    assert tasks["Book the room"]["status"] == "completed"
+    assert tasks["Book the room"]["source_path"] == "Alpha.md"
+    assert tasks["Draft the proposal [[Roadmap]]"]["description"] == "Links: Roadmap"
+    writing = (await client.get("/api/tasks", params={"tag": "writing"})).json()
+    assert writing["total"] == 2
+
+    # Nothing changed: no task rows are rewritten
+    assert (await indexer.run(test_db)).tasks == {"created": 0, "updated": 0, "deleted": 0}
+
+    note.write_text(NOTE.replace("- [x] Book the room", "- [ ] Book the room").replace(
+        "* [ ] Draft the proposal #writing [[Roadmap]]\n", ""
+    ))
+    changes = await indexer.run(test_db)
+    assert changes.tasks == {"created": 0, "updated": 1, "deleted": 1}
+    room = (await client.get(f"/api/tasks/{tasks['Book the room']['id']}")).json()
+    assert room["status"] == "todo"
+    assert room["completed_at"] is None
+
+    os.rename(note, tmp_path / "Beta.md")
+    await indexer.run(test_db)
+    room = (await client.get(f"/api/tasks/{tasks['Book the room']['id']}")).json()
+    assert room["source_path"] == "Beta.md"
+
+    os.remove(tmp_path / "Beta.md")
+    changes = await indexer.run(test_db)
+    assert changes.tasks["deleted"] == 2
+    assert [t["title"] for t in (await client.get("/api/tasks")).json()["tasks"]] == ["Other task"]
+
+
+@pytest.mark.asyncio
+async def test_unrelated_note_edits_keep_app_status(
+    client: AsyncClient, test_db: AsyncSession, tmp_path
+):
+    """Test only an observed tick or untick changes the status of a vault task."""
+    note = tmp_path / "Alpha.md"
+    note.write_text("- [ ] Write report\n- [x] Send invoice\n")
+    indexer = VaultIndexer(str(tmp_path))
+    await indexer.run(test_db)
+    tasks = {t["title"]: t["id"] for t in (await client.get("/api/tasks")).json()["tasks"]}
+
+    async def status(title: str) -> str:
+        return (await client.get(f"/api/tasks/{tasks[title]}")).json()["status"]
+
+    # Completed in the app and reopened in the app; the boxes are untouched
+    await client.post(f"/api/tasks/{tasks['Write report']}/complete")
+    await client.patch(f"/api/tasks/{tasks['Send invoice']}", json={"status": "in_progress"})
+    note.write_text("- [ ] Write report\n- [x] Send invoice\n- [ ] New item\n")
+    assert (await indexer.run(test_db)).tasks == {"created": 1, "updated": 0, "deleted": 0}
+    assert await status("Write report") == "completed"
+    assert await status("Send invoice") == "in_progress"
+
+    # Box changes apply; unticking only reopens completed tasks
+    note.write_text("- [x] Write report\n- [ ] Send invoice\n- [ ] New item\n")
+    await indexer.run(test_db)
+    assert await status("Write report") == "completed"
+    assert await status("Send invoice") == "in_progress"
+    note.write_text("- [ ] Write report\n- [x] Send invoice\n- [ ] New item\n")
+    await indexer.run(test_db)
+    assert await status("Write report") == "todo"
+    assert await status("Send invoice") == "completed"
@@ -0,0 +1,120 @@
+"""Tests for the filesystem watcher that drives the vault indexer."""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.services.vault_index import VaultIndexer, load_manifest, scan_vault
+from src.services.vault_watcher import VaultWatcher
+
+
+def write(root, path, text):
+    full = root / path
+    full.parent.mkdir(parents=True, exist_ok=True)
+    full.write_text(text)
+    return full
+
+
+def test_scan_limited_to_paths(tmp_path):
+    """Test a path-scoped scan covers the paths and directories given, nothing else."""
+    write(tmp_path, "Inbox.md", "inbox")
+    write(tmp_path, "Projects/Alpha.md", "alpha")
+    write(tmp_path, "Projects/Beta.md", "beta")
+    manifest = {e.path: e for e in scan_vault(str(tmp_path), {}).added}
+
+    write(tmp_path, "Inbox.md", "inbox, edited")
+    os.rename(tmp_path / "Projects", tmp_path / "Archive")
+    changes = scan_vault(str(tmp_path), manifest, ["Projects", "Archive"])
+    assert changes.scanned == 2
+    assert sorted((old, e.path) for old, e in changes.renamed) == [
+        ("Projects/Alpha.md", "Archive/Alpha.md"),
+        ("Projects/Beta.md", "Archive/Beta.md"),
+    ]
+    assert changes.modified == [] and changes.removed == []
+
+    changes = scan_vault(str(tmp_path), manifest, ["Inbox.md", "Gone.md"])
+    assert [e.path for e in changes.modified] == ["Inbox.md"]
+    assert changes.removed == []
+
+
+def test_pending_paths_are_deduplicated_until_overflow(tmp_path):
+    """Test repeated events collapse to one path and too many fall back to a rescan."""
+    watcher = VaultWatcher(VaultIndexer(str(tmp_path)), max_batch=3)
+    watcher._overflow = False
+    root = str(tmp_path)
+
+    watcher.add_paths([f"{root}/a.md", f"{root}/a.md", f"{root}/.git/index", f"{root}/img.png"])
+    watcher.add_paths([f"{root}/a.md", f"{root}/Folder"])
+    assert watcher._pending == {"a.md", "Folder"}
+
+    watcher.add_paths([f"{root}/b.md", f"{root}/c.md"])
+    assert watcher._overflow and watcher._pending == set()
+
+
+def test_dotted_directories_are_kept(tmp_path):
+    """Test directories with a dot in their name are rescanned, even once deleted."""
+    write(tmp_path, "Journal/2024.01/Day.md", "day")
+    write(tmp_path, "Journal/2024.02/Day.md", "day")
+    indexer = VaultIndexer(str(tmp_path))
+    indexer._manifest = {e.path: e for e in scan_vault(str(tmp_path), {}).added}
+    watcher = VaultWatcher(indexer)
+    watcher._overflow = False
+    root = str(tmp_path)
+
+    # Deleted: only the manifest knows it was a directory
+    os.remove(tmp_path / "Journal/2024.01/Day.md")
+    os.rmdir(tmp_path / "Journal/2024.01")
+    watcher.add_paths([
+        f"{root}/Journal/2024.01", f"{root}/Journal/2024.02", f"{root}/Journal/v1.2",
+        f"{root}/Journal/img.png",
+    ])
+    assert watcher._pending == {"Journal/2024.01", "Journal/2024.02"}
+
+
+async def wait_for(condition, timeout=10.0):
+    for _ in range(int(timeout / 0.05)):
+        if await condition():
+            return
+        await asyncio.sleep(0.05)
+    raise AssertionError("condition not met")
+
+
+@pytest.mark.asyncio
+async def test_watcher_indexes_changes(tmp_path, test_db: AsyncSession, monkeypatch):
+    """Test edits are indexed from events and a storm is coalesced into one rescan."""
+    monkeypatch.setattr(settings, "obsidian_sync_enabled", True)
+    monkeypatch.setattr(settings, "obsidian_parse_workers", 0)
+    write(tmp_path, "Inbox.md", "- [ ] existing")
+
+    @asynccontextmanager
+    async def factory():
+        yield test_db
+
+    watcher = VaultWatcher(
+        VaultIndexer(str(tmp_path), factory), debounce_ms=500, step_ms=50, max_batch=20
+    )
+
+    async def indexed(*paths, rescans=1):
+        # The counters move once the run returns, just after its commit
+        return watcher.full_rescans == rescans and set(paths) <= set(await load_manifest(test_db))
+
+    watcher.start()
+    try:
+        # Startup always begins with a full rescan
+        await wait_for(lambda: indexed("Inbox.md"))
+
+        write(tmp_path, "Projects/Alpha.md", "- [ ] alpha")
+        write(tmp_path, "image.png", "ignored")
+        await wait_for(lambda: indexed("Projects/Alpha.md"))
+        assert watcher.indexer.last_changes.scanned == 1
+
+        # Like a git pull: thousands of files in already-watched directories
+        storm = [f"Projects/{i}.md" for i in range(200)]
+        for path in storm:
+            write(tmp_path, path, f"- [ ] {path}")
+        await wait_for(lambda: indexed(*storm, rescans=2))
+        assert watcher.batches < 10
+    finally:
+        await watcher.stop()
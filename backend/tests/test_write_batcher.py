@@ -0,0 +1,113 @@
+"""Tests for group-committed writes."""
+import asyncio
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core.config import settings
+from src.core.database import Base
+from src.core.write_batcher import WriteBatcher
+from src.models.task import Task
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    """File-backed database so batches really commit."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'batch.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+def create(title: str):
+    """Build a write op inserting a task."""
+    async def apply(tx: AsyncSession) -> Task:
+        task = Task(title=title)
+        tx.add(task)
+        await tx.flush()
+        return task
+    return apply
+
+
+async def count_tasks(session_factory) -> int:
+    async with session_factory() as session:
+        return (await session.execute(select(func.count()).select_from(Task))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_share_one_commit(session_factory):
+    """Test writes submitted together only become visible when their batch commits."""
+    batcher = WriteBatcher(session_factory, window_ms=20, max_ops=100)
+    seen = []
+
+    async def peek(tx: AsyncSession):
+        # Another connection, mid-batch
+        seen.append(await count_tasks(session_factory))
+
+    results = await asyncio.gather(
+        *(batcher.submit(create(f"Task {i}")) for i in range(5)),
+        batcher.submit(peek),
+        *(batcher.submit(create(f"Task {i}")) for i in range(5, 10)),
+        batcher.submit(peek),
+    )
+
+    tasks = results[:5] + results[6:11]
+    assert [task.title for task in tasks] == [f"Task {i}" for i in range(10)]
+    assert len({task.id for task in tasks}) == 10
+    assert seen == [0, 0]
+    assert batcher.batches_committed == 1
+    assert await count_tasks(session_factory) == 10
+
+
+@pytest.mark.asyncio
+async def test_batch_flushes_at_max_ops(session_factory):
+    """Test a full batch is flushed without waiting for the window."""
+    batcher = WriteBatcher(session_factory, window_ms=10_000, max_ops=4)
+
+    await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit(create(f"Task {i}")) for i in range(8))),
+        timeout=5,
+    )
+    assert batcher.batches_committed == 2
+
+
+@pytest.mark.asyncio
+async def test_failing_write_is_isolated(session_factory):
+    """Test one failing op does not roll back the rest of its batch."""
+    batcher = WriteBatcher(session_factory, window_ms=20, max_ops=100)
+
+    async def fail(tx: AsyncSession):
+        tx.add(Task(title="Never committed"))
+        await tx.flush()
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        batcher.submit(create("First")),
+        batcher.submit(fail),
+        batcher.submit(create("Last")),
+        return_exceptions=True,
+    )
+
+    assert results[0].title == "First"
+    assert isinstance(results[1], ValueError)
+    assert results[2].title == "Last"
+    assert batcher.batches_committed == 1
+    assert await count_tasks(session_factory) == 2
+
+
+@pytest.mark.asyncio
+async def test_endpoints_with_write_batching(client: AsyncClient, monkeypatch):
+    """Test the task endpoints behave the same with batching enabled."""
+    monkeypatch.setattr(settings, "write_batching_enabled", True)
+
+    response = await client.post("/api/tasks", json={"title": "Batched"})
+    assert response.status_code == 201
+    task_id = response.json()["id"]
+
+    response = await client.post(f"/api/tasks/{task_id}/complete")
+    assert response.json()["status"] == "completed"
+
+    response = await client.patch("/api/tasks/999", json={"title": "Missing"})
+    assert response.status_code == 404